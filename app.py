@@ -2,10 +2,13 @@
 
 from dotenv import load_dotenv, find_dotenv
 load_dotenv(find_dotenv())  # CWD가 달라도 project-root의 .env를 찾아 로드
-import sys, os, ctypes
+import sys, os, ctypes, multiprocessing
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtGui import QIcon
+from PyQt5.QtCore import QTimer
+from core.config import Config
 from core.models import create_user_table, create_analysis_table
+from core.services.history import migrate_from_json
 from gui.main_window import MainWindow, load_stylesheet
 from pathlib import Path
 
@@ -17,15 +20,21 @@ def resource_path(*parts):
 
 BASE_DIR = Path(__file__).resolve().parent        # Drovis_v4
 DB_DIR = BASE_DIR / "database"                    # Drovis_v4/database
-DB_DIR.mkdir(parents=True, exist_ok=True)
 
 
-# DB 테이블 생성
-create_user_table()
-create_analysis_table()
-
 # 앱 실행
+# (일괄 분석 작업 프로세스는 spawn 방식이라 이 모듈을 다시 import함 —
+#  DB 생성/이전 같은 작업은 모두 여기 아래에서만 실행)
 if __name__ == "__main__":
+    # PyInstaller로 빌드한 exe에서 작업 프로세스로 실행된 경우 여기서 작업만 하고 끝남
+    multiprocessing.freeze_support()
+
+    # DB 테이블 생성
+    DB_DIR.mkdir(parents=True, exist_ok=True)
+    create_user_table()
+    create_analysis_table()
+    # data/history.json 기록이 남아 있으면 SQLite로 1회 이전
+    migrate_from_json()
 
     # 윈도우에서 작업표시줄 그룹/아이콘을 이 앱용으로 분리
     try:
@@ -47,4 +56,9 @@ if __name__ == "__main__":
     window.setWindowIcon(QIcon(ICON_PATH))
     window.show()
 
+    # 창이 뜬 뒤 백그라운드에서 ML 모델 미리 로드
+    if Config.PREWARM_MODEL:
+        from core.services.warmup import prewarm
+        QTimer.singleShot(0, prewarm)
+
     sys.exit(app.exec_())
@@ -0,0 +1,393 @@
+# cli.py
+# GUI 없이 서버에서 실행하는 명령줄 진입점
+#   python cli.py analyze videos/ "clips/*.mp4" --workers 8 -o results.jsonl
+
+from dotenv import load_dotenv, find_dotenv
+load_dotenv(find_dotenv())  # Config가 환경 변수를 읽기 전에 .env 로드
+import argparse
+import glob
+import json
+import os
+import sys
+import threading
+import time
+
+from core.config import Config
+
+
+# ---------- 입력 경로 ----------
+def expand_inputs(inputs, recursive=False):
+    """파일/폴더/glob 패턴 → 중복 없는 mp4 경로 목록 (입력 순서 유지)"""
+    from core.services.batch import VIDEO_EXTENSIONS, list_videos
+
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.extend(list_videos(item, recursive))
+        elif os.path.isfile(item):
+            paths.append(item)
+        else:
+            matches = sorted(glob.glob(item, recursive=recursive))
+            paths.extend(p for p in matches if os.path.isfile(p) and p.lower().endswith(VIDEO_EXTENSIONS))
+
+    seen, unique = set(), []
+    for p in paths:
+        key = os.path.abspath(p)
+        if key not in seen:
+            seen.add(key)
+            unique.append(key)
+    return unique
+
+
+# ---------- 출력 ----------
+def frame_count(job):
+    stats = (job.result or {}).get("pose_stats") or {}
+    return int(stats.get("success", 0)) + int(stats.get("fail", 0))
+
+
+def print_summary(jobs, elapsed, out=sys.stderr):
+    done = [j for j in jobs if j.state == "done"]
+    failed = [j for j in jobs if j.state == "failed"]
+    frames = sum(frame_count(j) for j in done)
+    elapsed = max(elapsed, 1e-9)
+    print(
+        f"[SUMMARY] 영상 {len(jobs)}개 (성공 {len(done)}, 실패 {len(failed)}) / "
+        f"{elapsed:.1f}초 / {len(done) * 3600.0 / elapsed:.1f} videos/hour / "
+        f"{frames / elapsed:.1f} frames/sec",
+        file=out,
+    )
+    for j in failed:
+        print(f"  - 실패: {j.filename}: {j.message}", file=out)
+
+
+# ---------- analyze ----------
+def cmd_analyze(args):
+    from core.services.batch import BatchQueue
+
+    paths = expand_inputs(args.inputs, args.recursive)
+    if not paths:
+        print("[ERROR] 분석할 mp4 파일이 없습니다.", file=sys.stderr)
+        return 2
+
+    if not args.no_save:
+        from core.models import create_analysis_table
+
+        create_analysis_table()
+
+    out = sys.stdout if args.output == "-" else open(args.output, "a", encoding="utf-8")
+    write_lock = threading.Lock()
+    finished = [0]
+
+    def on_update(job):
+        if not job.finished:
+            return
+        with write_lock:
+            out.write(json.dumps(job.to_dict(), ensure_ascii=False) + "\n")
+            out.flush()
+            finished[0] += 1
+            if not args.quiet:
+                print(
+                    f"[{finished[0]}/{len(paths)}] {job.filename}: {job.state}",
+                    file=sys.stderr,
+                )
+
+    started = time.perf_counter()
+    queue = BatchQueue(
+        username=args.user,
+        workers=args.workers,
+        on_update=on_update,
+        save=not args.no_save,
+        prewarm_workers=True,
+        stdout_to_stderr=True,
+    )
+    try:
+        queue.add_many(paths)
+        queue.wait()
+        queue.shutdown()
+    except KeyboardInterrupt:
+        print("\n[INFO] 중단 — 대기 중인 영상을 취소합니다.", file=sys.stderr)
+        queue.shutdown(wait=False)
+        return 130
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    jobs = queue.jobs()
+    print_summary(jobs, time.perf_counter() - started)
+    return 0 if all(j.state == "done" for j in jobs) else 1
+
+
+# ---------- watch ----------
+def cmd_watch(args):
+    from core.services.watcher import FolderWatcher
+
+    if not os.path.isdir(args.folder):
+        print(f"[ERROR] 폴더가 없습니다: {args.folder}", file=sys.stderr)
+        return 2
+
+    from core.models import create_analysis_table
+
+    create_analysis_table()
+    watcher = FolderWatcher(
+        args.folder,
+        username=args.user,
+        workers=args.workers,
+        recursive=args.recursive,
+        interval=args.interval,
+        settle_sec=args.settle,
+        checkpoint_path=args.checkpoint,
+        log=lambda msg: print(msg, file=sys.stderr, flush=True),
+    )
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        print("\n[INFO] 종료 — 분석 중인 영상을 마무리합니다.", file=sys.stderr)
+    return 0
+
+
+# ---------- 분산 작업 큐 ----------
+def cmd_enqueue(args):
+    from core.models import create_analysis_table
+    from core.services import jobqueue
+
+    paths = expand_inputs(args.inputs, args.recursive)
+    if not paths:
+        print("[ERROR] 등록할 mp4 파일이 없습니다.", file=sys.stderr)
+        return 2
+    create_analysis_table()
+    for path in paths:
+        job_id = jobqueue.enqueue(
+            path, username=args.user, priority=args.priority, max_attempts=args.max_attempts
+        )
+        print(json.dumps({"job_id": job_id, "path": path}, ensure_ascii=False))
+    return 0
+
+
+def cmd_jobs(args):
+    from core.models import create_analysis_table
+    from core.services import jobqueue
+
+    create_analysis_table()
+    if args.cancel is not None:
+        ok = jobqueue.cancel(args.cancel)
+        print(f"[INFO] 작업 {args.cancel} 취소 {'요청됨' if ok else '실패 (없거나 이미 종료)'}", file=sys.stderr)
+        return 0 if ok else 1
+    for job in reversed(jobqueue.list_jobs(args.status, args.limit)):
+        print(json.dumps(job, ensure_ascii=False))
+    print(f"[SUMMARY] {jobqueue.stats()}", file=sys.stderr)
+    return 0
+
+
+def _worker_main(worker_id, args):
+    from core.services.jobqueue import JobWorker
+
+    worker = JobWorker(
+        worker_id=worker_id,
+        lease_sec=args.lease,
+        poll_sec=args.poll,
+        save=not args.no_save,
+        log=lambda msg: print(msg, file=sys.stderr, flush=True),
+    )
+    try:
+        return worker.run(max_jobs=args.max_jobs, exit_when_idle=args.exit_when_idle)
+    except KeyboardInterrupt:
+        return 0
+
+
+def cmd_worker(args):
+    import multiprocessing as mp
+
+    from core.models import create_analysis_table
+    from core.services.jobqueue import default_worker_id
+
+    create_analysis_table()
+    base_id = args.worker_id or default_worker_id()
+    if args.concurrency <= 1:
+        _worker_main(base_id, args)
+        return 0
+
+    # 워커마다 별도 프로세스 (모델/torch 스레드를 프로세스 단위로 분리)
+    ctx = mp.get_context("spawn")
+    procs = [
+        ctx.Process(target=_worker_main, args=(f"{base_id}/{i}", args), daemon=False)
+        for i in range(args.concurrency)
+    ]
+    for p in procs:
+        p.start()
+    try:
+        for p in procs:
+            p.join()
+    except KeyboardInterrupt:
+        # 자식도 같은 SIGINT를 받아 분석 중인 작업을 대기열로 돌려놓고 종료
+        for p in procs:
+            p.join()
+    return 0
+
+
+# ---------- live ----------
+def cmd_live(args):
+    from core.services.realtime import RealtimeAnalyzer
+
+    def on_window(event):
+        if not args.quiet:
+            print(json.dumps(event, ensure_ascii=False), flush=True)
+
+    analyzer = RealtimeAnalyzer(
+        args.source,
+        on_window=on_window,
+        stride=args.stride,
+        history=args.history,
+        replay=False if args.fast else None,
+    )
+    if args.duration:
+        threading.Timer(args.duration, analyzer.stop, kwargs={"wait": False}).start()
+    try:
+        summary = analyzer.run()
+    except IOError as e:
+        print(f"[ERROR] {e}", file=sys.stderr)
+        return 2
+    except KeyboardInterrupt:
+        analyzer.stop(wait=False)
+        summary = analyzer.summary()
+    print(f"[SUMMARY] {json.dumps(summary, ensure_ascii=False)}", file=sys.stderr)
+    return 0
+
+
+# ---------- rescore ----------
+def cmd_rescore(args):
+    from core.models import create_analysis_table
+    from core.services.scoring import default_rules, rescore_history
+
+    create_analysis_table()
+    rules = default_rules()
+    for key in ("min_total_chunks", "low", "high"):
+        value = getattr(args, key)
+        if value is not None:
+            rules[key] = value
+    summary = rescore_history(rules, username=args.user, dry_run=args.dry_run)
+    print(json.dumps(dict(summary, rules=rules, dry_run=args.dry_run), ensure_ascii=False))
+    return 0
+
+
+# ---------- serve ----------
+def cmd_serve(args):
+    from core.services.api import serve
+
+    serve(args.host, args.port, args.workers)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="drovis", description="Drovis 명령줄 도구")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("analyze", help="영상 여러 개를 프로세스 풀로 일괄 분석")
+    p.add_argument("inputs", nargs="+", help="mp4 파일, 폴더 또는 glob 패턴")
+    p.add_argument("-r", "--recursive", action="store_true", help="하위 폴더까지 검색")
+    p.add_argument(
+        "-w", "--workers", type=int, default=Config.BATCH_WORKERS,
+        help="동시 분석 프로세스 수 (0 = CPU 코어 수, 기본: DROVIS_BATCH_WORKERS)",
+    )
+    p.add_argument("-o", "--output", default="-", help="결과 JSON lines 파일 (기본: stdout)")
+    p.add_argument("-u", "--user", default=None, help="분석 기록에 남길 사용자 이름")
+    p.add_argument("--no-save", action="store_true", help="분석 기록(DB)에 저장하지 않음")
+    p.add_argument("-q", "--quiet", action="store_true", help="영상별 진행 로그 생략")
+    p.set_defaults(func=cmd_analyze)
+
+    p = sub.add_parser("watch", help="폴더를 감시하며 새 영상을 자동 분석")
+    p.add_argument("folder", help="감시할 폴더")
+    p.add_argument("-r", "--recursive", action="store_true", help="하위 폴더까지 감시")
+    p.add_argument(
+        "-w", "--workers", type=int, default=Config.BATCH_WORKERS,
+        help="동시 분석 프로세스 수 (0 = CPU 코어 수)",
+    )
+    p.add_argument("-u", "--user", default=None, help="분석 기록에 남길 사용자 이름")
+    p.add_argument(
+        "--interval", type=float, default=Config.WATCH_INTERVAL_SEC, help="스캔 간격(초)"
+    )
+    p.add_argument(
+        "--settle", type=float, default=Config.WATCH_SETTLE_SEC,
+        help="이 시간(초) 동안 크기가 변하지 않아야 분석 시작",
+    )
+    p.add_argument(
+        "--checkpoint", default=None,
+        help="옮겨 올 이전 버전 JSON 체크포인트 (기본: data/watch_<해시>.json, 처리 상태는 분석 DB에 저장)",
+    )
+    p.set_defaults(func=cmd_watch)
+
+    p = sub.add_parser("enqueue", help="분산 작업 큐에 영상 등록 (cli.py worker가 처리)")
+    p.add_argument("inputs", nargs="+", help="mp4 파일, 폴더 또는 glob 패턴 (워커에서 보이는 경로)")
+    p.add_argument("-r", "--recursive", action="store_true", help="하위 폴더까지 검색")
+    p.add_argument("-u", "--user", default=None, help="분석 기록에 남길 사용자 이름")
+    p.add_argument("-p", "--priority", type=int, default=0, help="작을수록 먼저 분석")
+    p.add_argument(
+        "--max-attempts", type=int, default=Config.JOB_MAX_ATTEMPTS,
+        help="워커 종료/오류 시 최대 시도 횟수 (기본: DROVIS_JOB_MAX_ATTEMPTS)",
+    )
+    p.set_defaults(func=cmd_enqueue)
+
+    p = sub.add_parser("worker", help="분산 작업 큐에서 작업을 가져와 분석")
+    p.add_argument("-c", "--concurrency", type=int, default=1, help="이 노드에서 띄울 워커 프로세스 수")
+    p.add_argument("--worker-id", default=None, help="워커 이름 (기본: 호스트명:pid)")
+    p.add_argument(
+        "--lease", type=float, default=Config.JOB_LEASE_SEC,
+        help="임대 시간(초) — 이 시간 동안 heartbeat가 없으면 다른 워커가 재시도",
+    )
+    p.add_argument("--poll", type=float, default=Config.JOB_POLL_SEC, help="대기 작업 확인 간격(초)")
+    p.add_argument("--max-jobs", type=int, default=None, help="워커당 처리할 최대 작업 수")
+    p.add_argument("--exit-when-idle", action="store_true", help="남은 작업이 없으면 종료")
+    p.add_argument("--no-save", action="store_true", help="분석 기록(DB)에 저장하지 않음")
+    p.set_defaults(func=cmd_worker)
+
+    p = sub.add_parser("jobs", help="분산 작업 큐 상태 조회/취소")
+    p.add_argument("-s", "--status", default=None, help="queued/running/done/failed/cancelled")
+    p.add_argument("-n", "--limit", type=int, default=50, help="최근 작업 몇 개를 보여줄지")
+    p.add_argument("--cancel", type=int, default=None, metavar="JOB_ID", help="작업 취소")
+    p.set_defaults(func=cmd_jobs)
+
+    p = sub.add_parser("live", help="카메라/스트림/파일을 실시간으로 분석")
+    p.add_argument("source", help="카메라 번호(0), 스트림 URL(rtsp://...) 또는 mp4 파일(원래 fps로 재생)")
+    p.add_argument(
+        "--stride", type=int, default=Config.REALTIME_STRIDE, help="몇 프레임마다 윈도우 추론을 할지"
+    )
+    p.add_argument(
+        "--history", type=int, default=Config.REALTIME_HISTORY_WINDOWS,
+        help="위험도 계산에 쓰는 최근 윈도우 수",
+    )
+    p.add_argument("--duration", type=float, default=None, help="이 시간(초) 뒤 종료")
+    p.add_argument("--fast", action="store_true", help="파일을 재생 속도 대신 최대한 빨리 분석 (프레임 버리지 않음)")
+    p.add_argument("-q", "--quiet", action="store_true", help="윈도우별 결과 생략 (요약만)")
+    p.set_defaults(func=cmd_live)
+
+    p = sub.add_parser("rescore", help="저장된 윈도우 확률로 분석 기록의 위험도를 다시 계산")
+    p.add_argument("-u", "--user", default=None, help="이 사용자의 기록만 (기본: 전체)")
+    p.add_argument(
+        "--min-total", dest="min_total_chunks", type=int, default=None,
+        help="위험도를 계산할 최소 윈도우 수 (기본: DROVIS_SCORE_MIN_TOTAL_CHUNKS)",
+    )
+    p.add_argument("--low", type=float, default=None, help="행동 비율 하한 (기본: DROVIS_SCORE_SHARE_LOW)")
+    p.add_argument("--high", type=float, default=None, help="행동 비율 상한 (기본: DROVIS_SCORE_SHARE_HIGH)")
+    p.add_argument("--dry-run", action="store_true", help="결과만 보고 DB는 바꾸지 않음")
+    p.set_defaults(func=cmd_rescore)
+
+    p = sub.add_parser("serve", help="로컬 HTTP 분석 서비스 실행")
+    p.add_argument("--host", default=Config.API_HOST, help="바인드 주소 (기본: DROVIS_API_HOST)")
+    p.add_argument("--port", type=int, default=Config.API_PORT, help="포트 (기본: DROVIS_API_PORT)")
+    p.add_argument(
+        "-w", "--workers", type=int, default=Config.BATCH_WORKERS,
+        help="동시 분석 프로세스 수 (0 = CPU 코어 수)",
+    )
+    p.set_defaults(func=cmd_serve)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    # PyInstaller 등으로 빌드한 실행 파일에서도 spawn 작업 프로세스가 동작하도록
+    import multiprocessing
+    multiprocessing.freeze_support()
+    sys.exit(main())
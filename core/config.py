@@ -7,4 +7,97 @@ class Config:
     USER_DB_PATH = os.path.join(BASE_DIR, '..', 'database', 'users.db')
     ANALYSIS_DB_PATH = os.path.join(BASE_DIR, '..', 'database', 'analysis.db')
     UPLOAD_FOLDER = os.path.join(BASE_DIR, '..', 'uploads')
-    MODEL_FOLDER = os.path.join(BASE_DIR, '..', 'ai_models')
\ No newline at end of file
+    MODEL_FOLDER = os.path.join(BASE_DIR, '..', 'ai_models')
+    # SQLite 저널 모드 (여러 노드가 네트워크 공유 폴더의 DB를 쓰면 DELETE)
+    SQLITE_JOURNAL_MODE = os.getenv("DROVIS_SQLITE_JOURNAL_MODE", "WAL").upper()
+
+    # 추론 시 한 번에 모델에 넣는 윈도우 개수
+    INFER_BATCH_SIZE = int(os.getenv("DROVIS_INFER_BATCH_SIZE", "256"))
+
+    # 포즈 추출 병렬 프로세스 수 (1 = 직렬, 0 = CPU 코어 수)
+    POSE_WORKERS = int(os.getenv("DROVIS_POSE_WORKERS", "1"))
+    # 구간 분할 시 앞 구간과 겹쳐 읽는 워밍업 프레임 수 (트래킹 안정화용)
+    POSE_WARMUP_FRAMES = int(os.getenv("DROVIS_POSE_WARMUP_FRAMES", "30"))
+
+    # 영상 해시 기반 포즈/예측 결과 캐시
+    CACHE_ENABLED = os.getenv("DROVIS_CACHE_ENABLED", "1") == "1"
+    CACHE_FOLDER = os.path.join(UPLOAD_FOLDER, 'cache')
+    CACHE_MAX_BYTES = int(os.getenv("DROVIS_CACHE_MAX_BYTES", str(2 * 1024 ** 3)))
+
+    # 분석 파이프라인 방식: "batch" (전체 포즈 추출 후 추론) / "stream" (단계별 스레드 동시 실행)
+    PIPELINE_MODE = os.getenv("DROVIS_PIPELINE_MODE", "batch")
+    # stream 모드 단계 간 큐 크기 (디코딩 프레임 기준)
+    PIPELINE_QUEUE_SIZE = int(os.getenv("DROVIS_PIPELINE_QUEUE_SIZE", "16"))
+
+    # 슬라이딩 윈도우 간격 (1 = 모든 프레임마다 추론, 크면 빠르지만 보간으로 복원)
+    # 1만 기존 결과와 같음 — 1보다 크면 윈도우별 확률이 달라짐 (실측 오차는 predict.infer_sequence 참고)
+    # 최대 5 (predict.MAX_WINDOW_STRIDE) — 더 크면 경고 후 5로 제한
+    WINDOW_STRIDE = int(os.getenv("DROVIS_WINDOW_STRIDE", "1"))
+
+    # 정지 장면 건너뛰기: 축소 흑백 프레임에서 바뀐 픽셀 비율이 임계값 미만이면 MediaPipe 생략
+    MOTION_GATE = os.getenv("DROVIS_MOTION_GATE", "0") == "1"
+    MOTION_GATE_THRESHOLD = float(os.getenv("DROVIS_MOTION_GATE_THRESHOLD", "0.005"))
+    # 연속으로 건너뛸 수 있는 최대 프레임 수 (이후에는 강제로 다시 추출)
+    MOTION_GATE_MAX_SKIP = int(os.getenv("DROVIS_MOTION_GATE_MAX_SKIP", "30"))
+
+    # 포즈 추출 전 축소할 긴 변 길이 (0 = 원본 해상도)
+    POSE_TARGET_LONG_SIDE = int(os.getenv("DROVIS_POSE_TARGET_LONG_SIDE", "0"))
+    # 사람이 추적되면 직전 관절 주변 영역만 잘라서 MediaPipe에 전달
+    POSE_ROI_CROP = os.getenv("DROVIS_POSE_ROI_CROP", "0") == "1"
+
+    # 메인 창 표시 후 백그라운드에서 모델 미리 로드
+    PREWARM_MODEL = os.getenv("DROVIS_PREWARM_MODEL", "1") == "1"
+
+    # 일괄 분석 큐의 동시 분석 프로세스 수 (0 = CPU 코어 수)
+    BATCH_WORKERS = int(os.getenv("DROVIS_BATCH_WORKERS", "0"))
+    # 오래 실행되는 큐(serve / watch)에서 끝난 작업을 목록에 남겨 두는 시간(초)과 최대 개수
+    BATCH_FINISHED_TTL_SEC = float(os.getenv("DROVIS_BATCH_FINISHED_TTL_SEC", "3600"))
+    BATCH_MAX_FINISHED = int(os.getenv("DROVIS_BATCH_MAX_FINISHED", "1000"))
+
+    # 로컬 HTTP 분석 서비스 (python cli.py serve)
+    API_HOST = os.getenv("DROVIS_API_HOST", "127.0.0.1")
+    API_PORT = int(os.getenv("DROVIS_API_PORT", "8765"))
+    API_MAX_UPLOAD_BYTES = int(os.getenv("DROVIS_API_MAX_UPLOAD_BYTES", str(4 * 1024 ** 3)))
+    # 경로로 분석을 요청할 수 있는 폴더 목록 (os.pathsep 구분, 기본값은 업로드 폴더만)
+    API_VIDEO_ROOTS = [p for p in os.getenv("DROVIS_API_VIDEO_ROOTS", UPLOAD_FOLDER).split(os.pathsep) if p]
+    API_ACCESS_LOG = os.getenv("DROVIS_API_ACCESS_LOG", "1") == "1"
+
+    # 감시 폴더 수집 (python cli.py watch)
+    WATCH_INTERVAL_SEC = float(os.getenv("DROVIS_WATCH_INTERVAL_SEC", "2"))
+    # 크기/수정 시각이 이 시간 동안 변하지 않아야 녹화가 끝난 파일로 간주
+    WATCH_SETTLE_SEC = float(os.getenv("DROVIS_WATCH_SETTLE_SEC", "5"))
+    # 분석에 실패한 파일은 이 횟수까지 다시 시도 (파일이 바뀌면 처음부터 다시 셈)
+    WATCH_MAX_ATTEMPTS = int(os.getenv("DROVIS_WATCH_MAX_ATTEMPTS", "3"))
+
+    # 분산 워커 작업 큐 (python cli.py worker) — 작업 테이블은 분석 DB에 함께 저장
+    JOB_LEASE_SEC = float(os.getenv("DROVIS_JOB_LEASE_SEC", "60"))
+    JOB_MAX_ATTEMPTS = int(os.getenv("DROVIS_JOB_MAX_ATTEMPTS", "3"))
+    JOB_POLL_SEC = float(os.getenv("DROVIS_JOB_POLL_SEC", "2"))
+
+    # 실시간 분석 (python cli.py live) — 캡처 큐가 차면 가장 오래된 프레임부터 버림
+    REALTIME_QUEUE_SIZE = int(os.getenv("DROVIS_REALTIME_QUEUE_SIZE", "4"))
+    # 몇 프레임마다 윈도우 추론을 할지 / 위험도 계산에 쓰는 최근 윈도우 수
+    REALTIME_STRIDE = int(os.getenv("DROVIS_REALTIME_STRIDE", "1"))
+    REALTIME_HISTORY_WINDOWS = int(os.getenv("DROVIS_REALTIME_HISTORY_WINDOWS", "300"))
+
+    # 근거 이미지 썸네일 (근거 저장 시 또는 처음 볼 때 생성, 원본 옆 thumbs/ 폴더)
+    THUMBNAIL_WIDTH = int(os.getenv("DROVIS_THUMBNAIL_WIDTH", "960"))
+    # 근거 창에서 메모리에 유지할 썸네일 총 크기 (LRU)
+    THUMBNAIL_MEMORY_MB = int(os.getenv("DROVIS_THUMBNAIL_MEMORY_MB", "64"))
+
+    # 행동 이벤트 구간화 (윈도우 확률 → 라벨별 시작/끝 구간)
+    # 확률이 ENTER 이상이면 이벤트 시작, EXIT 미만으로 떨어질 때까지 유지 (히스테리시스)
+    EVENT_ENTER_PROB = float(os.getenv("DROVIS_EVENT_ENTER_PROB", "0.6"))
+    EVENT_EXIT_PROB = float(os.getenv("DROVIS_EVENT_EXIT_PROB", "0.4"))
+    EVENT_MIN_SEC = float(os.getenv("DROVIS_EVENT_MIN_SEC", "0.5"))        # 이보다 짧은 이벤트는 버림
+    EVENT_MERGE_GAP_SEC = float(os.getenv("DROVIS_EVENT_MERGE_GAP_SEC", "1.0"))  # 이 간격 이내 이벤트는 합침
+
+    # 위험도 규칙 (core/services/scoring.py) — 바꾼 뒤 python cli.py rescore로 기존 기록 재계산
+    SCORE_MIN_TOTAL_CHUNKS = int(os.getenv("DROVIS_SCORE_MIN_TOTAL_CHUNKS", "4"))
+    SCORE_SHARE_LOW = float(os.getenv("DROVIS_SCORE_SHARE_LOW", "0.20"))
+    SCORE_SHARE_HIGH = float(os.getenv("DROVIS_SCORE_SHARE_HIGH", "0.80"))
+
+    # 추론 백엔드 (eager / torchscript / onnx) — python tools/bench_backends.py로 비교
+    INFERENCE_BACKEND = os.getenv("DROVIS_INFERENCE_BACKEND", "eager").lower()
+    # PyTorch / ONNX Runtime 연산 스레드 수 (프로세스 여러 개로 병렬 분석할 때는 1 권장)
+    TORCH_THREADS = int(os.getenv("DROVIS_TORCH_THREADS", "1"))
@@ -1,11 +1,106 @@
 # core/db.py
+import os
 import sqlite3
+import threading
+from contextlib import contextmanager
+
 from core.config import Config
 
+STATEMENT_CACHE_SIZE = 256        # 연결별 prepared statement 캐시 크기
+BUSY_TIMEOUT_SEC = 30             # 다른 프로세스가 쓰는 중일 때 대기 시간
+JOURNAL_MODE = Config.SQLITE_JOURNAL_MODE
+
+_local = threading.local()
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(
+        path, timeout=BUSY_TIMEOUT_SEC, cached_statements=STATEMENT_CACHE_SIZE
+    )
+    # WAL: 읽기와 쓰기가 서로 막지 않음 / NORMAL: WAL에서 안전한 수준으로 fsync 줄임
+    # (네트워크 공유 폴더에서는 WAL이 동작하지 않으므로 DROVIS_SQLITE_JOURNAL_MODE=DELETE)
+    conn.execute(f"PRAGMA journal_mode={JOURNAL_MODE}")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA cache_size=-8192")          # 8 MiB 페이지 캐시
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA foreign_keys=ON")
+    return conn
+
+
+def get_connection(path: str) -> sqlite3.Connection:
+    """
+    스레드별로 재사용되는 연결 반환 (호출 측에서 close 하지 않음).
+    fork된 자식 프로세스는 부모의 연결을 쓰지 않고 새로 연결.
+    """
+    pool = getattr(_local, "pool", None)
+    if pool is None or _local.pid != os.getpid():
+        pool = _local.pool = {}
+        _local.depth = {}
+        _local.pid = os.getpid()
+
+    key = os.path.abspath(path)
+    conn = pool.get(key)
+    if conn is None:
+        conn = pool[key] = _connect(path)
+    return conn
+
+
+@contextmanager
+def transaction(path: str, immediate: bool = False):
+    """
+    풀 연결로 트랜잭션 실행 — 정상 종료 시 commit, 예외 시 rollback
+    immediate=True: 시작과 동시에 쓰기 잠금 (읽은 뒤 갱신하는 작업을 여러 프로세스가 경쟁할 때)
+    같은 스레드에서 안쪽에 다시 열면 SAVEPOINT로 실행 — 바깥 트랜잭션은 바깥 블록이 끝날 때만
+    commit/rollback 되고, 안쪽 예외는 안쪽 변경만 되돌림 (안쪽 immediate는 바깥 잠금을 따름)
+    """
+    conn = get_connection(path)
+    key = os.path.abspath(path)
+    depth = _local.depth.get(key, 0)
+    savepoint = f"sp_{depth}"
+    if depth:
+        conn.execute(f"SAVEPOINT {savepoint}")
+    elif not conn.in_transaction:
+        # 명시적으로 시작해야 안쪽 SAVEPOINT의 RELEASE가 전체를 commit 하지 않음
+        conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+    _local.depth[key] = depth + 1
+    try:
+        yield conn
+        if depth:
+            conn.execute(f"RELEASE {savepoint}")
+        else:
+            conn.commit()
+    except BaseException:
+        if depth:
+            conn.execute(f"ROLLBACK TO {savepoint}")
+            conn.execute(f"RELEASE {savepoint}")
+        else:
+            conn.rollback()
+        raise
+    finally:
+        _local.depth[key] = depth
+
+
+def close_thread_connections() -> None:
+    """현재 스레드가 가진 풀 연결을 모두 닫음 (워커 스레드 종료 시)"""
+    pool = getattr(_local, "pool", None) or {}
+    for conn in pool.values():
+        conn.close()
+    _local.pool = {}
+    _local.depth = {}
+
 
 def get_user_connection():
-    return sqlite3.connect(Config.USER_DB_PATH)
+    return get_connection(Config.USER_DB_PATH)
 
 
 def get_analysis_connection():
-    return sqlite3.connect(Config.ANALYSIS_DB_PATH)
+    return get_connection(Config.ANALYSIS_DB_PATH)
+
+
+def user_db():
+    return transaction(Config.USER_DB_PATH)
+
+
+def analysis_db(immediate: bool = False):
+    return transaction(Config.ANALYSIS_DB_PATH, immediate)
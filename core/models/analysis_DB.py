@@ -1,21 +1,128 @@
 # core/models/analysis_DB.py
-from core.db import get_analysis_connection
+import sqlite3
+
+from core.db import analysis_db
+
+# 기존 analysis 테이블에 나중에 추가된 컬럼 (이전 DB 파일은 ALTER TABLE로 보강)
+_ADDED_COLUMNS = {
+    "decision_id": "TEXT",
+    "payload": "TEXT",          # 정규화하지 않은 나머지 필드(JSON)
+    "video_hash": "TEXT",       # 영상 내용 SHA-256 (감시 폴더 중복 확인용)
+}
 
 
 def create_analysis_table():
-    conn = get_analysis_connection()
-    cur = conn.cursor()
-    cur.execute(
+    with analysis_db() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS analysis (
+    			    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    			    user_id TEXT NOT NULL,
+    			    filename TEXT NOT NULL,
+    			    result TEXT NOT NULL,
+    			    uploaded_at TEXT NOT NULL,
+    			    memo TEXT
+    				);
+        """
+        )
+
+        cur.execute("PRAGMA table_info(analysis)")
+        existing = {row[1] for row in cur.fetchall()}
+        for name, col_type in _ADDED_COLUMNS.items():
+            if name not in existing:
+                cur.execute(f"ALTER TABLE analysis ADD COLUMN {name} {col_type}")
+        if "video_hash" not in existing:
+            # 이전 기록은 payload(JSON)에 있던 해시로 채움 (일괄/감시 폴더 분석 기록)
+            try:
+                cur.execute(
+                    "UPDATE analysis SET video_hash = json_extract(payload, '$.video_hash') "
+                    "WHERE payload IS NOT NULL"
+                )
+            except sqlite3.OperationalError:
+                pass            # JSON1 확장 없는 SQLite
+
+        # 근거 이미지 (분석 기록 1 : N)
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS analysis_evidence (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                analysis_id INTEGER NOT NULL REFERENCES analysis(id) ON DELETE CASCADE,
+                label TEXT NOT NULL,
+                frame_idx INTEGER,
+                timestamp_sec REAL,
+                image_path TEXT
+            )
+        """
+        )
+
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_analysis_user_uploaded ON analysis(user_id, uploaded_at)"
+        )
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_analysis_decision ON analysis(decision_id)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_analysis_video_hash ON analysis(video_hash)")
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_evidence_analysis ON analysis_evidence(analysis_id)"
+        )
+
+        # 분산 워커 작업 큐 (core/services/jobqueue.py) — 임대(lease) 만료 시 다른 워커가 재시도
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS analysis_jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                video_path TEXT NOT NULL,
+                user_id TEXT,
+                video_hash TEXT,
+                priority INTEGER NOT NULL DEFAULT 0,
+                status TEXT NOT NULL DEFAULT 'queued',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL DEFAULT 3,
+                available_at REAL NOT NULL DEFAULT 0,
+                worker_id TEXT,
+                lease_until REAL,
+                heartbeat_at REAL,
+                cancel_requested INTEGER NOT NULL DEFAULT 0,
+                record_id INTEGER,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL
+            )
+        """
+        )
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_jobs_claim ON analysis_jobs(status, priority, id)"
+        )
+
+        # 감시 폴더 처리 상태 (core/services/watcher.py) — 파일 1개 = 행 1개, 상태가 바뀐 파일의 행만 갱신
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS watch_files (
+                folder TEXT NOT NULL,
+                rel_path TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                sha256 TEXT,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                record_id INTEGER,
+                duplicate_of TEXT,
+                message TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (folder, rel_path)
+            )
+        """
+        )
+
+        # 윈도우별 확률 (float16 BLOB, 분석 기록 1 : 1) — 규칙을 바꿔 재채점할 때 사용
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS analysis_probs (
+                analysis_id INTEGER PRIMARY KEY REFERENCES analysis(id) ON DELETE CASCADE,
+                n_windows INTEGER NOT NULL,
+                n_classes INTEGER NOT NULL,
+                probs BLOB NOT NULL
+            )
         """
-        CREATE TABLE IF NOT EXISTS analysis (
-			    id INTEGER PRIMARY KEY AUTOINCREMENT,
-			    user_id TEXT NOT NULL,
-			    filename TEXT NOT NULL,
-			    result TEXT NOT NULL,
-			    uploaded_at TEXT NOT NULL,
-			    memo TEXT
-				);
-    """
-    )
-    conn.commit()
-    conn.close()
+        )
@@ -0,0 +1,186 @@
+# core/models/backends.py
+# LSTMModel 추론 백엔드: eager(PyTorch) / torchscript / onnx(ONNX Runtime CPU)
+#  - 모두 lstm_model.pt 가중치에서 만들어짐 (torchscript/onnx는 처음 사용할 때 변환해 저장)
+#  - 입력: (N, WINDOW, 66) float32 numpy, 출력: (N, 클래스 수) 로짓 numpy
+#  - 배포마다 DROVIS_INFERENCE_BACKEND로 선택 (python tools/bench_backends.py로 속도/일치 여부 확인)
+import hashlib
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+
+import numpy as np
+import torch
+
+from core.config import Config
+from core.models.lstm_model import LSTMModel
+
+EXPORT_FOLDER = os.path.join(Config.CACHE_FOLDER, "models")
+EXAMPLE_SHAPE = (2, 30, 66)               # 변환용 예시 입력 (배치 크기는 동적)
+
+
+def load_eager_model(model_path: str, device: torch.device) -> LSTMModel:
+    model = LSTMModel()
+    state = torch.load(model_path, map_location=device)
+    model.load_state_dict(state)
+    model.to(device)
+    model.eval()
+    return model
+
+
+def _weights_version(model_path: str) -> str:
+    h = hashlib.sha256()
+    with open(model_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()[:16]
+
+
+def _export_path(model_path: str, suffix: str) -> str:
+    stem = os.path.splitext(os.path.basename(model_path))[0]
+    return os.path.join(EXPORT_FOLDER, f"{stem}.{_weights_version(model_path)}.{suffix}")
+
+
+class InferenceBackend(ABC):
+    name = "base"
+
+    @abstractmethod
+    def __call__(self, windows: np.ndarray) -> np.ndarray:
+        """(N, WINDOW, 66) float32 → (N, 클래스 수) 로짓"""
+
+
+class EagerBackend(InferenceBackend):
+    name = "eager"
+
+    def __init__(self, model, device: torch.device):
+        self.model = model
+        self.device = device
+
+    def __call__(self, windows):
+        with torch.no_grad():
+            return self.model(torch.from_numpy(windows).to(self.device)).cpu().numpy()
+
+
+class TorchScriptBackend(EagerBackend):
+    name = "torchscript"
+
+    @staticmethod
+    def export(model: LSTMModel, path: str, device: torch.device):
+        example = torch.zeros(EXAMPLE_SHAPE, device=device)
+        with torch.no_grad():
+            traced = torch.jit.freeze(torch.jit.trace(model, example))
+        torch.jit.save(traced, path)
+
+    @classmethod
+    def load(cls, path: str, device: torch.device):
+        return cls(torch.jit.load(path, map_location=device), device)
+
+
+class OnnxBackend(InferenceBackend):
+    """ONNX Runtime CPU (변환에는 onnx, 실행에는 onnxruntime 패키지 필요)"""
+    name = "onnx"
+
+    def __init__(self, session):
+        self.session = session
+        self.input_name = session.get_inputs()[0].name
+
+    @staticmethod
+    def export(model: LSTMModel, path: str, device: torch.device):
+        example = torch.zeros(EXAMPLE_SHAPE, device=device)
+        torch.onnx.export(
+            model, example, path,
+            input_names=["windows"], output_names=["logits"],
+            dynamic_axes={"windows": {0: "batch"}, "logits": {0: "batch"}},
+            opset_version=17,
+            dynamo=False,
+        )
+
+    @classmethod
+    def load(cls, path: str, device: torch.device, threads: int = 1):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = max(1, int(threads))
+        options.inter_op_num_threads = 1
+        return cls(ort.InferenceSession(path, options, providers=["CPUExecutionProvider"]))
+
+    def __call__(self, windows):
+        return self.session.run(None, {self.input_name: windows})[0]
+
+
+BACKENDS = {
+    "eager": EagerBackend,
+    "torchscript": TorchScriptBackend,
+    "onnx": OnnxBackend,
+}
+_SUFFIX = {"torchscript": "ts", "onnx": "onnx"}
+
+
+def load_backend(
+    name: str,
+    model_path: str,
+    device: Optional[torch.device] = None,
+    threads: int = Config.TORCH_THREADS,
+) -> InferenceBackend:
+    """
+    추론 백엔드 생성. torchscript/onnx 변환 파일이 없으면 lstm_model.pt에서 변환해 저장.
+    변환/로드에 실패하면 예외 (호출한 쪽에서 eager로 대체)
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"알 수 없는 추론 백엔드: {name} (가능: {', '.join(BACKENDS)})")
+    device = device or torch.device("cpu")
+    torch.set_num_threads(max(1, int(threads)))
+    if name == "eager":
+        return EagerBackend(load_eager_model(model_path, device), device)
+
+    if name == "onnx":
+        device = torch.device("cpu")          # ONNX Runtime은 CPU 전용으로 사용
+    cls = BACKENDS[name]
+    path = _export_path(model_path, _SUFFIX[name])
+    if not os.path.exists(path):
+        os.makedirs(EXPORT_FOLDER, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        cls.export(load_eager_model(model_path, device), tmp, device)
+        os.replace(tmp, path)
+    if name == "onnx":
+        return cls.load(path, device, threads)
+    return cls.load(path, device)
+
+
+# ---------- 일치 여부 확인 / 속도 측정 (tools/bench_backends.py) ----------
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    e = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return e / e.sum(axis=1, keepdims=True)
+
+
+def run_batches(backend: InferenceBackend, windows: np.ndarray, batch_size: int) -> np.ndarray:
+    return np.concatenate(
+        [backend(np.ascontiguousarray(windows[s:s + batch_size])) for s in range(0, len(windows), batch_size)]
+    )
+
+
+def check_parity(
+    backend: InferenceBackend, reference: InferenceBackend, windows: np.ndarray, batch_size: int
+) -> Dict[str, float]:
+    """reference(eager) 대비 로짓/확률 최대 오차와 argmax 일치율"""
+    out = run_batches(backend, windows, batch_size)
+    ref = run_batches(reference, windows, batch_size)
+    return {
+        "max_abs_logit_diff": float(np.abs(out - ref).max()),
+        "max_abs_prob_diff": float(np.abs(_softmax(out) - _softmax(ref)).max()),
+        "argmax_agreement": float((out.argmax(axis=1) == ref.argmax(axis=1)).mean()),
+    }
+
+
+def benchmark(
+    backend: InferenceBackend, windows: np.ndarray, batch_size: int, min_seconds: float = 2.0
+) -> float:
+    """windows/sec (워밍업 1회 후 min_seconds 이상 반복 측정)"""
+    run_batches(backend, windows[:batch_size], batch_size)
+    done, started = 0, time.perf_counter()
+    while True:
+        run_batches(backend, windows, batch_size)
+        done += len(windows)
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            return done / elapsed
@@ -1,6 +1,19 @@
+import importlib
+
 from .auth import register_user, verify_user
 from .save_analysis import save_analysis_result
 
 # from .history import fetch_user_history
-from .preprocess import process_pose
-from .predict import predict_from_video
+
+# torch / cv2 / mediapipe를 불러오는 모듈은 실제 사용 시점에 import (앱 시작 속도)
+_LAZY_EXPORTS = {
+    "process_pose": ".preprocess",
+    "predict_from_video": ".predict",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        module = importlib.import_module(_LAZY_EXPORTS[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
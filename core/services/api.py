@@ -0,0 +1,425 @@
+# core/services/api.py
+# 로컬 HTTP 분석 서비스 (표준 라이브러리 http.server 기반)
+#
+#   POST   /jobs                    분석 요청 — JSON {"path": "...", "priority": 0}
+#                                   또는 영상 바이트 업로드 (Content-Type: video/mp4, ?filename=clip.mp4)
+#   GET    /jobs                    내 작업 목록
+#   GET    /jobs/<id>               작업 상태/결과
+#   GET    /jobs/<id>/stream        상태가 바뀔 때마다 JSON 한 줄씩 전송 (끝나면 종료)
+#   DELETE /jobs/<id>               작업 취소
+#   GET    /history?cursor=&limit=  분석 기록 페이지 (최신순)
+#   GET    /evidence/<기록 id>/<n>   내 분석 기록의 n번째 근거 이미지
+#   GET    /health
+#
+# 인증은 HTTP Basic (verify_user). 분석은 BatchQueue 프로세스 풀에서 실행되며
+# 모델은 워커 프로세스마다 한 번만 로드됨. 경로 요청은 DROVIS_API_VIDEO_ROOTS(기본: 업로드 폴더)
+# 안의 영상만 허용하고, 업로드한 영상은 분석이 끝나면 삭제.
+import base64
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import threading
+import time
+import uuid
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+from core.config import Config
+from core.services.auth import verify_user
+from core.services.batch import BatchQueue, VIDEO_EXTENSIONS
+from core.services.history import load_evidence, load_page
+
+UPLOAD_FOLDER = Config.UPLOAD_FOLDER
+EVIDENCE_FOLDER = os.path.join(UPLOAD_FOLDER, "evidence")
+API_UPLOAD_FOLDER = os.path.join(UPLOAD_FOLDER, "api")
+
+AUTH_CACHE_SEC = 300              # bcrypt 검증 결과 재사용 시간
+MAX_JSON_BYTES = 64 * 1024        # JSON 요청 본문 최대 크기 (경로 요청은 몇백 바이트)
+STREAM_HEARTBEAT_SEC = 15         # 상태 변화가 없어도 이 간격으로 현재 상태 재전송
+_CHUNK = 1 << 20
+_SAFE_NAME_RE = re.compile(r"[^0-9A-Za-z가-힣._-]+")
+
+
+class AnalysisService:
+    """BatchQueue + 작업별 변경 알림 (상태 스트리밍용)"""
+
+    def __init__(self, workers: Optional[int] = None):
+        self._cond = threading.Condition()
+        self._versions: Dict[int, int] = {}
+        self._uploads: Dict[int, str] = {}        # 작업 id → 업로드로 받은 영상 경로 (끝나면 삭제)
+        self.queue = BatchQueue(
+            workers=workers, on_update=self._on_update, prewarm_workers=True,
+            finished_ttl=Config.BATCH_FINISHED_TTL_SEC, max_finished=Config.BATCH_MAX_FINISHED,
+        )
+
+    def _on_update(self, job):
+        with self._cond:
+            if job.finished:
+                # 끝난 작업은 더 바뀌지 않음 — 대기 중인 스트림은 버전이 달라져 깨어남
+                self._versions.pop(job.id, None)
+            else:
+                self._versions[job.id] = self._versions.get(job.id, 0) + 1
+            self._cond.notify_all()
+        if job.finished:
+            self._remove_upload(job.id)
+
+    def _remove_upload(self, job_id: int):
+        with self._cond:
+            path = self._uploads.pop(job_id, None)
+        if path is not None:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def submit(self, path: str, username: str, priority: int = 0, uploaded: bool = False):
+        job = self.queue.get(self.queue.add(path, priority, username=username))
+        if uploaded:
+            with self._cond:
+                self._uploads[job.id] = path
+            if job.finished:                     # 등록 전에 이미 끝났으면 바로 정리
+                self._remove_upload(job.id)
+        return job
+
+    def get(self, job_id: int, username: str):
+        job = self.queue.get(job_id)
+        if job is None or job.username != username:
+            return None
+        return job
+
+    def jobs(self, username: str):
+        return [j for j in self.queue.jobs() if j.username == username]
+
+    def version(self, job_id: int) -> int:
+        with self._cond:
+            return self._versions.get(job_id, 0)
+
+    def wait_change(self, job_id: int, version: int, timeout: float) -> int:
+        with self._cond:
+            self._cond.wait_for(lambda: self._versions.get(job_id, 0) != version, timeout)
+            return self._versions.get(job_id, 0)
+
+    def shutdown(self):
+        self.queue.shutdown(wait=False)
+
+
+# ---------- 인증 ----------
+_auth_cache: Dict[tuple, float] = {}
+_auth_lock = threading.Lock()
+
+
+def _check_credentials(username: str, password: str) -> bool:
+    key = (username, hashlib.sha256(password.encode()).hexdigest())
+    now = time.monotonic()
+    with _auth_lock:
+        expires = _auth_cache.get(key)
+        if expires is not None:
+            if expires > now:
+                return True
+            del _auth_cache[key]
+    if not verify_user(username, password):
+        return False
+    with _auth_lock:
+        # 만료된 항목 정리 (새 항목을 넣을 때만 — 캐시 적중 경로는 그대로)
+        for stale in [k for k, exp in _auth_cache.items() if exp <= now]:
+            del _auth_cache[stale]
+        _auth_cache[key] = now + AUTH_CACHE_SEC
+    return True
+
+
+# ---------- 경로 ----------
+def _inside(path: str, root: str) -> bool:
+    path, root = os.path.realpath(path), os.path.realpath(root)
+    return os.path.commonpath([path, root]) == root
+
+
+def _path_allowed(path: str) -> bool:
+    return any(_inside(path, root) for root in Config.API_VIDEO_ROOTS)
+
+
+def _with_evidence_urls(evidence, record_id: Optional[int]) -> list:
+    """근거 항목마다 url을 붙인 사본 (작업 결과에 공유된 원래 dict는 건드리지 않음)"""
+    return [
+        dict(ev, url=f"/evidence/{record_id}/{i}" if record_id is not None else None)
+        for i, ev in enumerate(evidence or [])
+    ]
+
+
+def _job_json(job) -> dict:
+    data = job.to_dict()
+    if "evidence" in data:
+        data["evidence"] = _with_evidence_urls(data["evidence"], job.record_id)
+    return data
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    server_version = "Drovis/1"
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def service(self) -> AnalysisService:
+        return self.server.service
+
+    # ---------- 응답 ----------
+    def send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_error_json(self, status, message):
+        # 읽지 않은 요청 본문이 남아 있을 수 있으므로 연결은 재사용하지 않음
+        self.close_connection = True
+        self.send_json(status, {"success": False, "message": message})
+
+    def authenticate(self) -> Optional[str]:
+        header = self.headers.get("Authorization", "")
+        if header.startswith("Basic "):
+            try:
+                username, _, password = base64.b64decode(header[6:]).decode("utf-8").partition(":")
+            except (ValueError, UnicodeDecodeError):
+                username, password = "", ""
+            if username and _check_credentials(username, password):
+                return username
+        body = b'{"success": false, "message": "authentication required"}'
+        self.close_connection = True
+        self.send_response(HTTPStatus.UNAUTHORIZED)
+        self.send_header("WWW-Authenticate", 'Basic realm="Drovis"')
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        return None
+
+    def log_message(self, fmt, *args):
+        if Config.API_ACCESS_LOG:
+            super().log_message(fmt, *args)
+
+    # ---------- 라우팅 ----------
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/health":
+            return self.send_json(HTTPStatus.OK, {"success": True})
+        username = self.authenticate()
+        if username is None:
+            return
+
+        if url.path == "/jobs":
+            return self.send_json(
+                HTTPStatus.OK, {"jobs": [_job_json(j) for j in self.service.jobs(username)]}
+            )
+        m = re.fullmatch(r"/jobs/(\d+)(/stream)?", url.path)
+        if m:
+            job = self.service.get(int(m.group(1)), username)
+            if job is None:
+                return self.send_error_json(HTTPStatus.NOT_FOUND, "job not found")
+            if m.group(2):
+                return self.stream_job(job)
+            return self.send_json(HTTPStatus.OK, _job_json(job))
+        if url.path == "/history":
+            return self.get_history(username, parse_qs(url.query))
+        m = re.fullmatch(r"/evidence/(\d+)/(\d+)", url.path)
+        if m:
+            return self.send_evidence(username, int(m.group(1)), int(m.group(2)))
+        self.send_error_json(HTTPStatus.NOT_FOUND, "not found")
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        username = self.authenticate()
+        if username is None:
+            return
+        if url.path != "/jobs":
+            return self.send_error_json(HTTPStatus.NOT_FOUND, "not found")
+
+        content_type = self.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        uploaded = content_type != "application/json"
+        try:
+            if not uploaded:
+                path, priority = self.read_path_request()
+            else:
+                path, priority = self.read_upload(parse_qs(url.query)), 0
+        except ValueError as e:
+            return self.send_error_json(HTTPStatus.BAD_REQUEST, str(e))
+        except PermissionError as e:
+            return self.send_error_json(HTTPStatus.FORBIDDEN, str(e))
+        except OverflowError as e:
+            return self.send_error_json(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, str(e))
+
+        job = self.service.submit(path, username, priority, uploaded=uploaded)
+        payload = _job_json(job)
+        payload["status_url"] = f"/jobs/{job.id}"
+        payload["stream_url"] = f"/jobs/{job.id}/stream"
+        self.send_json(HTTPStatus.ACCEPTED, payload)
+
+    def do_DELETE(self):
+        username = self.authenticate()
+        if username is None:
+            return
+        m = re.fullmatch(r"/jobs/(\d+)", urlparse(self.path).path)
+        job = self.service.get(int(m.group(1)), username) if m else None
+        if job is None:
+            return self.send_error_json(HTTPStatus.NOT_FOUND, "job not found")
+        cancelled = self.service.queue.cancel(job.id)
+        self.send_json(HTTPStatus.OK, {"success": cancelled, **_job_json(job)})
+
+    # ---------- 요청 본문 ----------
+    def content_length(self) -> Optional[int]:
+        """Content-Length 헤더 (없으면 None, 숫자가 아니거나 음수면 ValueError)"""
+        raw = self.headers.get("Content-Length")
+        if raw is None:
+            return None
+        try:
+            length = int(raw)
+        except ValueError:
+            raise ValueError("invalid Content-Length")
+        if length < 0:
+            raise ValueError("invalid Content-Length")
+        return length
+
+    def read_body_json(self) -> dict:
+        length = self.content_length() or 0
+        if length > MAX_JSON_BYTES:
+            raise OverflowError("request body is too large")
+        try:
+            data = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            raise ValueError("invalid JSON body")
+        if not isinstance(data, dict):
+            raise ValueError("JSON object expected")
+        return data
+
+    def read_path_request(self):
+        data = self.read_body_json()
+        path = data.get("path")
+        if not isinstance(path, str) or not path:
+            raise ValueError("'path' is required")
+        # 허용 폴더를 먼저 확인 (밖의 경로는 존재 여부도 알려주지 않음)
+        if not _path_allowed(path):
+            raise PermissionError("path is outside DROVIS_API_VIDEO_ROOTS")
+        if not path.lower().endswith(VIDEO_EXTENSIONS) or not os.path.isfile(path):
+            raise ValueError(f"video file not found: {path}")
+        try:
+            priority = int(data.get("priority", 0))
+        except (TypeError, ValueError):
+            raise ValueError("'priority' must be an integer")
+        return path, priority
+
+    def read_upload(self, query) -> str:
+        length = self.content_length()
+        if length is None:
+            raise ValueError("Content-Length is required for uploads")
+        if length <= 0:
+            raise ValueError("empty upload")
+        if length > Config.API_MAX_UPLOAD_BYTES:
+            raise OverflowError("upload is too large")
+
+        name = (query.get("filename") or [self.headers.get("X-Filename", "upload.mp4")])[0]
+        name = _SAFE_NAME_RE.sub("_", os.path.basename(name)) or "upload.mp4"
+        if not name.lower().endswith(VIDEO_EXTENSIONS):
+            raise ValueError("only mp4 uploads are supported")
+
+        os.makedirs(API_UPLOAD_FOLDER, exist_ok=True)
+        # 같은 이름의 업로드끼리 덮어쓰지 않도록 고유 접두어 추가
+        path = os.path.join(API_UPLOAD_FOLDER, f"{uuid.uuid4().hex[:12]}_{name}")
+        remaining = length
+        with open(path, "wb") as f:
+            while remaining > 0:
+                block = self.rfile.read(min(_CHUNK, remaining))
+                if not block:
+                    break
+                f.write(block)
+                remaining -= len(block)
+        if remaining:
+            os.remove(path)
+            raise ValueError("upload ended before Content-Length bytes were received")
+        return path
+
+    # ---------- 개별 응답 ----------
+    def stream_job(self, job):
+        """Transfer-Encoding: chunked로 상태가 바뀔 때마다 JSON 한 줄(NDJSON) 전송"""
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        def write_chunk(data: bytes):
+            self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+        try:
+            while True:
+                version = self.service.version(job.id)
+                write_chunk((json.dumps(_job_json(job), ensure_ascii=False) + "\n").encode("utf-8"))
+                if job.finished:
+                    break
+                self.service.wait_change(job.id, version, STREAM_HEARTBEAT_SEC)
+            write_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+    def get_history(self, username, query):
+        cursor = (query.get("cursor") or [None])[0]
+        try:
+            limit = min(200, max(1, int((query.get("limit") or ["50"])[0])))
+            records, next_cursor = load_page(username, cursor, limit)
+        except ValueError as e:
+            return self.send_error_json(HTTPStatus.BAD_REQUEST, str(e))
+        for rec in records:
+            if isinstance(rec.get("pose_stats"), dict):
+                rec["pose_stats"].pop("frame_index_map", None)
+            rec["evidence"] = _with_evidence_urls(rec.get("evidence"), rec.get("id"))
+        self.send_json(HTTPStatus.OK, {"records": records, "next_cursor": next_cursor})
+
+    def send_evidence(self, username, record_id, index):
+        # 내 기록의 근거만 (다른 사용자의 기록이면 없는 것과 같은 응답)
+        evidence = load_evidence(record_id, username) or []
+        path = evidence[index].get("image_path") if index < len(evidence) else None
+        # 저장된 경로가 evidence 폴더 밖을 가리키면 거부
+        if not path or not _inside(path, EVIDENCE_FOLDER) or not os.path.isfile(path):
+            return self.send_error_json(HTTPStatus.NOT_FOUND, "evidence not found")
+        size = os.path.getsize(path)
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", mimetypes.guess_type(path)[0] or "application/octet-stream")
+        self.send_header("Content-Length", str(size))
+        self.send_header("Cache-Control", "private, max-age=3600")
+        self.end_headers()
+        with open(path, "rb") as f:
+            while True:
+                block = f.read(_CHUNK)
+                if not block:
+                    break
+                self.wfile.write(block)
+
+
+class ApiServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, service: AnalysisService):
+        super().__init__(address, ApiHandler)
+        self.service = service
+
+
+def serve(host: Optional[str] = None, port: Optional[int] = None, workers: Optional[int] = None):
+    """블로킹 실행. Ctrl+C로 종료."""
+    from core.models import create_analysis_table, create_user_table
+
+    create_user_table()
+    create_analysis_table()
+
+    service = AnalysisService(workers=workers)
+    server = ApiServer((host or Config.API_HOST, port or Config.API_PORT), service)
+    print(f"[INFO] Drovis API: http://{server.server_address[0]}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
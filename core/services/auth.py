@@ -1,31 +1,26 @@
 import sqlite3
 import bcrypt
-from core.db import get_user_connection
+from core.db import user_db
 
 # 회원가입
 def register_user(username, password, email):
-    conn = get_user_connection()     # DB 연결
-    cur = conn.cursor()
     hashed_pw = bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
     try:
-        cur.execute(
-            "INSERT INTO users (username, password, email) VALUES (?, ?, ?)",
-            (username, hashed_pw, email),
-        )
-        conn.commit()
+        with user_db() as conn:     # DB 연결 (스레드별 풀)
+            conn.execute(
+                "INSERT INTO users (username, password, email) VALUES (?, ?, ?)",
+                (username, hashed_pw, email),
+            )
         return True, "회원가입 성공"
     except sqlite3.IntegrityError:
         return False, "이미 존재하는 아이디 또는 이메일"
-    finally:
-        conn.close()
 
 # 로그인 검증
 def verify_user(username, password):
-    conn = get_user_connection()     # DB 연결
-    cur = conn.cursor()
-    cur.execute("SELECT password FROM users WHERE username = ?", (username,))
-    row = cur.fetchone()
-    conn.close()
+    with user_db() as conn:     # DB 연결 (스레드별 풀)
+        row = conn.execute(
+            "SELECT password FROM users WHERE username = ?", (username,)
+        ).fetchone()
 
     # 입력된 비밀번호화 해시 비교
     if row and bcrypt.checkpw(password.encode(), row[0].encode()):
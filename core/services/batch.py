@@ -0,0 +1,410 @@
+# core/services/batch.py
+# 여러 영상을 우선순위 큐에 모아 프로세스 풀에서 동시에 분석 (취소/우선순위 변경 지원)
+import heapq
+import itertools
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from core.config import Config
+
+BATCH_WORKERS = Config.BATCH_WORKERS
+VIDEO_EXTENSIONS = (".mp4",)
+
+# 작업 상태
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+_progress_queue = None            # 워커 프로세스 안에서 진행 이벤트를 부모로 보내는 큐
+
+
+def _init_worker(progress_queue, prewarm=False, stdout_to_stderr=False):
+    global _progress_queue
+    _progress_queue = progress_queue
+    # Ctrl+C는 부모 프로세스가 받아 큐를 정리 (워커가 작업 도중 같이 죽지 않도록)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if stdout_to_stderr:
+        # 분석 로그(DEBUG 출력)가 부모의 stdout 결과(JSON lines 등)와 섞이지 않도록
+        sys.stdout = sys.stderr
+    if prewarm:
+        # 첫 작업을 받기 전에 torch/mediapipe와 모델을 미리 로드
+        from core.services.predict import get_model
+
+        get_model()
+
+
+# 워커 프로세스: 모델은 프로세스마다 한 번만 로드되어 이후 작업에서 재사용
+def _analyze(job_id: int, video_path: str, username: Optional[str], video_hash: Optional[str] = None) -> dict:
+    from core.services.predict import predict_from_video
+
+    def report(event):
+        if _progress_queue is not None:
+            _progress_queue.put((job_id, event))
+
+    try:
+        return predict_from_video(video_path, username, progress=report, video_hash=video_hash)
+    except Exception as e:
+        return {"success": False, "message": f"분석 실패: {str(e)}"}
+
+
+# 기록 저장 후 작업 목록에 남겨 둘 결과 (윈도우별 확률, 프레임 매핑처럼 큰 필드는 제외)
+def _slim_result(result: dict) -> dict:
+    slim = {k: v for k, v in result.items() if k != "window_probs"}
+    if isinstance(slim.get("pose_stats"), dict):
+        slim["pose_stats"] = {k: v for k, v in slim["pose_stats"].items() if k != "frame_index_map"}
+    return slim
+
+
+def default_workers() -> int:
+    return BATCH_WORKERS if BATCH_WORKERS > 0 else (os.cpu_count() or 1)
+
+
+def list_videos(folder: str, recursive: bool = False) -> List[str]:
+    """폴더 안의 분석 대상 영상 경로 (이름순)"""
+    found = []
+    for root, dirs, files in os.walk(folder):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(VIDEO_EXTENSIONS):
+                found.append(os.path.join(root, name))
+        if not recursive:
+            break
+    return found
+
+
+class BatchJob:
+    def __init__(
+        self,
+        job_id: int,
+        path: str,
+        priority: int,
+        username: Optional[str] = None,
+        video_hash: Optional[str] = None,
+    ):
+        self.id = job_id
+        self.username = username
+        self.video_hash = video_hash                # 미리 계산한 영상 SHA-256 (없으면 None)
+        self.path = path
+        self.filename = os.path.basename(path)
+        self.priority = priority
+        self.state = QUEUED
+        self.progress: Optional[Dict] = None       # 마지막 진행 이벤트 (core.services.progress)
+        self.result: Optional[dict] = None         # predict_from_video 반환값 (_slim_result)
+        self.message: Optional[str] = None         # 실패 사유
+        self.record_id: Optional[int] = None       # 저장된 분석 기록 id
+        self.cancel_requested = False
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.state in (DONE, FAILED, CANCELLED)
+
+    def to_dict(self) -> Dict:
+        """JSON 직렬화용 요약 (frame_index_map처럼 큰 필드는 제외)"""
+        data = {
+            "job_id": self.id,
+            "path": self.path,
+            "filename": self.filename,
+            "status": self.state,
+            "priority": self.priority,
+            "record_id": self.record_id,
+            "elapsed_sec": (
+                round(self.finished_at - self.started_at, 2)
+                if self.started_at and self.finished_at else None
+            ),
+        }
+        if self.state == RUNNING and self.progress:
+            data["progress"] = {
+                k: self.progress.get(k) for k in ("stage", "percent", "eta_sec")
+            }
+        if self.result:
+            r = self.result
+            data.update(
+                {
+                    "result": r.get("result"),
+                    "behavior_probs_pct": r.get("behavior_probs_pct"),
+                    "behavior_counts": r.get("behavior_counts"),
+                    "detected_actions": r.get("detected_actions"),
+                    "events": r.get("events"),
+                    "label_counts": r.get("label_counts"),
+                    "pose_stats": {
+                        k: v for k, v in (r.get("pose_stats") or {}).items()
+                        if k != "frame_index_map"
+                    },
+                    "evidence": r.get("evidence", []),
+                    "cache_hit": r.get("cache_hit"),
+                }
+            )
+        if self.message:
+            data["message"] = self.message
+        return data
+
+
+class BatchQueue:
+    """
+    일괄 분석 큐.
+    - priority가 작을수록 먼저 분석 (같으면 추가한 순서)
+    - 동시에 workers개까지만 프로세스 풀에 제출하므로, 대기 중인 작업은 취소/우선순위 변경 가능
+    - 분석 중인 작업의 취소는 결과를 버리는 방식 (프로세스는 현재 영상을 끝까지 처리)
+    - on_update(job)은 상태/진행률이 바뀔 때마다 백그라운드 스레드에서 호출됨
+    - save=True면 성공한 결과를 history.append_record로 저장
+    - prewarm_workers=True면 워커 프로세스가 시작하자마자 모델을 로드
+    - stdout_to_stderr=True면 워커의 print 출력을 stderr로 보냄
+    - finished_ttl(초) / max_finished를 주면 끝난 작업을 그 시간이 지나거나 개수를 넘을 때
+      오래된 것부터 목록에서 제거 (serve / watch처럼 오래 실행되는 큐용, 기본은 모두 보관)
+    """
+
+    def __init__(
+        self,
+        username: Optional[str] = None,
+        workers: Optional[int] = None,
+        on_update: Optional[Callable[[BatchJob], None]] = None,
+        save: bool = True,
+        prewarm_workers: bool = False,
+        stdout_to_stderr: bool = False,
+        finished_ttl: Optional[float] = None,
+        max_finished: Optional[int] = None,
+    ):
+        self.username = username
+        self.workers = max(1, int(workers or default_workers()))
+        self.on_update = on_update
+        self.save = save
+        self.prewarm_workers = prewarm_workers
+        self.stdout_to_stderr = stdout_to_stderr
+        self.finished_ttl = finished_ttl
+        self.max_finished = max_finished
+
+        self._jobs: Dict[int, BatchJob] = {}
+        self._heap = []                            # (priority, seq, job_id)
+        self._seq = itertools.count()
+        self._ids = itertools.count(1)
+        self._running = 0
+        self._lock = threading.RLock()
+        self._idle = threading.Condition(self._lock)
+        self._executor = None
+        self._progress_queue = None
+        self._drain_thread = None
+        self._closed = False
+
+    # ---------- 작업 추가 ----------
+    def add(
+        self,
+        path: str,
+        priority: int = 0,
+        username: Optional[str] = None,
+        video_hash: Optional[str] = None,
+    ) -> int:
+        """
+        username을 주면 큐 기본 사용자 대신 그 사용자로 분석/기록.
+        video_hash를 주면 워커에서 영상 해시를 다시 계산하지 않음.
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("이미 종료된 분석 큐입니다.")
+            job = BatchJob(
+                next(self._ids), os.path.abspath(path), priority,
+                username if username is not None else self.username,
+                video_hash,
+            )
+            self._prune()
+            self._jobs[job.id] = job
+            heapq.heappush(self._heap, (priority, next(self._seq), job.id))
+        self._notify(job)
+        self._dispatch()
+        return job.id
+
+    def add_many(self, paths: List[str], priority: int = 0) -> List[int]:
+        return [self.add(p, priority) for p in paths]
+
+    def add_folder(self, folder: str, priority: int = 0, recursive: bool = False) -> List[int]:
+        return self.add_many(list_videos(folder, recursive), priority)
+
+    # ---------- 조회 ----------
+    def get(self, job_id: int) -> Optional[BatchJob]:
+        return self._jobs.get(job_id)
+
+    def jobs(self) -> List[BatchJob]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return sum(1 for j in self._jobs.values() if not j.finished)
+
+    # ---------- 제어 ----------
+    def cancel(self, job_id: int) -> bool:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return False
+            if job.state == QUEUED:
+                job.state = CANCELLED
+                job.finished_at = time.time()
+                self._idle.notify_all()
+            else:
+                job.cancel_requested = True        # 끝나면 결과를 버림
+        self._notify(job)
+        return True
+
+    def reprioritize(self, job_id: int, priority: int) -> bool:
+        """대기 중인 작업의 우선순위 변경 (이미 분석 중/완료면 False)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.state != QUEUED:
+                return False
+            job.priority = priority
+            # 이전 힙 항목은 _dispatch에서 priority 불일치로 건너뜀
+            heapq.heappush(self._heap, (priority, next(self._seq), job.id))
+        self._notify(job)
+        return True
+
+    def move_to_front(self, job_id: int) -> bool:
+        with self._lock:
+            queued = [j.priority for j in self._jobs.values() if j.state == QUEUED]
+            return self.reprioritize(job_id, min(queued, default=0) - 1)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """모든 작업이 끝날 때까지 대기. timeout 안에 끝나면 True."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            while self.pending_count():
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+            return True
+
+    def shutdown(self, wait: bool = True, cancel_pending: bool = False) -> None:
+        """wait=False면 대기 중인 작업은 취소하고 바로 반환"""
+        with self._lock:
+            self._closed = True
+            if cancel_pending or not wait:
+                for job in self._jobs.values():
+                    if job.state == QUEUED:
+                        job.state = CANCELLED
+                        job.finished_at = time.time()
+                self._idle.notify_all()
+        if wait:
+            self.wait()
+        executor = self._executor
+        if executor is not None:
+            executor.shutdown(wait=wait)
+        if self._progress_queue is not None:
+            self._progress_queue.put(None)       # 진행 이벤트 수신 스레드 종료
+
+    # ---------- 내부 ----------
+    def _ensure_executor(self):
+        if self._executor is None:
+            # 워커마다 독립적인 torch/mediapipe 상태를 갖도록 spawn 사용
+            ctx = multiprocessing.get_context("spawn")
+            self._progress_queue = ctx.Queue()
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=ctx,
+                initializer=_init_worker,
+                initargs=(self._progress_queue, self.prewarm_workers, self.stdout_to_stderr),
+            )
+            self._drain_thread = threading.Thread(
+                target=self._drain_progress, name="drovis-batch-progress", daemon=True
+            )
+            self._drain_thread.start()
+        return self._executor
+
+    def _dispatch(self):
+        started = []
+        with self._lock:
+            while self._running < self.workers and self._heap:
+                priority, _, job_id = heapq.heappop(self._heap)
+                job = self._jobs[job_id]
+                if job.state != QUEUED or job.priority != priority:
+                    continue                       # 취소됐거나 우선순위가 바뀐 이전 항목
+                job.state = RUNNING
+                job.started_at = time.time()
+                self._running += 1
+                future = self._ensure_executor().submit(
+                    _analyze, job.id, job.path, job.username, job.video_hash
+                )
+                future.add_done_callback(lambda f, job=job: self._finished(job, f))
+                started.append(job)
+        for job in started:
+            self._notify(job)
+
+    def _finished(self, job: BatchJob, future):
+        try:
+            result = future.result()
+        except Exception as e:                     # 워커 프로세스 비정상 종료 등
+            result = {"success": False, "message": f"분석 실패: {str(e)}"}
+
+        if not job.cancel_requested and result.get("success") and self.save:
+            try:
+                from core.services.history import append_record, build_record
+
+                job.record_id = append_record(build_record(result, job.username))
+            except Exception as e:
+                result = {"success": False, "message": f"기록 저장 실패: {str(e)}"}
+
+        with self._lock:
+            self._running -= 1
+            job.finished_at = time.time()
+            if job.cancel_requested:
+                job.state = CANCELLED
+            elif result.get("success"):
+                job.state = DONE
+                job.result = _slim_result(result)
+            else:
+                job.state = FAILED
+                job.message = result.get("message", "분석 실패")
+            self._prune(keep=job.id)
+            self._idle.notify_all()
+        self._notify(job)
+        self._dispatch()
+
+    def _prune(self, keep: Optional[int] = None):
+        """끝난 작업 정리 — finished_ttl이 지났거나 max_finished를 넘는 것 (_lock 안에서 호출)"""
+        if self.finished_ttl is None and self.max_finished is None:
+            return
+        done = sorted(
+            (j for j in self._jobs.values() if j.finished and j.id != keep),
+            key=lambda j: j.finished_at or 0.0,
+        )
+        n_drop = 0
+        if self.finished_ttl is not None:
+            cutoff = time.time() - self.finished_ttl
+            n_drop = sum(1 for j in done if (j.finished_at or 0.0) < cutoff)
+        if self.max_finished is not None:
+            # 방금 끝난 작업(keep)도 개수에 포함
+            n_drop = max(n_drop, len(done) + (keep is not None) - self.max_finished)
+        for job in done[:n_drop]:
+            del self._jobs[job.id]
+
+    def _drain_progress(self):
+        while True:
+            try:
+                item = self._progress_queue.get()
+            except (EOFError, OSError):
+                return
+            if item is None:
+                return
+            job_id, event = item
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                continue
+            job.progress = event
+            self._notify(job)
+
+    def _notify(self, job: BatchJob):
+        if self.on_update is not None:
+            try:
+                self.on_update(job)
+            except Exception as e:
+                print(f"[WARN] 일괄 분석 상태 콜백 오류: {e}")
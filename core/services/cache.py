@@ -0,0 +1,148 @@
+# core/services/cache.py
+# 영상 내용 해시 기반 캐시: 원본 포즈, frame_index_map, 윈도우별 확률, 근거 메타데이터 저장
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from core.config import Config
+
+CACHE_FOLDER = Config.CACHE_FOLDER
+CACHE_MAX_BYTES = Config.CACHE_MAX_BYTES
+_HASH_CHUNK = 1 << 20
+STALE_TMP_SEC = 3600              # 이보다 오래된 .tmp는 쓰다가 죽은 프로세스의 잔여물로 보고 삭제
+
+_lock = threading.Lock()
+
+
+# ---------- keys ----------
+def file_hash(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_CHUNK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def make_key(video_hash: str, *versions: Any) -> str:
+    """영상 해시 + 모델/전처리 버전을 합쳐 캐시 키 생성"""
+    raw = ":".join([video_hash] + [str(v) for v in versions])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _entry_path(key: str) -> str:
+    return os.path.join(CACHE_FOLDER, f"{key}.npz")
+
+
+# ---------- public APIs ----------
+def load_entry(key: str) -> Optional[Dict[str, Any]]:
+    """
+    캐시 조회. 없거나 손상된 경우 None.
+    Returns: {"pose": ndarray, "frame_index_map": list, "probs": ndarray, "meta": dict}
+    """
+    path = _entry_path(key)
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as z:
+            entry = {
+                "pose": z["pose"],
+                "frame_index_map": z["frame_index_map"].tolist(),
+                "probs": z["probs"],
+                "meta": json.loads(str(z["meta"])),
+            }
+    except Exception:
+        return None
+
+    # LRU: 최근 사용 시각 갱신
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass
+    return entry
+
+
+def save_entry(
+    key: str,
+    pose: np.ndarray,
+    frame_index_map: List[int],
+    probs: np.ndarray,
+    meta: Dict[str, Any],
+) -> None:
+    buf = io.BytesIO()
+    np.savez(
+        buf,
+        pose=np.asarray(pose, dtype=np.float32),
+        frame_index_map=np.asarray(frame_index_map, dtype=np.int64),
+        probs=np.asarray(probs, dtype=np.float32),
+        meta=np.array(json.dumps(meta, ensure_ascii=False)),
+    )
+
+    # 임시 파일은 호출마다 고유한 이름 — 캐시 폴더를 같이 쓰는 다른 프로세스
+    # (일괄 분석 워커, 감시 폴더, 분산 워커)와 같은 키를 동시에 써도 서로 덮어쓰지 않음
+    os.makedirs(CACHE_FOLDER, exist_ok=True)
+    path = _entry_path(key)
+    fd, tmp = tempfile.mkstemp(dir=CACHE_FOLDER, prefix=f"{key}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(buf.getbuffer())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    with _lock:
+        _evict(CACHE_MAX_BYTES)
+
+
+def _evict(max_bytes: int) -> int:
+    """
+    용량 초과 시 가장 오래 사용하지 않은 항목부터 삭제. 삭제 개수 반환.
+    캐시 폴더 아래 전체(하위 폴더 포함)의 *.npz 항목이 대상이며, 오래된 .tmp 잔여물도 정리.
+    (models/ 아래 추론 백엔드 변환 파일은 다른 프로세스가 로드 중일 수 있어 건드리지 않음)
+    """
+    entries = []
+    stale_before = time.time() - STALE_TMP_SEC
+    for root, _, files in os.walk(CACHE_FOLDER):
+        for n in files:
+            if not n.endswith((".npz", ".tmp")):
+                continue
+            p = os.path.join(root, n)
+            try:
+                st = os.stat(p)
+            except OSError:
+                continue                # 다른 프로세스가 방금 교체/삭제함
+            if n.endswith(".tmp"):
+                if st.st_mtime < stale_before:
+                    try:
+                        os.remove(p)
+                    except OSError:
+                        pass
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, p in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(p)
+            total -= size
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def clear() -> int:
+    with _lock:
+        return _evict(0)
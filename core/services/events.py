@@ -0,0 +1,108 @@
+# core/services/events.py
+# 윈도우별 확률 행렬 → 라벨별 행동 이벤트(시작/끝 시각, 최고/평균 확률) 구간화
+# 윈도우마다 라벨 문자열을 저장하는 대신 이벤트 몇 개와 라벨별 윈도우 수만 남김
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from core.config import Config
+# predict(torch, mediapipe)가 아닌 scoring에서 불러옴 — 재채점/기록 화면에서도 가볍게 쓰도록
+from core.services.scoring import LABEL_MAP, SUSPICIOUS_LABELS, WINDOW
+
+
+def _runs(mask: np.ndarray):
+    """True 연속 구간 → (starts, ends) — ends는 포함하지 않는 끝 인덱스"""
+    edges = np.diff(np.concatenate(([0], mask.view(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def _sec_to_windows(sec: float, window_sec: float) -> int:
+    """초 단위 길이 → 확률 행(윈도우) 개수"""
+    return int(round(sec / window_sec)) if window_sec > 0 else 0
+
+
+def _segments(p: np.ndarray, enter: float, exit: float, min_len: int, merge_gap: int):
+    """한 라벨의 확률 곡선 → 이벤트 구간 (starts, ends) — min_len/merge_gap은 윈도우 개수"""
+    # 히스테리시스: exit 이상인 연속 구간 중 enter 이상인 윈도우를 하나라도 포함한 구간만 이벤트
+    starts, ends = _runs(p >= exit)
+    if len(starts) == 0:
+        return starts, ends
+    entered = np.add.reduceat((p >= enter).astype(np.int32), starts) > 0
+    # reduceat은 구간 [starts[i], starts[i+1]) 합 — exit 미만 구간에는 enter 이상이 없으므로 결과 동일
+    starts, ends = starts[entered], ends[entered]
+    if len(starts) == 0:
+        return starts, ends
+
+    # 짧은 간격으로 끊긴 이벤트는 하나로 합침
+    new_group = np.concatenate(([True], starts[1:] - ends[:-1] > merge_gap))
+    group_first = np.flatnonzero(new_group)
+    group_last = np.concatenate((group_first[1:], [len(starts)])) - 1
+    starts, ends = starts[group_first], ends[group_last]
+
+    keep = ends - starts >= min_len
+    return starts[keep], ends[keep]
+
+
+def segment_events(
+    probs: np.ndarray,
+    frame_index_map: Optional[Sequence[int]] = None,
+    fps: float = 30.0,
+    window: int = WINDOW,
+    stride: int = 1,
+    enter: float = Config.EVENT_ENTER_PROB,
+    exit: float = Config.EVENT_EXIT_PROB,
+    min_sec: float = Config.EVENT_MIN_SEC,
+    merge_gap_sec: float = Config.EVENT_MERGE_GAP_SEC,
+) -> List[Dict]:
+    """
+    probs: (윈도우 수, 클래스 수) — i번째 행은 포즈 프레임 i*stride에서 시작하는 윈도우
+    frame_index_map: 포즈 인덱스 → 원본 프레임 번호 (없으면 포즈 인덱스를 그대로 사용)
+    stride: 확률 행 사이의 포즈 프레임 간격 (predict는 stride 1로 펼친 확률을 넘김)
+    min_sec / merge_gap_sec: 초 단위. 확률 행 하나가 차지하는 시간
+        (stride × 포즈 프레임 간격 / fps)으로 나눠 윈도우 개수로 바꿈
+    Returns: 시작 시각 순 이벤트 리스트
+        {"label", "start_sec", "end_sec", "start_frame", "end_frame", "peak_prob", "mean_prob", "windows"}
+    """
+    probs = np.asarray(probs, dtype=np.float32)
+    if probs.ndim != 2 or len(probs) == 0:
+        return []
+    fps = float(fps or 30.0)
+    stride = max(1, int(stride))
+    n = len(probs)
+    fim = np.asarray(
+        frame_index_map if frame_index_map else np.arange((n - 1) * stride + window), dtype=np.int64
+    )
+    # 포즈 프레임 사이 평균 원본 프레임 간격 (포즈 실패로 빠진 프레임이 있으면 1보다 큼)
+    frame_step = float(fim[-1] - fim[0]) / (len(fim) - 1) if len(fim) > 1 else 1.0
+    window_sec = stride * max(frame_step, 1.0) / fps
+    min_len = max(1, _sec_to_windows(min_sec, window_sec))
+    merge_gap = max(0, _sec_to_windows(merge_gap_sec, window_sec))
+
+    events = []
+    for lbl in sorted(SUSPICIOUS_LABELS):
+        if lbl >= probs.shape[1]:
+            continue
+        p = probs[:, lbl]
+        starts, ends = _segments(p, enter, exit, min_len, merge_gap)
+        if len(starts) == 0:
+            continue
+        # 구간별 최고/평균 확률 (구간 경계로 한 번에 계산)
+        bounds = np.stack([starts, ends], axis=1).ravel()
+        sums = np.add.reduceat(np.append(p, 0), bounds)[::2]
+        peaks = np.maximum.reduceat(np.append(p, 0), bounds)[::2]
+        # 행 s의 윈도우는 포즈 프레임 s*stride ~ s*stride+window-1을 덮음
+        first = fim[np.minimum(starts * stride, len(fim) - 1)]
+        last = fim[np.minimum((ends - 1) * stride + window - 1, len(fim) - 1)]
+        for s, e, f0, f1, total, peak in zip(starts, ends, first, last, sums, peaks):
+            events.append({
+                "label": LABEL_MAP.get(lbl, str(lbl)),
+                "start_sec": round(float(f0) / fps, 2),
+                "end_sec": round(float(f1 + 1) / fps, 2),
+                "start_frame": int(f0),
+                "end_frame": int(f1),
+                "peak_prob": round(float(peak), 4),
+                "mean_prob": round(float(total) / int(e - s), 4),
+                "windows": int(e - s),
+            })
+    events.sort(key=lambda ev: (ev["start_frame"], ev["label"]))
+    return events
@@ -1,7 +1,11 @@
+import json
+import os
 import sqlite3
-from core.config import Config
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
 
-DB_PATH = Config.ANALYSIS_DB_PATH  # 예: ./database/analysis.db
+from core.db import analysis_db
+from core.services.scoring import encode_probs
 
 
 def get_history(user_id: str):
@@ -9,10 +13,9 @@ def get_history(user_id: str):
     특정 사용자의 분석 기록 전체를 최신순으로 조회.
     Returns: 리스트(dict)
     """
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    try:
+    with analysis_db() as conn:
         cur = conn.cursor()
+        cur.row_factory = sqlite3.Row
         cur.execute(
             "SELECT * FROM analysis WHERE user_id = ? ORDER BY uploaded_at DESC",
             (user_id,),
@@ -20,8 +23,6 @@ def get_history(user_id: str):
         rows = cur.fetchall()
         # dict list로 리턴
         return [dict(row) for row in rows]
-    finally:
-        conn.close()
 
 
 def update_memo(record_id: int, user_id: str, memo: str):
@@ -29,12 +30,11 @@ def update_memo(record_id: int, user_id: str, memo: str):
     분석 기록의 메모 수정
     Returns: True(성공) or False(권한없음/없음)
     """
-    conn = sqlite3.connect(DB_PATH)
-    try:
+    with analysis_db() as conn:
         cur = conn.cursor()
         # 기록 존재/권한 확인
         cur.execute(
-            "SELECT * FROM analysis WHERE id = ? AND user_id = ?", (record_id, user_id)
+            "SELECT id FROM analysis WHERE id = ? AND user_id = ?", (record_id, user_id)
         )
         if cur.fetchone() is None:
             return False  # Not found or not owner
@@ -43,10 +43,7 @@ def update_memo(record_id: int, user_id: str, memo: str):
             "UPDATE analysis SET memo = ? WHERE id = ? AND user_id = ?",
             (memo, record_id, user_id),
         )
-        conn.commit()
         return True
-    finally:
-        conn.close()
 
 
 def delete_history(record_id: int, user_id: str):
@@ -54,19 +51,308 @@ def delete_history(record_id: int, user_id: str):
     분석 기록 삭제 (소유자만)
     Returns: True(성공) or False(권한없음/없음)
     """
-    conn = sqlite3.connect(DB_PATH)
-    try:
+    with analysis_db() as conn:
         cur = conn.cursor()
         # 기록 존재/권한 확인
         cur.execute(
-            "SELECT * FROM analysis WHERE id = ? AND user_id = ?", (record_id, user_id)
+            "SELECT id FROM analysis WHERE id = ? AND user_id = ?", (record_id, user_id)
         )
         if cur.fetchone() is None:
             return False
+        # 근거 행은 ON DELETE CASCADE로 함께 삭제
         cur.execute(
             "DELETE FROM analysis WHERE id = ? AND user_id = ?", (record_id, user_id)
         )
-        conn.commit()
         return True
-    finally:
-        conn.close()
+
+
+# ---------- 분석 기록 저장소 (이전 JSON 저장소 history_json과 같은 API) ----------
+# 정규화 컬럼 / 근거 테이블로 옮겨 저장하는 필드 — 나머지는 payload(JSON)에 보관
+_RECORD_COLUMNS = ("id", "username", "filename", "result", "timestamp", "memo", "decision_id")
+_EVIDENCE_FIELDS = ("label", "frame_idx", "timestamp_sec", "image_path")
+
+
+def _now() -> str:
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _insert_record(cur, item: Dict[str, Any]) -> int:
+    # 윈도우별 확률 행렬은 JSON이 아닌 별도 테이블(float16 BLOB)에 저장
+    probs = item.pop("window_probs", None)
+    payload = {
+        k: v for k, v in item.items() if k not in _RECORD_COLUMNS and k != "evidence"
+    }
+    decision_id = item.get("decision_id")
+    cur.execute(
+        """
+        INSERT OR IGNORE INTO analysis
+            (id, user_id, filename, result, uploaded_at, memo, decision_id, payload, video_hash)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (
+            item.get("id"),
+            item.get("username") or "",
+            item.get("filename") or "-",
+            item.get("result") or "-",
+            item.get("timestamp") or _now(),
+            item.get("memo"),
+            None if decision_id is None else str(decision_id),
+            json.dumps(payload, ensure_ascii=False),
+            item.get("video_hash"),
+        ),
+    )
+    if cur.rowcount == 0:
+        return -1  # 같은 id가 이미 있음
+    record_id = cur.lastrowid
+
+    if probs is not None and len(probs):
+        cur.execute(
+            "INSERT INTO analysis_probs (analysis_id, n_windows, n_classes, probs) VALUES (?, ?, ?, ?)",
+            (record_id, len(probs), probs.shape[1], encode_probs(probs)),
+        )
+
+    evidence = item.get("evidence")
+    if isinstance(evidence, list) and evidence:
+        cur.executemany(
+            """
+            INSERT INTO analysis_evidence (analysis_id, label, frame_idx, timestamp_sec, image_path)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            [
+                (record_id, ev.get("label", "-"), ev.get("frame_idx"),
+                 ev.get("timestamp_sec"), ev.get("image_path"))
+                for ev in evidence if isinstance(ev, dict)
+            ],
+        )
+    return record_id
+
+
+def _evidence_by_record(cur, record_ids: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+    out: Dict[int, List[Dict[str, Any]]] = {rid: [] for rid in record_ids}
+    if not record_ids:
+        return out
+    # SQLite 변수 개수 제한을 피하려고 나눠서 조회
+    for i in range(0, len(record_ids), 500):
+        part = record_ids[i:i + 500]
+        cur.execute(
+            f"""
+            SELECT analysis_id, label, frame_idx, timestamp_sec, image_path
+            FROM analysis_evidence
+            WHERE analysis_id IN ({",".join("?" * len(part))})
+            ORDER BY id
+            """,
+            part,
+        )
+        for row in cur.fetchall():
+            out[row[0]].append(dict(zip(_EVIDENCE_FIELDS, row[1:])))
+    return out
+
+
+def _row_to_record(row: sqlite3.Row, evidence: List[Dict[str, Any]]) -> Dict[str, Any]:
+    try:
+        rec = json.loads(row["payload"]) if row["payload"] else {}
+    except ValueError:
+        rec = {}
+    rec.update(
+        {
+            "id": row["id"],
+            "username": row["user_id"] or None,
+            "filename": row["filename"],
+            "result": row["result"],
+            "timestamp": row["uploaded_at"],
+            "memo": row["memo"],
+            "evidence": evidence,
+        }
+    )
+    if row["decision_id"] is not None:
+        rec["decision_id"] = row["decision_id"]
+    return rec
+
+
+def _select_records(
+    cur, where: str = "", params: tuple = (), order: str = "uploaded_at, id", limit: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    if limit is not None:
+        order += " LIMIT ?"
+        params = tuple(params) + (int(limit),)
+    cur.execute(
+        f"""
+        SELECT id, user_id, filename, result, uploaded_at, memo, decision_id, payload
+        FROM analysis {where}
+        ORDER BY {order}
+        """,
+        params,
+    )
+    rows = cur.fetchall()
+    evidence = _evidence_by_record(cur, [row["id"] for row in rows])
+    return [_row_to_record(row, evidence[row["id"]]) for row in rows]
+
+
+def build_record(result_data: Dict[str, Any], username: Optional[str], timestamp: Optional[str] = None) -> Dict[str, Any]:
+    """predict_from_video 결과 → append_record 입력 형식 (업로드 창/일괄 분석 공통)"""
+    return {
+        "username": username,
+        "filename": result_data["filename"],
+        "result": result_data["result"],  # 위험도
+        "risk_level": result_data["result"],  # (옵션)
+        "pose_stats": result_data.get("pose_stats"),
+        "behavior_counts": result_data.get("behavior_counts"),
+        "behavior_probs_pct": result_data.get("behavior_probs_pct"),
+        "detected_actions": result_data.get("detected_actions"),
+        "events": result_data.get("events"),
+        "label_counts": result_data.get("label_counts"),
+        "confidence": None,
+        "timestamp": timestamp or datetime.now().strftime("%Y-%m-%d %H:%M"),
+        "description": "AI 자동 분석 결과",
+        "evidence": result_data.get("evidence", []),
+        "video_hash": result_data.get("video_hash"),
+        "window_probs": result_data.get("window_probs"),   # 재채점용 (analysis_probs 테이블)
+    }
+
+
+def append_record(item: Dict[str, Any], conn: Optional[sqlite3.Connection] = None) -> int:
+    """
+    분석 결과 1건 저장 (이전 history_json.append_record와 같은 입력 형식).
+    conn: 호출한 쪽이 연 트랜잭션 안에서 저장할 때 (commit은 호출한 쪽이 함)
+    Returns: 저장된 기록 id
+    """
+    if conn is not None:
+        return _insert_record(conn.cursor(), dict(item))
+    with analysis_db() as conn:
+        return _insert_record(conn.cursor(), dict(item))
+
+
+def load_all(username: Optional[str] = None) -> List[Dict[str, Any]]:
+    """사용자(또는 전체)의 분석 기록을 오래된 순으로 조회 (idx_analysis_user_uploaded 사용)"""
+    with analysis_db() as conn:
+        cur = conn.cursor()
+        cur.row_factory = sqlite3.Row
+        if username is None:
+            return _select_records(cur)
+        return _select_records(cur, "WHERE user_id = ?", (username,))
+
+
+def _encode_cursor(rec: Dict[str, Any]) -> str:
+    return f"{rec['timestamp']}|{rec['id']}"
+
+
+def _decode_cursor(cursor: str) -> Tuple[str, int]:
+    uploaded_at, _, rec_id = str(cursor).rpartition("|")
+    if not uploaded_at or not rec_id.isdigit():
+        raise ValueError(f"invalid history cursor: {cursor!r}")
+    return uploaded_at, int(rec_id)
+
+
+def load_page(
+    username: Optional[str] = None, cursor: Optional[str] = None, limit: int = 50
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    최신 기록부터 limit개씩 조회 (keyset 페이지네이션 — OFFSET 없이 인덱스로 바로 이어서 읽음).
+    cursor: 이전 호출이 돌려준 next_cursor (None이면 첫 페이지)
+    Returns: (records, next_cursor) — 더 읽을 기록이 없으면 next_cursor는 None
+    """
+    limit = max(1, int(limit))
+    clauses, params = [], []
+    if username is not None:
+        clauses.append("user_id = ?")
+        params.append(username)
+    if cursor is not None:
+        uploaded_at, rec_id = _decode_cursor(cursor)
+        # 앞의 <= 조건은 인덱스 범위 검색용, 뒤의 OR가 같은 시각 안에서 id로 이어 읽기
+        clauses.append("uploaded_at <= ? AND (uploaded_at < ? OR id < ?)")
+        params += [uploaded_at, uploaded_at, rec_id]
+    where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+
+    with analysis_db() as conn:
+        cur = conn.cursor()
+        cur.row_factory = sqlite3.Row
+        # 한 건 더 읽어 다음 페이지 존재 여부 확인
+        records = _select_records(
+            cur, where, tuple(params), order="uploaded_at DESC, id DESC", limit=limit + 1
+        )
+    if len(records) <= limit:
+        return records, None
+    records = records[:limit]
+    return records, _encode_cursor(records[-1])
+
+
+def delete_all(username: Optional[str] = None) -> int:
+    with analysis_db() as conn:
+        cur = conn.cursor()
+        # 근거 행은 ON DELETE CASCADE로 함께 삭제
+        if username is None:
+            cur.execute("DELETE FROM analysis")
+        else:
+            cur.execute("DELETE FROM analysis WHERE user_id = ?", (username,))
+        return cur.rowcount
+
+
+def find_by_video_hash(video_hash: str) -> Optional[int]:
+    """같은 내용(SHA-256)의 영상을 분석한 가장 최근 기록 id (사용자 무관). 없으면 None"""
+    if not video_hash:
+        return None
+    with analysis_db() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            "SELECT id FROM analysis WHERE video_hash = ? ORDER BY id DESC LIMIT 1", (video_hash,)
+        )
+        row = cur.fetchone()
+        return row[0] if row else None
+
+
+def load_evidence(record_id: int, user_id: str) -> Optional[List[Dict[str, Any]]]:
+    """
+    분석 기록의 근거 목록 (소유자만)
+    Returns: evidence 리스트 or None(권한없음/없음)
+    """
+    with analysis_db() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            "SELECT id FROM analysis WHERE id = ? AND user_id = ?", (record_id, user_id)
+        )
+        if cur.fetchone() is None:
+            return None
+        return _evidence_by_record(cur, [record_id])[record_id]
+
+
+def load_evidence_by_decision(decision_id: str) -> List[Dict[str, Any]]:
+    """
+    decision_id 또는 숫자 id로 기록을 찾아 evidence 리스트 반환.
+    못 찾으면 [].
+    """
+    if not decision_id:
+        return []
+    with analysis_db() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT id FROM analysis WHERE decision_id = ? LIMIT 1", (str(decision_id),))
+        row = cur.fetchone()
+        if row is None and str(decision_id).lstrip("-").isdigit():
+            cur.execute("SELECT id FROM analysis WHERE id = ?", (int(decision_id),))
+            row = cur.fetchone()
+        if row is None:
+            return []
+        return _evidence_by_record(cur, [row[0]])[row[0]]
+
+
+def migrate_from_json() -> int:
+    """
+    data/history.json(.jsonl) 기록을 SQLite로 1회 이전.
+    같은 id는 건너뛰고, 끝나면 원본 파일 이름에 .migrated를 붙여 다시 실행되지 않게 함.
+    Returns: 새로 옮긴 기록 수
+    """
+    from core.services import history_json
+
+    paths = (history_json.HISTORY_PATH, history_json.LEGACY_HISTORY_PATH)
+    if not any(os.path.exists(p) for p in paths):
+        return 0
+
+    records = history_json.load_all()
+    with analysis_db() as conn:
+        cur = conn.cursor()
+        migrated = sum(1 for rec in records if _insert_record(cur, rec) != -1)
+
+    # 읽는 도중 생긴 파일도 함께 치우도록 읽은 뒤에 다시 확인
+    for p in paths:
+        if os.path.exists(p):
+            os.replace(p, p + ".migrated")
+    return migrated
@@ -1,91 +1,57 @@
-import json, os, time
+# core/services/history_json.py
+# 이전 버전의 JSON 분석 기록 — 읽기 전용.
+# 분석 기록은 SQLite(core/services/history.py)에 저장하고, 이 모듈은 migrate_from_json이
+# 남아 있는 data/history.jsonl(추가 전용 로그) 또는 data/history.json(JSON 배열)을 읽을 때만 사용
+import json, os
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 
 APP_ROOT = Path(__file__).resolve().parents[2]
 DATA_DIR = APP_ROOT / "data"
-HISTORY_PATH = str(DATA_DIR / "history.json")
+HISTORY_PATH = str(DATA_DIR / "history.jsonl")
+LEGACY_HISTORY_PATH = str(DATA_DIR / "history.json")   # 이전 버전(JSON 배열) 파일
+
+
+def _read_jsonl(path: str) -> List[Dict[str, Any]]:
+    """추가 전용 로그 → 살아 있는 레코드 (같은 id는 마지막 줄, 툼스톤 {"_deleted": id}는 삭제)"""
+    records: Dict[str, Dict[str, Any]] = {}
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break                           # 기록 도중 끊긴 마지막 줄
+            try:
+                data = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(data, dict):
+                continue
+            if "_deleted" in data:
+                records.pop(str(data["_deleted"]), None)
+            elif "id" in data:
+                rec_id = str(data["id"])
+                records.pop(rec_id, None)       # 다시 쓴 레코드는 파일 순서상 뒤로
+                records[rec_id] = data
+    return list(records.values())
+
+
+def _read_legacy(path: str) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return [item for item in data if isinstance(item, dict)] if isinstance(data, list) else []
 
 
-# ---------- low-level IO ----------
-def _read() -> List[Dict[str, Any]]:
-    if not os.path.exists(HISTORY_PATH):
-        return []
-    try:
-        with open(HISTORY_PATH, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            return data if isinstance(data, list) else []
-    except json.JSONDecodeError:
-        return []
-
-def _write(data: List[Dict[str, Any]]) -> None:
-    os.makedirs(os.path.dirname(HISTORY_PATH), exist_ok=True)
-    tmp = HISTORY_PATH + ".tmp"
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-    os.replace(tmp, HISTORY_PATH)
-
-
-# ---------- public APIs ----------
 def load_all(username: Optional[str] = None) -> List[Dict[str, Any]]:
-    data = _read()
-    if username is None:
-        return data
-    return [d for d in data if d.get("username") == username]
-
-def append_record(item: Dict[str, Any]) -> None:
     """
-    item 예시:
-    {
-      "username": "alice",
-      "filename": "test.mp4",
-      "pose_stats": {...},
-      "result_per_chunk": [...],
-      "result": "중",
-      "behavior_probs_pct": {...},
-      "timestamp": "2025-08-20 14:00:00",
-      "evidence": [  # ★ 반드시 리스트
-        {"label":"Loitering","timestamp_sec":12.8,"image_path":"uploads/.../L_000123.jpg"},
-        ...
-      ],
-    }
+    저장된 순서대로 전체 기록 (history.jsonl이 있으면 그 파일, 없으면 history.json).
+    파일이 없거나 읽을 수 없으면 [].
     """
-    data = _read()
-    item = dict(item)  # defensive copy
-
-    # id/username/evidence 기본값 보정
-    item.setdefault("id", int(time.time() * 1000))
-    if "username" not in item:
-        item["username"] = None
-    if not isinstance(item.get("evidence"), list):
-        item["evidence"] = []
-
-    data.append(item)
-    _write(data)
-
-def delete_all(username: Optional[str] = None) -> int:
-    data = _read()
-    remained = [] if username is None else [d for d in data if d.get("username") != username]
-    deleted = len(data) - len(remained)
-    _write(remained)
-    return deleted
-
-def load_evidence_by_decision(decision_id: str) -> List[Dict[str, Any]]:
-    """
-    decision_id 또는 숫자 id로 레코드를 찾아 evidence 리스트 반환.
-    못 찾으면 [].
-    """
-    if not decision_id:
+    try:
+        if os.path.exists(HISTORY_PATH):
+            records = _read_jsonl(HISTORY_PATH)
+        elif os.path.exists(LEGACY_HISTORY_PATH):
+            records = _read_legacy(LEGACY_HISTORY_PATH)
+        else:
+            return []
+    except (OSError, ValueError):
         return []
-    data = _read()
-    # 1) decision_id 매칭
-    for rec in data:
-        if str(rec.get("decision_id")) == str(decision_id):
-            ev = rec.get("evidence")
-            return ev if isinstance(ev, list) else []
-    # 2) 숫자 id 매칭 허용
-    for rec in data:
-        if str(rec.get("id")) == str(decision_id):
-            ev = rec.get("evidence")
-            return ev if isinstance(ev, list) else []
-    return []
\ No newline at end of file
+    return [r for r in records if username is None or r.get("username") == username]
@@ -0,0 +1,386 @@
+# core/services/jobqueue.py
+# 분산 워커용 작업 큐: 분석 DB의 analysis_jobs 테이블을 여러 프로세스/노드가 함께 사용
+#  - claim: BEGIN IMMEDIATE로 쓰기 잠금을 잡고 가장 앞선 작업 1건을 임대(lease)
+#  - heartbeat: 분석 중인 워커가 주기적으로 임대 연장
+#  - 임대가 만료된 작업(워커가 죽음)은 다음 claim 때 다시 대기열로 → 다른 워커가 재시도
+#  - complete: 임대를 아직 가진 경우에만 결과 저장 + 분석 기록 추가 (한 트랜잭션)
+# 여러 노드가 공유 폴더의 DB를 쓸 때는 DROVIS_SQLITE_JOURNAL_MODE=DELETE, 노드 간 시계는 동기화(NTP)되어 있어야 함
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from core.config import Config
+from core.db import analysis_db, close_thread_connections
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+RETRY_BACKOFF_SEC = 10         # 재시도 대기 = RETRY_BACKOFF_SEC * 시도 횟수
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _summary(result: Dict[str, Any]) -> Dict[str, Any]:
+    """작업 행에 남길 결과 요약 (frame_index_map처럼 큰 필드는 제외)"""
+    return {
+        "result": result.get("result"),
+        "behavior_probs_pct": result.get("behavior_probs_pct"),
+        "behavior_counts": result.get("behavior_counts"),
+        "detected_actions": result.get("detected_actions"),
+        "events": result.get("events"),
+        "label_counts": result.get("label_counts"),
+        "pose_stats": {
+            k: v for k, v in (result.get("pose_stats") or {}).items() if k != "frame_index_map"
+        },
+        "evidence": result.get("evidence", []),
+        "cache_hit": result.get("cache_hit"),
+    }
+
+
+def _row_to_job(row: sqlite3.Row) -> Dict[str, Any]:
+    job = dict(row)
+    if job.get("result"):
+        try:
+            job["result"] = json.loads(job["result"])
+        except ValueError:
+            pass
+    return job
+
+
+# ---------- 작업 등록/조회 ----------
+def enqueue(
+    video_path: str,
+    username: Optional[str] = None,
+    priority: int = 0,
+    video_hash: Optional[str] = None,
+    max_attempts: Optional[int] = None,
+) -> int:
+    """작업 1건 등록 (priority가 작을수록 먼저). Returns: 작업 id"""
+    with analysis_db() as conn:
+        cur = conn.execute(
+            """
+            INSERT INTO analysis_jobs
+                (video_path, user_id, video_hash, priority, max_attempts, created_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (
+                os.path.abspath(video_path), username, video_hash, int(priority),
+                int(max_attempts or Config.JOB_MAX_ATTEMPTS), time.time(),
+            ),
+        )
+        return cur.lastrowid
+
+
+def get_job(job_id: int) -> Optional[Dict[str, Any]]:
+    with analysis_db() as conn:
+        cur = conn.cursor()
+        cur.row_factory = sqlite3.Row
+        cur.execute("SELECT * FROM analysis_jobs WHERE id = ?", (job_id,))
+        row = cur.fetchone()
+        return _row_to_job(row) if row else None
+
+
+def list_jobs(status: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+    """최근 작업부터 조회"""
+    with analysis_db() as conn:
+        cur = conn.cursor()
+        cur.row_factory = sqlite3.Row
+        if status is None:
+            cur.execute("SELECT * FROM analysis_jobs ORDER BY id DESC LIMIT ?", (int(limit),))
+        else:
+            cur.execute(
+                "SELECT * FROM analysis_jobs WHERE status = ? ORDER BY id DESC LIMIT ?",
+                (status, int(limit)),
+            )
+        return [_row_to_job(row) for row in cur.fetchall()]
+
+
+def stats() -> Dict[str, int]:
+    """상태별 작업 수"""
+    with analysis_db() as conn:
+        rows = conn.execute(
+            "SELECT status, COUNT(*) FROM analysis_jobs GROUP BY status"
+        ).fetchall()
+    return {status: count for status, count in rows}
+
+
+def cancel(job_id: int) -> bool:
+    """
+    대기 중인 작업은 바로 취소, 분석 중인 작업은 취소 요청만 남김
+    (워커가 분석을 마쳐도 결과를 저장하지 않음)
+    """
+    with analysis_db() as conn:
+        cur = conn.execute(
+            "UPDATE analysis_jobs SET status = ?, finished_at = ? WHERE id = ? AND status = ?",
+            (CANCELLED, time.time(), job_id, QUEUED),
+        )
+        if cur.rowcount:
+            return True
+        cur = conn.execute(
+            "UPDATE analysis_jobs SET cancel_requested = 1 WHERE id = ? AND status = ?",
+            (job_id, RUNNING),
+        )
+        return cur.rowcount > 0
+
+
+# ---------- 워커 쪽 ----------
+def _reap_expired(conn, now: float) -> None:
+    """임대가 만료된 작업(워커 종료/연결 끊김) → 재시도 또는 실패 처리"""
+    conn.execute(
+        """
+        UPDATE analysis_jobs SET status = ?, finished_at = ?, worker_id = NULL, lease_until = NULL
+        WHERE status = ? AND lease_until < ? AND cancel_requested = 1
+        """,
+        (CANCELLED, now, RUNNING, now),
+    )
+    conn.execute(
+        """
+        UPDATE analysis_jobs
+        SET status = ?, finished_at = ?, worker_id = NULL, lease_until = NULL,
+            error = '임대 만료: 워커 응답 없음 (재시도 횟수 초과)'
+        WHERE status = ? AND lease_until < ? AND attempts >= max_attempts
+        """,
+        (FAILED, now, RUNNING, now),
+    )
+    conn.execute(
+        """
+        UPDATE analysis_jobs
+        SET status = ?, worker_id = NULL, lease_until = NULL,
+            error = '임대 만료: 워커 응답 없음 (재시도 대기)'
+        WHERE status = ? AND lease_until < ?
+        """,
+        (QUEUED, RUNNING, now),
+    )
+
+
+def claim(worker_id: str, lease_sec: float = Config.JOB_LEASE_SEC) -> Optional[Dict[str, Any]]:
+    """
+    대기 중인 작업 1건을 임대. 없으면 None.
+    BEGIN IMMEDIATE로 잠근 뒤 조회/갱신하므로 여러 워커가 같은 작업을 가져가지 않음.
+    """
+    now = time.time()
+    with analysis_db(immediate=True) as conn:
+        _reap_expired(conn, now)
+        cur = conn.cursor()
+        cur.row_factory = sqlite3.Row
+        cur.execute(
+            """
+            SELECT id FROM analysis_jobs
+            WHERE status = ? AND available_at <= ?
+            ORDER BY priority, id
+            LIMIT 1
+            """,
+            (QUEUED, now),
+        )
+        row = cur.fetchone()
+        if row is None:
+            return None
+        cur.execute(
+            """
+            UPDATE analysis_jobs
+            SET status = ?, worker_id = ?, attempts = attempts + 1,
+                lease_until = ?, heartbeat_at = ?, started_at = ?
+            WHERE id = ?
+            """,
+            (RUNNING, worker_id, now + lease_sec, now, now, row["id"]),
+        )
+        cur.execute("SELECT * FROM analysis_jobs WHERE id = ?", (row["id"],))
+        return _row_to_job(cur.fetchone())
+
+
+def heartbeat(job_id: int, worker_id: str, lease_sec: float = Config.JOB_LEASE_SEC) -> bool:
+    """임대 연장. 임대를 잃었으면(만료 후 다른 워커가 가져감) False."""
+    now = time.time()
+    with analysis_db() as conn:
+        cur = conn.execute(
+            """
+            UPDATE analysis_jobs SET lease_until = ?, heartbeat_at = ?
+            WHERE id = ? AND worker_id = ? AND status = ?
+            """,
+            (now + lease_sec, now, job_id, worker_id, RUNNING),
+        )
+        return cur.rowcount > 0
+
+
+def complete(
+    job_id: int, worker_id: str, result: Dict[str, Any], save: bool = True
+) -> Optional[int]:
+    """
+    분석 성공 처리 + 분석 기록 저장 (같은 트랜잭션 — 임대를 잃은 워커는 기록을 남기지 않음).
+    Returns: 분석 기록 id (저장 안 함이면 -1), 임대를 잃었으면 None
+    """
+    from core.services.history import append_record, build_record
+
+    now = time.time()
+    with analysis_db(immediate=True) as conn:
+        row = conn.execute(
+            "SELECT user_id, cancel_requested FROM analysis_jobs WHERE id = ? AND worker_id = ? AND status = ?",
+            (job_id, worker_id, RUNNING),
+        ).fetchone()
+        if row is None:
+            return None
+        username, cancel_requested = row
+        if cancel_requested:
+            conn.execute(
+                "UPDATE analysis_jobs SET status = ?, finished_at = ?, lease_until = NULL WHERE id = ?",
+                (CANCELLED, now, job_id),
+            )
+            return -1
+
+        record_id = append_record(build_record(result, username), conn=conn) if save else -1
+        conn.execute(
+            """
+            UPDATE analysis_jobs
+            SET status = ?, record_id = ?, result = ?, error = NULL,
+                finished_at = ?, lease_until = NULL
+            WHERE id = ?
+            """,
+            (DONE, record_id if record_id != -1 else None,
+             json.dumps(_summary(result), ensure_ascii=False), now, job_id),
+        )
+        return record_id
+
+
+def fail(job_id: int, worker_id: str, message: str, retry: bool = False) -> bool:
+    """
+    분석 실패 처리. retry=True이고 시도 횟수가 남았으면 잠시 뒤 다시 대기열로.
+    Returns: 임대를 가진 상태에서 처리했는지
+    """
+    now = time.time()
+    with analysis_db(immediate=True) as conn:
+        row = conn.execute(
+            "SELECT attempts, max_attempts, cancel_requested FROM analysis_jobs WHERE id = ? AND worker_id = ? AND status = ?",
+            (job_id, worker_id, RUNNING),
+        ).fetchone()
+        if row is None:
+            return False
+        attempts, max_attempts, cancel_requested = row
+        if retry and attempts < max_attempts and not cancel_requested:
+            conn.execute(
+                """
+                UPDATE analysis_jobs
+                SET status = ?, error = ?, available_at = ?, worker_id = NULL, lease_until = NULL
+                WHERE id = ?
+                """,
+                (QUEUED, message, now + RETRY_BACKOFF_SEC * attempts, job_id),
+            )
+        else:
+            conn.execute(
+                "UPDATE analysis_jobs SET status = ?, error = ?, finished_at = ?, lease_until = NULL WHERE id = ?",
+                (CANCELLED if cancel_requested else FAILED, message, now, job_id),
+            )
+        return True
+
+
+def release(job_id: int, worker_id: str) -> bool:
+    """워커 종료(Ctrl+C)로 분석을 포기 — 시도 횟수를 되돌리고 바로 다시 대기열로"""
+    with analysis_db() as conn:
+        cur = conn.execute(
+            """
+            UPDATE analysis_jobs
+            SET status = ?, attempts = MAX(attempts - 1, 0), worker_id = NULL, lease_until = NULL
+            WHERE id = ? AND worker_id = ? AND status = ?
+            """,
+            (QUEUED, job_id, worker_id, RUNNING),
+        )
+        return cur.rowcount > 0
+
+
+class JobWorker:
+    """
+    작업 큐에서 작업을 하나씩 가져와 predict_from_video로 분석하는 워커 (프로세스당 1개).
+    분석 중에는 별도 스레드가 lease_sec/3 간격으로 임대를 연장.
+    """
+
+    def __init__(
+        self,
+        worker_id: Optional[str] = None,
+        lease_sec: float = Config.JOB_LEASE_SEC,
+        poll_sec: float = Config.JOB_POLL_SEC,
+        save: bool = True,
+        log=print,
+    ):
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_sec = lease_sec
+        self.poll_sec = poll_sec
+        self.save = save
+        self.log = log
+        self._stop = threading.Event()
+
+    def _heartbeat_loop(self, job_id: int, done: threading.Event):
+        try:
+            while not done.wait(self.lease_sec / 3):
+                if not heartbeat(job_id, self.worker_id, self.lease_sec):
+                    self.log(f"[WORKER {self.worker_id}] 작업 {job_id} 임대를 잃음 — 결과는 버려짐")
+                    return
+        finally:
+            close_thread_connections()
+
+    def run_job(self, job: Dict[str, Any]) -> str:
+        from core.services.predict import predict_from_video
+
+        job_id = job["id"]
+        done = threading.Event()
+        beat = threading.Thread(target=self._heartbeat_loop, args=(job_id, done), daemon=True)
+        beat.start()
+        try:
+            result = predict_from_video(job["video_path"], job["user_id"], video_hash=job["video_hash"])
+        except KeyboardInterrupt:
+            release(job_id, self.worker_id)
+            raise
+        except Exception as e:
+            # 예기치 못한 오류(메모리 부족 등)는 다른 시도에서 성공할 수 있으므로 재시도
+            fail(job_id, self.worker_id, f"분석 실패: {str(e)}", retry=True)
+            return FAILED
+        finally:
+            done.set()
+            beat.join()
+
+        if not result.get("success"):
+            # 파일 없음/사람 미검출처럼 다시 해도 같은 결과 → 재시도하지 않음
+            fail(job_id, self.worker_id, result.get("message") or "분석 실패")
+            return FAILED
+        record_id = complete(job_id, self.worker_id, result, save=self.save)
+        if record_id is None:
+            return "lost"
+        return DONE
+
+    def run(self, max_jobs: Optional[int] = None, exit_when_idle: bool = False) -> int:
+        """
+        stop()까지 작업을 처리. Returns: 처리한 작업 수
+        exit_when_idle: 대기/분석 중인 작업이 모두 없으면 종료 (로컬 일괄 처리/테스트용)
+        """
+        processed = 0
+        self.log(f"[WORKER {self.worker_id}] 시작 (임대 {self.lease_sec:g}초)")
+        try:
+            while not self._stop.is_set():
+                if max_jobs is not None and processed >= max_jobs:
+                    break
+                job = claim(self.worker_id, self.lease_sec)
+                if job is None:
+                    # 다른 워커가 분석 중인 작업도 임대 만료 시 재시도될 수 있으므로 함께 확인
+                    counts = stats()
+                    if exit_when_idle and not counts.get(QUEUED) and not counts.get(RUNNING):
+                        break
+                    self._stop.wait(self.poll_sec)
+                    continue
+                name = os.path.basename(job["video_path"])
+                self.log(f"[WORKER {self.worker_id}] 작업 {job['id']} 시작: {name} (시도 {job['attempts']})")
+                state = self.run_job(job)
+                processed += 1
+                self.log(f"[WORKER {self.worker_id}] 작업 {job['id']} {state}: {name}")
+        finally:
+            close_thread_connections()
+        return processed
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,224 @@
+# core/services/pipeline.py
+# 디코딩 → 포즈 추출 → 정규화/윈도우 추론을 스레드로 겹쳐 실행하는 스트리밍 파이프라인
+import queue
+import threading
+
+import cv2
+import numpy as np
+
+from core.config import Config
+from core.services.preprocess import PoseExtractor
+from core.services.progress import tracker
+from core.services.predict import (
+    WINDOW,
+    INFER_BATCH_SIZE,
+    normalize_seq_2d,
+    make_windows,
+    infer_windows,
+    expand_window_probs,
+)
+
+QUEUE_SIZE = Config.PIPELINE_QUEUE_SIZE
+
+_END = object()                   # 스트림 종료 표시
+
+
+def _put(q, item, stop):
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(q, stop):
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return _END
+
+
+# 증분 정규화 + 윈도우 추론 (직전 배치의 마지막 WINDOW-1 프레임을 이어 붙여 윈도우 연속성 유지)
+class WindowedInference:
+    def __init__(self, window=WINDOW, batch_size=INFER_BATCH_SIZE, stride=1, progress=None):
+        self.window = window
+        self.progress = progress
+        self.batch_size = max(1, int(batch_size))
+        self.stride = max(1, int(stride))
+        self.tail = np.empty((0, 66), dtype=np.float32)
+        self.pending = []
+        self.probs_parts = []
+        self.starts = []              # 추론한 윈도우의 전역 시작 인덱스
+        self.n_windows = 0            # stride 1 기준 전체 윈도우 수
+        self.last_window = None
+        self.n_frames = 0             # 지금까지 들어온 포즈 프레임 수
+
+    def push(self, coords):
+        self.pending.append(coords)
+        self.n_frames += 1
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        norm = normalize_seq_2d(np.asarray(self.pending, dtype=np.float32))
+        self.pending = []
+        seq = np.concatenate([self.tail, norm])
+        if len(seq) >= self.window:
+            views = make_windows(seq, self.window, 1)
+            # 전역 인덱스가 stride 배수인 윈도우만 추론
+            first = (-self.n_windows) % self.stride
+            picked = views[first::self.stride]
+            if len(picked):
+                self.probs_parts.append(infer_windows(picked, self.batch_size, self.progress))
+                self.starts.extend(
+                    range(self.n_windows + first, self.n_windows + len(views), self.stride)
+                )
+            self.n_windows += len(views)
+            self.last_window = seq[-self.window:].copy()
+        self.tail = seq[-(self.window - 1):].copy()
+
+    def result(self):
+        self.flush()
+        if not self.probs_parts:
+            return np.empty((0, 0), dtype=np.float32)
+        if self.starts[-1] != self.n_windows - 1:
+            # 마지막 윈도우 보충 (영상 끝 구간도 반영)
+            self.probs_parts.append(
+                infer_windows(self.last_window[None], self.batch_size, self.progress)
+            )
+            self.starts.append(self.n_windows - 1)
+        probs = np.concatenate(self.probs_parts)
+        return expand_window_probs(np.asarray(self.starts), probs, self.n_windows)
+
+
+def run_stream(video_path, batch_size=INFER_BATCH_SIZE, queue_size=QUEUE_SIZE, stride=1, progress=None):
+    """
+    process_pose + 윈도우 추론을 한 번의 디코딩으로 동시에 수행.
+    progress: 진행 콜백 — 각 단계 스레드에서 decoded/posed/inferred 단계를 보고
+    Returns: (pose_seq, pose_stats, probs) — pose_seq/pose_stats는 process_pose와 동일 형식,
+             probs는 stride 1 기준 전체 윈도우 확률 행렬
+             영상을 열 수 없으면 (None, None, None)
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        print(f"[ERROR] 영상 파일을 열 수 없습니다: {video_path}")
+        return None, None, None
+
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+
+    progress = tracker(progress)
+    if progress is not None and total_frames:
+        progress.set_total("decoded", total_frames)
+        progress.set_total("posed", total_frames)
+        # 포즈 실패 프레임만큼 실제 윈도우 수는 줄어듦 → 끝에서 완료 처리
+        n_windows = max(0, total_frames - WINDOW + 1)
+        progress.set_total("inferred", -(-n_windows // max(1, int(stride))) or None)
+
+    stop = threading.Event()
+    errors = []
+    frame_q = queue.Queue(maxsize=queue_size)
+    pose_q = queue.Queue(maxsize=queue_size * 4)
+
+    pose_frames = []
+    frame_index_map = []
+    counts = {"success": 0, "fail": 0, "skipped": 0}
+    engine = WindowedInference(batch_size=batch_size, stride=stride, progress=progress)
+
+    # 1단계: 디코딩
+    def decode():
+        frame_idx = 0
+        try:
+            while not stop.is_set():
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                if not _put(frame_q, (frame_idx, frame), stop):
+                    break
+                frame_idx += 1
+                if progress is not None:
+                    progress("decoded", frame_idx)
+        finally:
+            cap.release()
+            _put(frame_q, _END, stop)
+
+    # 2단계: 포즈 추출
+    def estimate():
+        extractor = PoseExtractor()
+        try:
+            while True:
+                item = _get(frame_q, stop)
+                if item is _END:
+                    break
+                frame_idx, frame = item
+                coords = extractor.process(frame)
+                if progress is not None:
+                    progress("posed", frame_idx + 1)
+                if extractor.last_skipped:
+                    counts["skipped"] += 1
+                if coords is None:
+                    counts["fail"] += 1
+                    continue
+                counts["success"] += 1
+                if not _put(pose_q, (frame_idx, coords), stop):
+                    break
+        finally:
+            extractor.close()
+            _put(pose_q, _END, stop)
+
+    # 3단계: 정규화 + 윈도우 추론
+    def infer():
+        while True:
+            item = _get(pose_q, stop)
+            if item is _END:
+                break
+            frame_idx, coords = item
+            pose_frames.append(np.asarray(coords, dtype=np.float32))
+            frame_index_map.append(frame_idx)
+            engine.push(coords)
+        engine.flush()
+
+    def guard(fn):
+        def run():
+            try:
+                fn()
+            except Exception as e:
+                errors.append(e)
+                stop.set()
+        return run
+
+    threads = [
+        threading.Thread(target=guard(fn), name=f"drovis-{fn.__name__}", daemon=True)
+        for fn in (decode, estimate, infer)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    if errors:
+        raise errors[0]
+
+    if pose_frames:
+        pose_seq = np.stack(pose_frames)
+    else:
+        pose_seq = np.empty((0, 66), dtype=np.float32)
+
+    pose_stats = {
+        "success": counts["success"],
+        "fail": counts["fail"],
+        "skipped": counts["skipped"],
+        "fps": fps,
+        "frame_index_map": frame_index_map,
+        "segments": 1,
+    }
+    probs = engine.result()
+    if progress is not None:
+        progress.complete("decoded", "posed", "inferred")
+    return pose_seq, pose_stats, probs
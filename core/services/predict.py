@@ -1,12 +1,15 @@
 import os
+import threading
 import numpy as np
 import torch
-import math
 import cv2
 from collections import Counter
-from core.services.preprocess import process_pose
+from core.services import cache, thumbnails
+from core.services.scoring import LABEL_MAP, SUSPICIOUS_LABELS, WINDOW, get_suspicion_level, score_probs, PROBS_DTYPE
+from core.services.progress import tracker
+from core.services.preprocess import process_pose, preprocess_signature
 from core.config import Config
-from core.models.lstm_model import LSTMModel
+from core.models.backends import InferenceBackend, load_backend
 from typing import List, Dict, Optional
 
 
@@ -16,81 +19,180 @@ DEBUG = True  # 개발- True, 운영 - False
 PELVIS_L, PELVIS_R = 23, 24          # 좌우 골반
 SHOULDER_L, SHOULDER_R = 11, 12      # 좌우 어깨
 
-WINDOW = 30
-
-# 포즈 좌표 정규화 함수
+# 포즈 좌표 정규화 함수 — (T, 66) 시퀀스 또는 (N, T, 66) 묶음을 한 번에 처리
 def normalize_seq_2d(seq: np.ndarray) -> np.ndarray:
-    if seq.ndim != 2 or seq.shape[1] != 66:
+    seq = np.asarray(seq)
+    if seq.ndim not in (2, 3) or seq.shape[-1] != 66:
         return seq.astype(np.float32)
 
-    out = np.zeros_like(seq, dtype=np.float32)
-    for t, fr in enumerate(seq):
-        kp = fr.reshape(33, 2).astype(np.float32)
-        # 골반 중앙 좌표
-        pelvis = (kp[PELVIS_L] + kp[PELVIS_R]) / 2.0
-        # 어깨 높이 
-        shoulder_y = (kp[SHOULDER_L, 1] + kp[SHOULDER_R, 1]) / 2.0
-        # 상체 길이(골반 ~ 어깨)
-        torso_h = abs(pelvis[1] - shoulder_y)
-        if torso_h < 1e-6:
-            torso_h = 1.0
-
-        # 정규화
-        out[t] = ((kp - pelvis) / torso_h).flatten()
-    return out
-
-# 라벨 매핑
-LABEL_MAP = {0: "Normal", 1: "Loitering", 2: "Handover", 3: "Reapproach"}
-SUSPICIOUS_LABELS = {1, 2, 3}
+    kp = seq.reshape(seq.shape[:-1] + (33, 2)).astype(np.float32, copy=False)
+    # 골반 중앙 좌표 (..., 2)
+    pelvis = (kp[..., PELVIS_L, :] + kp[..., PELVIS_R, :]) / 2.0
+    # 어깨 높이 (...)
+    shoulder_y = (kp[..., SHOULDER_L, 1] + kp[..., SHOULDER_R, 1]) / 2.0
+    # 상체 길이(골반 ~ 어깨), 너무 작으면 1.0으로 대체
+    torso_h = np.abs(pelvis[..., 1] - shoulder_y)
+    torso_h = np.where(torso_h < 1e-6, np.float32(1.0), torso_h)
+
+    # 정규화
+    out = (kp - pelvis[..., None, :]) / torso_h[..., None, None]
+    return out.reshape(seq.shape)
+
+# 라벨 매핑(LABEL_MAP, SUSPICIOUS_LABELS)은 core.services.scoring에 정의
 MODEL_PATH = os.path.join(Config.MODEL_FOLDER, "lstm_model.pt")
 UPLOAD_FOLDER = Config.UPLOAD_FOLDER
+INFER_BATCH_SIZE = Config.INFER_BATCH_SIZE
+CACHE_ENABLED = Config.CACHE_ENABLED
+PIPELINE_MODE = Config.PIPELINE_MODE
+WINDOW_STRIDE = Config.WINDOW_STRIDE
 
 # GPU 사용 여부 확인
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 
-# AI 모델 로드
-model = None
-if os.path.exists(MODEL_PATH):
-    model = LSTMModel()
-    state = torch.load(MODEL_PATH, map_location=device)
-    model.load_state_dict(state)
-    model.to(device)
-    model.eval()
-    torch.set_num_threads(1)
-
-
-# 위험도(상, 중, 하) 판단 함수
-def get_suspicion_level(label_counts: Counter, *, min_total_chunks: int = 4) -> str:
-    total = sum(label_counts.values())
-    if total == 0 or total < min_total_chunks:
-        return "하"
-
-    loitering = label_counts.get(1, 0)
-    handover = label_counts.get(2, 0)
-    reapproach = label_counts.get(3, 0)
-
-    # 총 chunk 수 대비 20%, 80% 기준
-    thr20 = math.ceil(0.20 * total)
-    thr80 = math.ceil(0.80 * total)
-
-    # 20% 이상 등장한 행동 개수
-    meets20 = [
-        loitering >= thr20,
-        handover >= thr20,
-        reapproach >= thr20,
-    ]
-    cnt20 = sum(meets20)
-
-    # 위험도 규칙
-    if cnt20 == 3:
-        return "상"
-    if cnt20 >= 2:
-        return "중"
-    if loitering >= thr80 or handover >= thr80 or reapproach >= thr80:
-        return "중"
-    if cnt20 == 1:
-        return "하"
-    return "하"
+# AI 모델 (최초 사용 시 로드)
+_model = None
+_model_loaded = False
+_model_lock = threading.Lock()
+
+
+# AI 모델 로드 — 프로세스당 1회, 여러 스레드가 동시에 불러도 안전
+# Config.INFERENCE_BACKEND 백엔드를 쓰고, 변환/로드에 실패하면 eager로 대체
+def get_model() -> Optional[InferenceBackend]:
+    global _model, _model_loaded
+    if not _model_loaded:
+        with _model_lock:
+            if not _model_loaded:
+                if os.path.exists(MODEL_PATH):
+                    try:
+                        _model = load_backend(Config.INFERENCE_BACKEND, MODEL_PATH, device)
+                    except Exception as e:
+                        print(f"[WARN] 추론 백엔드 '{Config.INFERENCE_BACKEND}' 사용 불가, eager로 대체: {e}")
+                        _model = load_backend("eager", MODEL_PATH, device)
+                _model_loaded = True
+    return _model
+
+
+# 모델 가중치 파일 해시 (캐시 키 구성용)
+_model_version = None
+
+def get_model_version() -> Optional[str]:
+    global _model_version
+    if _model_version is None and os.path.exists(MODEL_PATH):
+        _model_version = cache.file_hash(MODEL_PATH)[:16]
+    return _model_version
+
+
+# 영상 내용 + 모델/전처리 버전 기반 캐시 키 (비활성/실패 시 None)
+def _cache_key(video_path: str, stride: int = 1, video_hash: Optional[str] = None) -> Optional[str]:
+    if not CACHE_ENABLED:
+        return None
+    try:
+        return cache.make_key(
+            video_hash or cache.file_hash(video_path),
+            get_model_version(), preprocess_signature(), WINDOW, stride,
+        )
+    except OSError:
+        return None
+
+
+# 슬라이딩 윈도우 생성 (복사 없이 원본 시퀀스를 공유하는 view)
+def make_windows(seq: np.ndarray, window: int = WINDOW, step: int = 1) -> np.ndarray:
+    if len(seq) < window:
+        return np.empty((0, window) + seq.shape[1:], dtype=seq.dtype)
+    # (N, 66, window) view -> (N, window, 66)
+    views = np.lib.stride_tricks.sliding_window_view(seq, window, axis=0)
+    return views.transpose(0, 2, 1)[::step]
+
+
+# 윈도우 묶음 단위 추론 → (N, num_classes) 확률 행렬
+# progress: ProgressTracker — 배치마다 inferred 단계를 윈도우 수만큼 증가
+def infer_windows(windows: np.ndarray, batch_size: int = INFER_BATCH_SIZE, progress=None) -> np.ndarray:
+    batch_size = max(1, int(batch_size))
+    model = get_model()
+    logits = []
+    for s in range(0, len(windows), batch_size):
+        # view 구간만 연속 메모리로 복사 (배치 크기만큼만 사용)
+        batch = np.array(windows[s:s + batch_size], dtype=np.float32, order="C")
+        logits.append(model(batch))
+        if progress is not None:
+            progress.advance("inferred", len(batch))
+    if not logits:
+        return np.empty((0, 0), dtype=np.float32)
+    # softmax는 전체 로짓 행렬에 한 번만 적용
+    logits = np.concatenate(logits).astype(np.float32, copy=False)
+    e = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return e / e.sum(axis=1, keepdims=True)
+
+
+# 윈도우 시작 인덱스 (stride 간격, 마지막 윈도우는 항상 포함)
+def window_starts(n_frames: int, window: int = WINDOW, stride: int = 1) -> np.ndarray:
+    n_windows = n_frames - window + 1
+    if n_windows <= 0:
+        return np.empty(0, dtype=np.int64)
+    starts = np.arange(0, n_windows, max(1, int(stride)))
+    if starts[-1] != n_windows - 1:
+        starts = np.append(starts, n_windows - 1)
+    return starts
+
+
+# 희소 윈도우 확률 → stride 1 기준 전체 윈도우 확률로 선형 보간
+def expand_window_probs(starts: np.ndarray, probs: np.ndarray, n_windows: int) -> np.ndarray:
+    if len(starts) == n_windows:
+        return probs
+    grid = np.arange(n_windows)
+    dense = np.empty((n_windows, probs.shape[1]), dtype=probs.dtype)
+    for c in range(probs.shape[1]):
+        dense[:, c] = np.interp(grid, starts, probs[:, c])
+    return dense
+
+
+# stride 간격 윈도우만 추론한 뒤 전체 윈도우 확률 행렬 복원
+# stride 1만 기존 윈도우별 추론과 정확히 같음 (백엔드 오차 ~1e-6).
+# stride > 1이면 건너뛴 윈도우는 선형 보간이라 짧은 행동 전환 구간에서 크게 어긋날 수 있음 —
+# 541프레임 테스트 영상(512윈도우) 실측, stride 1 대비:
+#   stride  평균 |Δp|  99% |Δp|  최대 |Δp|  argmax 일치
+#      2     0.0045    0.148     0.873      99.2%
+#      5     0.0121    0.353     0.964      97.9%
+#     10     0.0202    0.451     0.965      97.1%
+#   (행동 비율은 ±1%p 안, 위험도 등급은 같았음)
+# 윈도우 단위 결과가 기존과 같아야 하면(근거 프레임, 이벤트 경계, 재채점 비교) stride 1 사용.
+def infer_sequence(sequence: np.ndarray,
+                   window: int = WINDOW,
+                   stride: int = 1,
+                   batch_size: int = INFER_BATCH_SIZE,
+                   progress=None) -> np.ndarray:
+    progress = tracker(progress)
+    stride = max(1, int(stride))
+    starts = window_starts(len(sequence), window, stride)
+    if len(starts) == 0:
+        return np.empty((0, 0), dtype=np.float32)
+    if progress is not None:
+        progress.set_total("inferred", len(starts))
+
+    views = make_windows(sequence, window, 1)
+    probs = infer_windows(views[::stride], batch_size, progress)
+    if len(probs) < len(starts):
+        # 마지막 윈도우 보충 (영상 끝 구간도 반영)
+        probs = np.concatenate([probs, infer_windows(views[-1:], batch_size, progress)])
+    return expand_window_probs(starts, probs, len(views))
+
+
+# 분석에 쓸 stride — 위험도 등급이 유지된 것을 확인한 범위(위 표의 5)까지만 허용.
+# 설정값이 그보다 크면 판정이 조용히 바뀌지 않도록 경고 후 MAX_WINDOW_STRIDE로 제한.
+# (tools/bench_stride.py는 infer_sequence를 직접 불러 더 큰 값도 측정 가능)
+MAX_WINDOW_STRIDE = 5
+
+
+def supported_stride(stride: Optional[int]) -> int:
+    stride = max(1, int(stride or 1))
+    if stride > MAX_WINDOW_STRIDE:
+        print(f"[WARN] 윈도우 stride {stride}는 지원 범위(1~{MAX_WINDOW_STRIDE}) 밖이라 "
+              f"{MAX_WINDOW_STRIDE}(으)로 제한합니다.")
+        return MAX_WINDOW_STRIDE
+    return stride
+
+
+# 위험도(상, 중, 하) 판단 함수는 core.services.scoring.get_suspicion_level (재채점과 공용)
 
 # 관절 좌표에 점, 선 표시
 def _draw_skeleton_on_frame(frame: np.ndarray, xy66: np.ndarray) -> None:
@@ -111,15 +213,50 @@ def _draw_skeleton_on_frame(frame: np.ndarray, xy66: np.ndarray) -> None:
 
 # 라벨별로 가장 확률 높은 윈도우 인덱스 1개 선택
 def _pick_best_index_per_label(predictions: List[int],
-                               probs_list: List[np.ndarray],
+                               probs_list: np.ndarray,
                                target_label: int) -> int:
-    best_i, best_p = -1, -1.0
-    for i, (pred, probs) in enumerate(zip(predictions, probs_list)):
-        if pred == target_label:
-            p = float(probs[target_label])
-            if p > best_p:
-                best_p, best_i = p, i
-    return best_i  # 없으면 -1
+    preds = np.asarray(predictions)
+    mask = preds == target_label
+    if not mask.any():
+        return -1  # 없으면 -1
+    scores = np.where(mask, np.asarray(probs_list)[:, target_label], -1.0)
+    return int(np.argmax(scores))   # 동점이면 앞쪽 윈도우
+
+
+# 다음 프레임이 이만큼 이상 떨어져 있으면 grab으로 건너뛰지 않고 seek
+# (가까운 프레임은 grab이 빠르고 정확, 멀리 떨어진 프레임은 키프레임 seek이 빠름)
+SEEK_MIN_GAP = 600
+
+
+# 근거 프레임(라벨당 1장, 최대 3장)을 앞에서부터 순서대로 읽어 가져옴
+# 포즈 추출 중에는 원본 프레임을 보관하지 않음 — 후보 프레임을 버퍼에 두면 분석마다
+# 1080p 기준 수백 MB를 잡아 워커 수만큼 늘어나므로, 고른 프레임 번호만 다시 읽는 쪽이 쌈
+def _read_frames(video_path: str, frame_indices) -> Dict[int, np.ndarray]:
+    wanted = sorted(set(int(i) for i in frame_indices if i is not None and i >= 0))
+    frames = {}
+    if not wanted:
+        return frames
+    cap = cv2.VideoCapture(video_path)
+    pos = 0
+    try:
+        for target in wanted:
+            if target - pos >= SEEK_MIN_GAP and cap.set(cv2.CAP_PROP_POS_FRAMES, target):
+                pos = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+                if pos > target:
+                    continue                # 요청보다 뒤로 이동한 경우 — 잘못된 프레임을 쓰지 않음
+            # 필요 없는 프레임은 grab만 (색 변환/복사 생략)
+            while pos < target and cap.grab():
+                pos += 1
+            if pos < target:
+                break
+            ok, frame = cap.read()
+            pos += 1
+            if not ok:
+                break
+            frames[target] = frame
+    finally:
+        cap.release()
+    return frames
 
 
 # 실제 프레임 캡처, 좌표 오버레이, JPG 저장
@@ -132,20 +269,20 @@ def save_evidence_images(
     out_dir: str,
     label_map: Dict[int, str],
     frame_index_map: Optional[List[int]] = None,
+    progress=None,                     # 진행 콜백 (라벨 하나 처리할 때마다 evidence 단계 보고)
+    fps: Optional[float] = None,
 ) -> List[Dict]:
 
+    progress = tracker(progress)
     os.makedirs(out_dir, exist_ok=True)
-    cap = cv2.VideoCapture(video_path)
-    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
-
-    evidence = []
-    suspicious_labels = [1, 2, 3]  
+    suspicious_labels = [1, 2, 3]
 
+    # 라벨별 대표 윈도우의 가운데 프레임 결정
+    targets = []
     for lbl in suspicious_labels:
         best = _pick_best_index_per_label(predictions, probs_list, lbl)
         if best < 0:
             continue
-
         mid_pose_idx = best + (window // 2)  # 전역 프레임 인덱스
         # 원본 영상 프레임 번호로 변환(= 캡처에 쓸 인덱스)
         if frame_index_map and 0 <= mid_pose_idx < len(frame_index_map):
@@ -153,12 +290,23 @@ def save_evidence_images(
         else:
             # 하위 호환(매핑이 없을 때 — 정확도 떨어짐)
             mid_frame = mid_pose_idx
+        targets.append((lbl, mid_pose_idx, mid_frame))
 
-        # 해당 프레임 캡처
-        cap.set(cv2.CAP_PROP_POS_FRAMES, mid_frame)
-        ok, frame = cap.read()
-        if not ok:
+    # 고른 프레임만 다시 읽음 (가까우면 grab, SEEK_MIN_GAP 이상 떨어지면 seek)
+    frames = _read_frames(video_path, [f for _, _, f in targets])
+    if not fps:
+        cap = cv2.VideoCapture(video_path)
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        cap.release()
+
+    evidence = []
+    for i, (lbl, mid_pose_idx, mid_frame) in enumerate(targets):
+        if progress is not None:
+            progress("evidence", i, len(targets))
+        frame = frames.get(mid_frame)
+        if frame is None:
             continue
+        frame = frame.copy()
 
         # 좌표는 '포즈 시퀀스 인덱스'로 접근해서 그려야 정합성 유지
         if 0 <= mid_pose_idx < len(pose_seq_raw):
@@ -176,6 +324,8 @@ def save_evidence_images(
         fname = f"{base}_{label_txt}_{mid_frame:06d}.jpg"
         fpath = os.path.join(out_dir, fname)
         cv2.imwrite(fpath, frame)
+        # 근거 창용 썸네일도 같이 저장 (프레임이 메모리에 있을 때 — 다시 읽지 않음)
+        thumbnails.make_thumbnail(fpath, image=frame)
 
         evidence.append({
             "label": label_txt,
@@ -184,12 +334,24 @@ def save_evidence_images(
             "image_path": fpath.replace("\\", "/"),
         })
 
-    cap.release()
+    if progress is not None:
+        progress.complete("evidence")
     return evidence
 
 
 # 전체 예측 함수
-def predict_from_video(video_path: str, user_id: str) -> dict:
+def predict_from_video(video_path: str,
+                       user_id: str,
+                       stride: Optional[int] = None,
+                       progress=None,
+                       video_hash: Optional[str] = None) -> dict:
+    """
+    video_hash: 호출 측에서 이미 계산한 영상 SHA-256 (있으면 캐시 키 계산 시 재해시 생략)
+    progress: 진행 콜백 — 단계(decoded/posed/inferred/evidence)별 처리 수와
+              전체 진행률, 남은 시간(eta_sec)을 담은 dict를 받음 (core.services.progress 참고).
+              스트리밍 모드에서는 파이프라인 스레드에서 호출될 수 있음.
+    """
+    progress = tracker(progress)
     # 입력 파일 체크
     if not os.path.isfile(video_path):
         return {
@@ -197,84 +359,135 @@ def predict_from_video(video_path: str, user_id: str) -> dict:
             "message": f"영상 파일이 존재하지 않습니다: {video_path}",
         }
     filename = os.path.basename(video_path)
-    npy_name = os.path.splitext(filename)[0] + ".pipe_norm.npy"
-    npy_path = os.path.join(UPLOAD_FOLDER, npy_name)
+    base_name = os.path.splitext(filename)[0]
+    # 영상 내용 해시 — 캐시 키와 기록(감시 폴더 중복 확인)에 같이 사용
+    if video_hash is None:
+        try:
+            video_hash = cache.file_hash(video_path)
+        except OSError:
+            pass
+
+    # 0) 캐시 조회 — 같은 내용의 영상이면 포즈 추출/추론 생략
+    stride = supported_stride(stride or WINDOW_STRIDE)
+    cache_key = _cache_key(video_path, stride, video_hash)
+    cached = cache.load_entry(cache_key) if cache_key else None
+
+    # 파일명이 같은 다른 영상끼리 덮어쓰지 않도록 내용 해시를 붙임
+    npy_suffix = f"_{cache_key[:12]}" if cache_key else ""
+    npy_path = os.path.join(UPLOAD_FOLDER, f"{base_name}{npy_suffix}.pipe_norm.npy")
+
+    if cached is not None:
+        pose_seq = cached["pose"]
+        pose_stats = dict(cached["meta"].get("pose_stats") or {})
+        pose_stats["frame_index_map"] = cached["frame_index_map"]
+        probs_list = cached["probs"]
+        if progress is not None:
+            progress.complete("decoded", "posed", "inferred")
+        if not os.path.exists(npy_path):
+            os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+            np.save(npy_path, normalize_seq_2d(np.asarray(pose_seq, dtype=np.float32)))
+    elif PIPELINE_MODE == "stream":
+        if get_model() is None:
+            return {"success": False, "message": "AI 모델 파일이 없습니다."}
+
+        # 1~4) 디코딩/포즈 추출/정규화/추론 단계를 스레드로 동시에 실행
+        # (pipeline 모듈이 이 모듈을 import 하므로 함수 안에서 불러옴)
+        from core.services.pipeline import run_stream
+        try:
+            pose_seq, pose_stats, probs_list = run_stream(
+                video_path, batch_size=INFER_BATCH_SIZE, stride=stride, progress=progress,
+            )
+        except Exception as e:
+            return {"success": False, "message": f"AI 예측 오류: {str(e)}"}
 
-    # 1) 포즈 추출
-    try:
-        pose_seq, pose_stats = process_pose(
-            video_path,
-            detected_points=33,
-            return_stats=True,
-        )
         if pose_seq is None or len(pose_seq) == 0:
             return {"success": False, "message": "MediaPipe pose 변환 실패"}
-    except Exception as e:
-        return {"success": False, "message": f"전처리 오류: {str(e)}"}
-
-    if model is None:
-        return {"success": False, "message": "AI 모델 파일이 없습니다."}
-
-
-    try:
-        # 2) 정규화 및 저장
-        sequence = normalize_seq_2d(np.asarray(pose_seq, dtype=np.float32))
-        os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-        np.save(npy_path, sequence)
-
-        if len(sequence) < 30:
+        if len(pose_seq) < 30:
             return {
                 "success": False,
-                "message": f"입력 포즈 시퀀스 길이가 부족합니다. ({len(sequence)}프레임 < 30)",
+                "message": f"입력 포즈 시퀀스 길이가 부족합니다. ({len(pose_seq)}프레임 < 30)",
             }
 
+        os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+        np.save(npy_path, normalize_seq_2d(pose_seq))
+    else:
+        if get_model() is None:
+            return {"success": False, "message": "AI 모델 파일이 없습니다."}
 
-        # 3) 30 프레임 슬라이딩 윈도우 생성
-        def make_chunk_step(seq: np.ndarray, window: int = 30, step: int = 1):
-            n = len(seq)
-            return [seq[i:i+window] for i in range(0, n - window + 1, step)]
-        
-        chunks = make_chunk_step(sequence, window=WINDOW)
-        if not chunks:
-            return {
-                "success": False,
-                "message": f"윈도우가 생성되지 않았습니다. (frames={len(sequence)} < 30)",
-            }
+        # 1) 포즈 추출 — 단일 프로세스 추출이면 같은 디코딩 루프에서 윈도우 추론
+        # (구간 병렬 추출이면 on_frame이 호출되지 않으므로 아래에서 infer_sequence로 추론)
+        # 원본 프레임은 보관하지 않음 — 근거 프레임은 추론이 끝난 뒤 save_evidence_images가 몇 장만 다시 읽음
+        from core.services.pipeline import WindowedInference
+        engine = WindowedInference(batch_size=INFER_BATCH_SIZE, stride=stride, progress=progress)
 
-        # 4) 모델 예측
-        predictions = []
-        probs_list = []
+        def on_frame(frame_idx, coords, frame):
+            engine.push(coords)
 
-        with torch.no_grad():
-            for chunk in chunks:
-                x = (
-                    torch.from_numpy(np.asarray(chunk, dtype=np.float32))
-                    .unsqueeze(0)
-                    .to(device)
-                )
-                logits = model(x)
+        try:
+            pose_seq, pose_stats = process_pose(
+                video_path,
+                detected_points=33,
+                return_stats=True,
+                progress=progress,
+                on_frame=on_frame,
+            )
+            if pose_seq is None or len(pose_seq) == 0:
+                return {"success": False, "message": "MediaPipe pose 변환 실패"}
+        except Exception as e:
+            return {"success": False, "message": f"전처리 오류: {str(e)}"}
 
-                probs = torch.softmax(logits, dim=1)[0].cpu().numpy()
-                pred_label = int(np.argmax(probs))
-                predictions.append(pred_label)
-                probs_list.append(probs)
+        try:
+            # 2) 정규화 및 저장
+            sequence = normalize_seq_2d(np.asarray(pose_seq, dtype=np.float32))
+            os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+            np.save(npy_path, sequence)
+
+            if len(sequence) < 30:
+                return {
+                    "success": False,
+                    "message": f"입력 포즈 시퀀스 길이가 부족합니다. ({len(sequence)}프레임 < 30)",
+                }
+
+            # 3~4) 30 프레임 슬라이딩 윈도우(stride 간격) 배치 추론 → 전체 윈도우 확률 복원
+            if engine.n_frames == len(sequence):
+                probs_list = engine.result()
+                if progress is not None:
+                    progress.complete("inferred")
+            else:
+                probs_list = infer_sequence(
+                    sequence, window=WINDOW, stride=stride, batch_size=INFER_BATCH_SIZE,
+                    progress=progress,
+                )
+            if len(probs_list) == 0:
+                return {
+                    "success": False,
+                    "message": f"윈도우가 생성되지 않았습니다. (frames={len(sequence)} < 30)",
+                }
+        except Exception as e:
+            return {"success": False, "message": f"AI 예측 오류: {str(e)}"}
 
+    try:
+        predictions = probs_list.argmax(axis=1).tolist()
         label_counts = Counter(predictions)
 
         # 포즈 통계 기본값 보정
         if not isinstance(pose_stats, dict):
-            pose_stats = {"success": int(len(sequence)), "fail": 0}
-
-        # 5) 행동별 평균 확률 계산
-        avg = np.mean(np.vstack(probs_list), axis=0)
-        behavior_probs_pct = {
-            "Loitering": round(float(avg[1] * 100), 1),
-            "Handover": round(float(avg[2] * 100), 1),
-            "Reapproach": round(float(avg[3] * 100), 1),
-        }
-
-        # 6) 위험도 계산
-        suspicion_level = get_suspicion_level(label_counts)
+            pose_stats = {"success": int(len(pose_seq)), "fail": 0}
+
+        # 5~6) 행동별 평균 확률 + 위험도 (저장된 확률로 재채점할 때와 같은 계산)
+        scored = score_probs(probs_list)
+        behavior_probs_pct = scored["behavior_probs_pct"]
+        suspicion_level = scored["result"]
+
+        # 7) 윈도우별 라벨 → 행동 이벤트 구간 (pipeline과 같은 이유로 함수 안에서 import)
+        from core.services.events import segment_events
+        events = segment_events(
+            probs_list,
+            frame_index_map=pose_stats.get("frame_index_map"),
+            fps=pose_stats.get("fps") or 30.0,
+            window=WINDOW,
+            stride=1,                 # probs_list는 stride 1로 펼친 확률
+        )
 
 
         try:
@@ -282,7 +495,6 @@ def predict_from_video(video_path: str, user_id: str) -> dict:
         except Exception:
             uploads_root = None
 
-        base_name = os.path.splitext(os.path.basename(video_path))[0]
         if uploads_root:
             evidence_dir = os.path.join(uploads_root, "evidence", base_name)
         else:
@@ -293,19 +505,50 @@ def predict_from_video(video_path: str, user_id: str) -> dict:
         if isinstance(pose_stats, dict):
             frame_index_map = pose_stats.get("frame_index_map")
 
-        # 라벨별 대표 프레임 1장씩 캡처 + 좌표 오버레이 + 저장
-        evidence = save_evidence_images(
-            video_path=video_path,
-            pose_seq_raw=pose_seq,     # process_pose의 원본 좌표
-            predictions=predictions,       # 윈도우별 라벨
-            probs_list=probs_list,         # 윈도우별 확률
-            window=WINDOW,                 
-            out_dir=evidence_dir,
-            label_map=LABEL_MAP,           # 기존에 쓰던 라벨 맵 그대로
-            frame_index_map=frame_index_map,
-        )
-
+        # 캐시된 근거 이미지가 남아 있으면 그대로 사용
+        evidence = None
+        if cached is not None:
+            cached_ev = cached["meta"].get("evidence")
+            if isinstance(cached_ev, list) and all(
+                os.path.exists(ev.get("image_path", "")) for ev in cached_ev
+            ):
+                evidence = cached_ev
 
+        # 라벨별 대표 프레임 1장씩 캡처 + 좌표 오버레이 + 저장
+        if evidence is None:
+            evidence = save_evidence_images(
+                video_path=video_path,
+                pose_seq_raw=pose_seq,     # process_pose의 원본 좌표
+                predictions=predictions,       # 윈도우별 라벨
+                probs_list=probs_list,         # 윈도우별 확률
+                window=WINDOW,
+                out_dir=evidence_dir,
+                label_map=LABEL_MAP,           # 기존에 쓰던 라벨 맵 그대로
+                frame_index_map=frame_index_map,
+                progress=progress,
+                fps=pose_stats.get("fps") if isinstance(pose_stats, dict) else None,
+            )
+        elif progress is not None:
+            progress.complete("evidence")
+
+        # 캐시 저장 (실패해도 분석 결과에는 영향 없음)
+        if cache_key and (cached is None or evidence is not cached["meta"].get("evidence")):
+            try:
+                cache.save_entry(
+                    cache_key,
+                    pose=pose_seq,
+                    frame_index_map=frame_index_map or [],
+                    probs=probs_list,
+                    meta={
+                        "pose_stats": {
+                            k: v for k, v in pose_stats.items() if k != "frame_index_map"
+                        },
+                        "evidence": evidence,
+                    },
+                )
+            except Exception as e:
+                if DEBUG:
+                    print(f"[CACHE] 저장 실패: {e}")
 
         # DEBUG 출력
         if DEBUG:
@@ -330,7 +573,8 @@ def predict_from_video(video_path: str, user_id: str) -> dict:
                 f"({', '.join(detected) if detected else '탐지 없음'})\n"
             )
             print(
-                f"[DBG] frames(after norm)={len(sequence)}, chunks={len(chunks)}, expect={max(len(sequence)-29,0)}"
+                f"[DBG] frames(after norm)={len(pose_seq)}, chunks={len(probs_list)}, "
+                f"expect={max(len(pose_seq)-29,0)}, cache={'hit' if cached is not None else 'miss'}"
             )
 
             print(f"[EVIDENCE] dir: {evidence_dir}")
@@ -339,9 +583,7 @@ def predict_from_video(video_path: str, user_id: str) -> dict:
                 print(f"  - {ev['label']} @{ev['timestamp_sec']}s -> {ev['image_path']}")
 
         # 실제 탐지된 행동 라벨 리스트
-        detected = [
-            LABEL_MAP[l] for l in SUSPICIOUS_LABELS if label_counts.get(l, 0) > 0
-        ]
+        detected = scored["detected_actions"]
 
     except Exception as e:
         return {"success": False, "message": f"AI 예측 오류: {str(e)}"}
@@ -356,7 +598,12 @@ def predict_from_video(video_path: str, user_id: str) -> dict:
         "behavior_probs_pct": behavior_probs_pct,   # 탐지 행동 비율(%)
         "behavior_counts":behavior_probs_pct,       # 프론트 호환용
         "detected_actions": detected,               
-        "result_per_chunk": [LABEL_MAP[p] for p in predictions],
+        "events": events,                           # 라벨별 행동 구간 (시작/끝 시각, 최고/평균 확률)
+        "label_counts": scored["label_counts"],     # 윈도우별 라벨 수 (예전 result_per_chunk 집계)
+        "window_probs": probs_list.astype(PROBS_DTYPE),   # 재채점용 윈도우별 확률
         "npy_path": npy_path,
         "evidence": evidence,
+        "window_stride": stride,
+        "cache_hit": cached is not None,
+        "video_hash": video_hash,
     }
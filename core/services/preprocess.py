@@ -1,64 +1,362 @@
 # preprocess.py
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import cv2
 import numpy as np
 import mediapipe as mp
 
-def process_pose(
-    video_path,
-    detected_points=33,
-    return_stats=True,
-):
+from core.config import Config
+from core.services.progress import tracker
+
+POSE_WORKERS = Config.POSE_WORKERS
+POSE_WARMUP_FRAMES = Config.POSE_WARMUP_FRAMES
+MIN_SEGMENT_FRAMES = 300          # 구간 하나의 최소 길이 (이보다 짧으면 직렬 처리)
+PREPROCESS_VERSION = "1"          # 포즈 추출 방식이 바뀌면 올려서 캐시 무효화
+
+GATE_WIDTH = 64                   # 움직임 비교용 축소 프레임 너비
+GATE_PIXEL_DELTA = 12             # 이 값보다 밝기가 크게 변한 픽셀을 '바뀐 픽셀'로 간주
+ROI_PADDING = 0.35                # 관절 bbox 대비 ROI 여백 비율 (각 변)
+ROI_MIN_SIZE = 0.2                # ROI 최소 크기 (프레임 대비 비율)
+
+
+# 캐시 키용 전처리 설정 문자열 (결과에 영향을 주는 옵션 포함)
+def preprocess_signature():
+    gate = (
+        f"gate={Config.MOTION_GATE_THRESHOLD}/{Config.MOTION_GATE_MAX_SKIP}"
+        if Config.MOTION_GATE else "gate=off"
+    )
+    scale = f"long={Config.POSE_TARGET_LONG_SIDE}" if Config.POSE_TARGET_LONG_SIDE > 0 else "long=off"
+    roi = "roi=on" if Config.POSE_ROI_CROP else "roi=off"
+    return f"v{PREPROCESS_VERSION}:{gate}:{scale}:{roi}"
+
+
+def _create_pose():
     mp_pose = mp.solutions.pose
-    pose = mp_pose.Pose(
+    return mp_pose.Pose(
         static_image_mode=False,
         min_detection_confidence=0.5,
         min_tracking_confidence=0.5,
     )
 
-    cap = cv2.VideoCapture(video_path)
-    frames = []
-    success_cnt, fail_cnt = 0, 0
 
-    if not cap.isOpened():
-        print(f"[ERROR] 영상 파일을 열 수 없습니다: {video_path}")
-        return (None, None) if return_stats else None
+# 프레임 1장 → 33×2 좌표 리스트 (검출 실패 시 None)
+def _frame_to_coords(pose, frame):
+    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    results = pose.process(frame_rgb)
+    if not results.pose_landmarks:
+        return None
 
-    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    coords = []
+    for lm in results.pose_landmarks.landmark:
+        # Mediapipe 포즈는 0~1 정규화 좌표 (x, y)
+        coords.extend([lm.x, lm.y])
+    return coords
+
+
+# 직전 관절 좌표(0~1) 주변의 여백 포함 ROI → 픽셀 박스 (x0, y0, x1, y1)
+def _roi_box(coords, width, height):
+    pts = np.clip(np.asarray(coords, dtype=np.float32).reshape(33, 2), 0.0, 1.0)
+    (x0, y0), (x1, y1) = pts.min(axis=0), pts.max(axis=0)
+    bw = max(x1 - x0, ROI_MIN_SIZE)
+    bh = max(y1 - y0, ROI_MIN_SIZE)
+    cx, cy = (x0 + x1) / 2.0, (y0 + y1) / 2.0
+    half_w = bw * (0.5 + ROI_PADDING)
+    half_h = bh * (0.5 + ROI_PADDING)
+    box = (
+        int(max(0.0, cx - half_w) * width),
+        int(max(0.0, cy - half_h) * height),
+        int(np.ceil(min(1.0, cx + half_w) * width)),
+        int(np.ceil(min(1.0, cy + half_h) * height)),
+    )
+    if box[2] - box[0] < 2 or box[3] - box[1] < 2:
+        return None
+    return box
+
+
+# ROI 안쪽 여백 영역에 관절이 모두 들어 있으면 True (박스를 자주 바꾸지 않기 위함)
+def _inside_box(coords, box, width, height):
+    x0, y0, x1, y1 = box
+    pts = np.clip(np.asarray(coords, dtype=np.float32).reshape(33, 2), 0.0, 1.0)
+    margin_x = (x1 - x0) * 0.1
+    margin_y = (y1 - y0) * 0.1
+    xs, ys = pts[:, 0] * width, pts[:, 1] * height
+    return bool(
+        xs.min() >= x0 + margin_x and xs.max() <= x1 - margin_x
+        and ys.min() >= y0 + margin_y and ys.max() <= y1 - margin_y
+    )
+
+
+# 프레임 단위 포즈 추출기 (Pose 인스턴스 + 움직임 게이트 + 축소/ROI)
+class PoseExtractor:
+    def __init__(
+        self,
+        motion_gate=None,
+        gate_threshold=None,
+        gate_max_skip=None,
+        target_long_side=None,
+        roi_crop=None,
+    ):
+        self.pose = _create_pose()
+        self.motion_gate = Config.MOTION_GATE if motion_gate is None else motion_gate
+        self.gate_threshold = (
+            Config.MOTION_GATE_THRESHOLD if gate_threshold is None else gate_threshold
+        )
+        self.gate_max_skip = Config.MOTION_GATE_MAX_SKIP if gate_max_skip is None else gate_max_skip
+
+        self.ref_gray = None          # 마지막으로 MediaPipe를 돌린 프레임 (축소 흑백)
+        self.last_coords = None
+        self.skip_run = 0
+        self.last_skipped = False     # 직전 process() 호출이 건너뛴 프레임인지
+
+        self.target_long_side = (
+            Config.POSE_TARGET_LONG_SIDE if target_long_side is None else target_long_side
+        )
+        self.roi_crop = Config.POSE_ROI_CROP if roi_crop is None else roi_crop
+        self.roi_pose = None          # ROI 전용 Pose (좌표계가 달라 트래킹 상태를 분리)
+        self.roi = None               # 현재 ROI 픽셀 박스 (원본 프레임 기준)
+
+    # 직전 추출 프레임과 거의 같으면 True
+    def _is_static(self, frame):
+        h, w = frame.shape[:2]
+        size = (GATE_WIDTH, max(1, round(h * GATE_WIDTH / w)))
+        gray = cv2.cvtColor(cv2.resize(frame, size, interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+
+        static = (
+            self.ref_gray is not None
+            and self.skip_run < self.gate_max_skip
+            and np.count_nonzero(cv2.absdiff(gray, self.ref_gray) > GATE_PIXEL_DELTA) / gray.size
+            < self.gate_threshold
+        )
+        if not static:
+            self.ref_gray = gray
+        return static
+
+    def process(self, frame):
+        """프레임 → 좌표 리스트 (실패 시 None). 정지 프레임은 직전 결과를 그대로 사용."""
+        if self.motion_gate and self._is_static(frame):
+            self.skip_run += 1
+            self.last_skipped = True
+            return list(self.last_coords) if self.last_coords is not None else None
+
+        self.skip_run = 0
+        self.last_skipped = False
+        self.last_coords = self._detect(frame)
+        return self.last_coords
+
+    # 긴 변이 target_long_side를 넘으면 축소 (좌표는 0~1 정규화라 변환 불필요)
+    def _shrink(self, img):
+        h, w = img.shape[:2]
+        if not self.target_long_side or max(h, w) <= self.target_long_side:
+            return img
+        scale = self.target_long_side / max(h, w)
+        size = (max(1, round(w * scale)), max(1, round(h * scale)))
+        return cv2.resize(img, size, interpolation=cv2.INTER_LINEAR)
 
-    frame_idx = 0                     # 원본 영상의 전역 프레임 번호
+    def _detect(self, frame):
+        if not self.roi_crop:
+            return _frame_to_coords(self.pose, self._shrink(frame))
+
+        h, w = frame.shape[:2]
+        # 추적 중이면 원본에서 ROI만 잘라 추출 → 전체 프레임 0~1 좌표로 복원
+        if self.roi is not None:
+            x0, y0, x1, y1 = self.roi
+            coords = _frame_to_coords(self.roi_pose, self._shrink(frame[y0:y1, x0:x1]))
+            if coords is not None:
+                pts = np.asarray(coords, dtype=np.float32).reshape(33, 2)
+                pts[:, 0] = (pts[:, 0] * (x1 - x0) + x0) / w
+                pts[:, 1] = (pts[:, 1] * (y1 - y0) + y0) / h
+                coords = pts.flatten().tolist()
+                if not _inside_box(coords, self.roi, w, h):
+                    self.roi = _roi_box(coords, w, h)
+                return coords
+            # ROI에서 놓치면 전체 프레임으로 재검출
+            self.roi = None
+
+        coords = _frame_to_coords(self.pose, self._shrink(frame))
+        if coords is not None:
+            self.roi = _roi_box(coords, w, h)
+            if self.roi_pose is None:
+                self.roi_pose = _create_pose()
+        return coords
+
+    def close(self):
+        self.pose.close()
+        if self.roi_pose is not None:
+            self.roi_pose.close()
+
+
+# [start, end) 구간 포즈 추출 (cap은 warmup_from 위치에 있어야 함)
+# progress: ProgressTracker — 처리한 프레임 수를 decoded/posed 단계로 보고
+# on_frame(frame_idx, coords, frame): 포즈 추출에 성공한 프레임마다 호출
+def _extract_range(cap, extractor, warmup_from, start, end=None, progress=None, on_frame=None):
+    frames = []
     frame_index_map = []              # 성공 프레임의 전역 프레임 번호 목록
+    success_cnt, fail_cnt, skipped_cnt = 0, 0, 0
 
-    while True:
+    frame_idx = warmup_from           # 원본 영상의 전역 프레임 번호
+    while end is None or frame_idx < end:
         ret, frame = cap.read()
         if not ret:
             break
 
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = pose.process(frame_rgb)
+        coords = extractor.process(frame)
 
-        if results.pose_landmarks:
-            coords = []
-            for lm in results.pose_landmarks.landmark:
-                # Mediapipe 포즈는 0~1 정규화 좌표 (x, y)
-                coords.extend([lm.x, lm.y])
-            frames.append(coords)
-            frame_index_map.append(frame_idx)   # ★ 성공 프레임 매핑 기록
-            success_cnt += 1
-        else:
-            fail_cnt += 1
+        # 워밍업 구간은 트래킹만 안정화시키고 결과는 버림
+        if frame_idx >= start:
+            if coords is not None:
+                frames.append(coords)
+                frame_index_map.append(frame_idx)   # ★ 성공 프레임 매핑 기록
+                success_cnt += 1
+                if on_frame is not None:
+                    on_frame(frame_idx, coords, frame)
+            else:
+                fail_cnt += 1
+            if extractor.last_skipped:
+                skipped_cnt += 1
+            if progress is not None:
+                progress("decoded", frame_idx - start + 1)
+                progress("posed", frame_idx - start + 1)
 
         frame_idx += 1
 
-    cap.release()
-    pose.close()
+    return frames, frame_index_map, success_cnt, fail_cnt, skipped_cnt
+
+
+# 워커 프로세스: 자체 Pose 인스턴스로 한 구간 처리
+def _process_segment(video_path, start, end, warmup, extractor_kwargs):
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise RuntimeError(f"영상 파일을 열 수 없습니다: {video_path}")
+
+    warmup_from = max(0, start - warmup)
+    if warmup_from > 0:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, warmup_from)
+
+    extractor = PoseExtractor(**extractor_kwargs)
+    try:
+        return _extract_range(cap, extractor, warmup_from, start, end)
+    finally:
+        cap.release()
+        extractor.close()
+
+
+# 전체 프레임을 workers개 구간으로 분할 (마지막 구간은 끝까지 읽음)
+def _split_segments(total_frames, workers):
+    n = max(1, min(workers, total_frames // MIN_SEGMENT_FRAMES))
+    bounds = [round(i * total_frames / n) for i in range(n + 1)]
+    segments = [(bounds[i], bounds[i + 1]) for i in range(n)]
+    segments[-1] = (segments[-1][0], None)
+    return segments
+
+
+def _process_pose_parallel(video_path, segments, warmup, extractor_kwargs, total_frames=0, progress=None):
+    # 각 워커가 독립적으로 mediapipe 그래프를 만들도록 spawn 사용
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=len(segments), mp_context=ctx) as ex:
+        futures = [
+            ex.submit(_process_segment, video_path, start, end, warmup, extractor_kwargs)
+            for start, end in segments
+        ]
+        if progress is not None:
+            # 워커 프로세스 안의 프레임 단위 진행은 볼 수 없으므로 구간 완료 단위로 보고
+            lengths = {
+                f: (end if end is not None else total_frames) - start
+                for f, (start, end) in zip(futures, segments)
+            }
+            done = 0
+            for f in as_completed(futures):
+                done += max(0, lengths[f])
+                progress("decoded", done)
+                progress("posed", done)
+        parts = [f.result() for f in futures]
+
+    # 구간 순서대로 병합 → 전역 프레임 순서 유지
+    frames, frame_index_map = [], []
+    success_cnt, fail_cnt, skipped_cnt = 0, 0, 0
+    for seg_frames, seg_map, seg_ok, seg_ng, seg_skip in parts:
+        frames.extend(seg_frames)
+        frame_index_map.extend(seg_map)
+        success_cnt += seg_ok
+        fail_cnt += seg_ng
+        skipped_cnt += seg_skip
+    return frames, frame_index_map, success_cnt, fail_cnt, skipped_cnt
+
+
+def process_pose(
+    video_path,
+    detected_points=33,
+    return_stats=True,
+    workers=None,
+    warmup_frames=None,
+    motion_gate=None,
+    target_long_side=None,
+    roi_crop=None,
+    progress=None,
+    on_frame=None,
+):
+    """
+    progress: 진행 콜백 (core.services.progress 참고) — decoded/posed 단계를 프레임 수로 보고
+    on_frame: on_frame(frame_idx, coords, frame) — 포즈 추출에 성공한 프레임마다 원본 프레임과 함께 호출.
+              단일 프로세스 추출일 때만 호출됨 (구간 병렬 추출이면 프레임이 워커 프로세스에 있으므로
+              호출되지 않음 — pose_stats["segments"] > 1로 구분)
+    """
+    progress = tracker(progress)
+    cap = cv2.VideoCapture(video_path)
+
+    if not cap.isOpened():
+        print(f"[ERROR] 영상 파일을 열 수 없습니다: {video_path}")
+        return (None, None) if return_stats else None
+
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+
+    if workers is None:
+        workers = POSE_WORKERS
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    if warmup_frames is None:
+        warmup_frames = POSE_WARMUP_FRAMES
+    extractor_kwargs = {
+        "motion_gate": motion_gate,
+        "target_long_side": target_long_side,
+        "roi_crop": roi_crop,
+    }
+
+    segments = _split_segments(total_frames, workers) if workers > 1 else [(0, None)]
+    if progress is not None:
+        progress.set_total("decoded", total_frames or None)
+        progress.set_total("posed", total_frames or None)
+
+    if len(segments) > 1:
+        # 구간별 멀티프로세스 추출
+        cap.release()
+        frames, frame_index_map, success_cnt, fail_cnt, skipped_cnt = _process_pose_parallel(
+            video_path, segments, warmup_frames, extractor_kwargs, total_frames, progress
+        )
+    else:
+        extractor = PoseExtractor(**extractor_kwargs)
+        try:
+            frames, frame_index_map, success_cnt, fail_cnt, skipped_cnt = _extract_range(
+                cap, extractor, 0, 0, progress=progress, on_frame=on_frame
+            )
+        finally:
+            cap.release()
+            extractor.close()
 
     frames = np.asarray(frames, dtype=np.float32)
+    if progress is not None:
+        # 실제 프레임 수가 메타데이터(CAP_PROP_FRAME_COUNT)와 달라도 단계는 완료 처리
+        progress.complete("decoded", "posed")
 
     if return_stats:
         return frames, {
             "success": success_cnt,
             "fail": fail_cnt,
+            "skipped": skipped_cnt,               # 움직임 없어 MediaPipe를 생략한 프레임 수
             "fps": fps,
             "frame_index_map": frame_index_map,   # ★ 추가
+            "segments": len(segments),
         }
     return frames
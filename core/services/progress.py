@@ -0,0 +1,92 @@
+# core/services/progress.py
+# 분석 단계별 진행 상황(디코딩/포즈 추출/윈도우 추론/근거 저장) 집계 + 남은 시간(ETA) 계산
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+# 단계 순서와 전체 진행률에서 차지하는 비중
+# (디코딩은 포즈 추출과 같은 루프에서 진행되므로 비중 0 — 보고만 함)
+STAGES = ("decoded", "posed", "inferred", "evidence")
+STAGE_WEIGHTS = {"decoded": 0.0, "posed": 0.8, "inferred": 0.15, "evidence": 0.05}
+
+MIN_INTERVAL_SEC = 0.1            # 콜백 최소 호출 간격 (프레임마다 UI를 갱신하지 않도록)
+
+
+class ProgressTracker:
+    """
+    tracker(stage, done, total=None) 형태로 호출해 단계별 진행 상황을 갱신하고,
+    callback에는 다음 형식의 dict를 전달:
+      {"stage": "posed", "done": 120, "total": 900,
+       "percent": 12.3, "elapsed_sec": 3.1, "eta_sec": 22.0,
+       "stages": {"decoded": (done, total), ...}}
+    여러 스레드(스트리밍 파이프라인)에서 동시에 호출해도 안전.
+    """
+
+    def __init__(self, callback: Callable[[Dict], None], min_interval: float = MIN_INTERVAL_SEC):
+        self.callback = callback
+        self.min_interval = min_interval
+        self.started = time.perf_counter()
+        self.stages = {name: (0, None) for name in STAGES}
+        self._last_emit = 0.0
+        self._lock = threading.Lock()
+
+    def set_total(self, stage: str, total: Optional[int]) -> None:
+        with self._lock:
+            done, _ = self.stages[stage]
+            self.stages[stage] = (done, total)
+
+    def __call__(self, stage: str, done: int, total: Optional[int] = None) -> None:
+        with self._lock:
+            if total is None:
+                total = self.stages[stage][1]
+            self.stages[stage] = (done, total)
+            now = time.perf_counter()
+            finished = total is not None and done >= total
+            if not finished and now - self._last_emit < self.min_interval:
+                return
+            self._last_emit = now
+            event = self._event(stage, now)
+        self.callback(event)
+
+    def advance(self, stage: str, n: int = 1) -> None:
+        """단계 완료 수를 n만큼 증가 (배치 단위로 처리하는 단계용)"""
+        with self._lock:
+            done = self.stages[stage][0] + n
+        self(stage, done)
+
+    def complete(self, *stages: str) -> None:
+        """단계를 완료 처리 (캐시 적중 등으로 건너뛴 단계 포함)"""
+        for stage in stages or STAGES:
+            done, total = self.stages[stage]
+            total = total if total is not None else max(done, 1)
+            self(stage, total, total)
+
+    def fraction(self) -> float:
+        f = 0.0
+        for stage, weight in STAGE_WEIGHTS.items():
+            done, total = self.stages[stage]
+            if total:
+                f += weight * min(1.0, done / total)
+        return min(1.0, f)
+
+    def _event(self, stage: str, now: float) -> Dict:
+        done, total = self.stages[stage]
+        fraction = self.fraction()
+        elapsed = now - self.started
+        eta = elapsed * (1.0 - fraction) / fraction if fraction > 0 else None
+        return {
+            "stage": stage,
+            "done": done,
+            "total": total,
+            "percent": round(fraction * 100.0, 1),
+            "elapsed_sec": round(elapsed, 2),
+            "eta_sec": round(eta, 1) if eta is not None else None,
+            "stages": dict(self.stages),
+        }
+
+
+def tracker(progress) -> Optional[ProgressTracker]:
+    """progress 인자(콜백 또는 ProgressTracker)를 ProgressTracker로 통일. None이면 None."""
+    if progress is None or isinstance(progress, ProgressTracker):
+        return progress
+    return ProgressTracker(progress)
@@ -0,0 +1,247 @@
+# core/services/realtime.py
+# 실시간 분석: 카메라 번호 / 스트림 URL / 파일(원래 fps로 재생)을 프레임이 들어오는 대로 분석
+#  - 캡처 스레드: cap.read() → 작은 큐에 넣음. 큐가 차면(분석이 밀리면) 가장 오래된 프레임을 버림
+#  - 분석 루프: 포즈 추출 → 정규화 좌표를 최근 WINDOW 프레임 버퍼에 유지 → stride 프레임마다 윈도우 추론
+#  - 최근 history개 윈도우 라벨로 get_suspicion_level을 계속 갱신하고, 윈도우마다 지연 시간(캡처 → 결과) 보고
+import os
+import queue
+import threading
+import time
+from collections import Counter, deque
+from typing import Callable, Dict, Optional, Union
+
+import cv2
+import numpy as np
+
+from core.config import Config
+from core.services.preprocess import PoseExtractor
+from core.services.predict import (
+    LABEL_MAP,
+    WINDOW,
+    get_model,
+    get_suspicion_level,
+    infer_windows,
+    normalize_seq_2d,
+)
+
+_END = object()                   # 캡처 종료 표시
+
+
+def open_source(source: Union[int, str]):
+    """
+    "0", 0 → 카메라 번호 / 파일 경로 → 파일 / 그 외(rtsp://, http:// ...) → 스트림 URL
+    Returns: (cv2.VideoCapture, is_file)
+    """
+    if isinstance(source, str) and source.isdigit():
+        source = int(source)
+    is_file = isinstance(source, str) and os.path.isfile(source)
+    return cv2.VideoCapture(source), is_file
+
+
+class RealtimeAnalyzer:
+    """
+    on_window(event): 윈도우 추론마다 호출 (분석 스레드에서). event 형식:
+        {"frame_idx", "timestamp_sec", "label", "label_name", "probs", "level",
+         "latency_ms", "dropped", "windows"}
+    replay: 파일을 원래 fps 속도로 재생 (None이면 파일일 때 자동). False면 프레임을 버리지 않고 최대한 빨리 분석.
+    error: 모델 파일이 없거나 소스를 열 수 없어 분석을 시작하지 못한 경우 그 이유 (summary()에도 포함)
+    """
+
+    def __init__(
+        self,
+        source: Union[int, str],
+        on_window: Optional[Callable[[Dict], None]] = None,
+        stride: int = Config.REALTIME_STRIDE,
+        history: int = Config.REALTIME_HISTORY_WINDOWS,
+        queue_size: int = Config.REALTIME_QUEUE_SIZE,
+        replay: Optional[bool] = None,
+    ):
+        self.source = source
+        self.on_window = on_window
+        self.stride = max(1, int(stride))
+        self.queue_size = max(1, int(queue_size))
+        self.replay = replay
+
+        self.buffer = deque(maxlen=WINDOW)          # 정규화된 (66,) 좌표
+        self.labels = deque(maxlen=max(1, int(history)))
+        self.label_counts = Counter()
+        self.level = get_suspicion_level(self.label_counts)
+
+        self.frames = 0               # 캡처한 프레임 수
+        self.dropped = 0              # 분석이 밀려 버린 프레임 수
+        self.pose_fail = 0
+        self.windows = 0
+        self.latencies_ms = deque(maxlen=10000)     # 요약 통계용 (최근 윈도우만)
+        self.error: Optional[str] = None
+
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ---------- 캡처 ----------
+    def _offer(self, q: queue.Queue, item, drop: bool):
+        """큐에 넣기 — drop=True면 가득 찼을 때 가장 오래된 프레임을 버리고 바로 넣음"""
+        while not self._stop.is_set():
+            try:
+                if drop:
+                    q.put_nowait(item)
+                else:
+                    q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                if not drop:
+                    continue
+            try:
+                q.get_nowait()
+                self.dropped += 1
+            except queue.Empty:
+                pass
+
+    def _capture(self, cap, fps: float, pace: bool, drop: bool, q: queue.Queue):
+        frame_idx = 0
+        started = time.perf_counter()
+        try:
+            while not self._stop.is_set():
+                if pace:
+                    # 파일 재생: 원래 fps 속도에 맞춰 읽음 (실시간 카메라 대용)
+                    delay = started + frame_idx / fps - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                self.frames += 1
+                self._offer(q, (frame_idx, time.perf_counter(), frame), drop)
+                frame_idx += 1
+        finally:
+            cap.release()
+            self._offer(q, _END, drop=False)
+
+    # ---------- 분석 ----------
+    def _update(self, frame_idx: int, captured_at: float, fps: float):
+        window = np.asarray(self.buffer, dtype=np.float32)
+        probs = infer_windows(window[None], batch_size=1)[0]
+        label = int(probs.argmax())
+
+        if len(self.labels) == self.labels.maxlen:
+            old = self.labels[0]
+            self.label_counts[old] -= 1
+            if self.label_counts[old] <= 0:
+                del self.label_counts[old]
+        self.labels.append(label)
+        self.label_counts[label] += 1
+        self.level = get_suspicion_level(self.label_counts)
+        self.windows += 1
+
+        latency_ms = (time.perf_counter() - captured_at) * 1000.0
+        self.latencies_ms.append(latency_ms)
+        event = {
+            "frame_idx": frame_idx,
+            "timestamp_sec": round(frame_idx / fps, 3),
+            "label": label,
+            "label_name": LABEL_MAP.get(label, str(label)),
+            "probs": {LABEL_MAP.get(i, str(i)): round(float(p), 4) for i, p in enumerate(probs)},
+            "level": self.level,
+            "latency_ms": round(latency_ms, 1),
+            "dropped": self.dropped,
+            "windows": self.windows,
+        }
+        if self.on_window is not None:
+            self.on_window(event)
+
+    def run(self) -> Dict:
+        """
+        소스가 끝나거나 stop()이 호출될 때까지 분석 (호출한 스레드에서 실행).
+        Returns: summary()
+        Raises: IOError — 모델 파일이 없거나 소스를 열 수 없을 때 (self.error에도 기록)
+        """
+        # predict_from_video와 같이 모델이 없으면 분석을 시작하지 않음
+        # (첫 윈도우 지연 시간에 모델 로딩이 섞이지 않도록 미리 로드하는 역할도 겸함)
+        if get_model() is None:
+            self.error = "AI 모델 파일이 없습니다."
+            raise IOError(self.error)
+        cap, is_file = open_source(self.source)
+        if not cap.isOpened():
+            self.error = f"영상 소스를 열 수 없습니다: {self.source}"
+            raise IOError(self.error)
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        if fps <= 0 or fps > 240:
+            fps = 30.0                # 일부 카메라/스트림은 fps를 0이나 엉뚱한 값으로 보고
+        pace = is_file if self.replay is None else bool(self.replay)
+        # 실시간 소스(카메라/스트림/재생)는 밀리면 버리고, 빠르게 읽는 파일은 모두 분석
+        drop = pace or not is_file
+
+        q = queue.Queue(maxsize=self.queue_size)
+        capture = threading.Thread(
+            target=self._capture, args=(cap, fps, pace, drop, q), name="drovis-capture", daemon=True
+        )
+        capture.start()
+
+        extractor = PoseExtractor()
+        since_last = 0                # 마지막 추론 이후 새로 쌓인 프레임 수
+        missing = 0                   # 연속 포즈 실패 프레임 수
+        try:
+            while not self._stop.is_set():
+                try:
+                    item = q.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if item is _END:
+                    break
+                frame_idx, captured_at, frame = item
+                coords = extractor.process(frame)
+                if coords is None:
+                    self.pose_fail += 1
+                    missing += 1
+                    if missing >= WINDOW:
+                        # 사람이 한참 안 보이면 이전 동작과 이어 붙이지 않음
+                        self.buffer.clear()
+                        since_last = 0
+                    continue
+                missing = 0
+                # 정규화는 프레임 단위라 들어올 때 한 번만 계산
+                self.buffer.append(normalize_seq_2d(np.asarray(coords, dtype=np.float32)[None])[0])
+                since_last += 1
+                if len(self.buffer) == WINDOW and since_last >= self.stride:
+                    since_last = 0
+                    self._update(frame_idx, captured_at, fps)
+        finally:
+            self._stop.set()
+            extractor.close()
+            capture.join()
+        return self.summary()
+
+    def _run_background(self):
+        try:
+            self.run()
+        except IOError as e:
+            # 스레드 밖으로 예외가 전달되지 않으므로 기록만 남김 (self.error / summary()로 확인)
+            print(f"[ERROR] 실시간 분석을 시작할 수 없습니다: {e}")
+            self._stop.set()
+
+    def start(self):
+        """백그라운드 스레드에서 run() (GUI 등에서 사용) — 시작 실패 시 self.error에 이유가 남음"""
+        self._thread = threading.Thread(target=self._run_background, name="drovis-realtime", daemon=True)
+        self._thread.start()
+
+    def stop(self, wait: bool = True):
+        self._stop.set()
+        if wait and self._thread is not None:
+            self._thread.join()
+
+    def summary(self) -> Dict:
+        lat = np.asarray(self.latencies_ms, dtype=np.float64)
+        return {
+            "frames": self.frames,
+            "error": self.error,
+            "dropped": self.dropped,
+            "pose_fail": self.pose_fail,
+            "windows": self.windows,
+            "level": self.level,
+            "label_counts": {LABEL_MAP.get(k, str(k)): v for k, v in sorted(self.label_counts.items())},
+            "latency_ms": {
+                "mean": round(float(lat.mean()), 1),
+                "p50": round(float(np.percentile(lat, 50)), 1),
+                "p95": round(float(np.percentile(lat, 95)), 1),
+                "max": round(float(lat.max()), 1),
+            } if len(lat) else None,
+        }
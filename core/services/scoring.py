@@ -0,0 +1,180 @@
+# core/services/scoring.py
+# 윈도우별 확률 → 위험도/행동 비율 계산, 저장된 확률로 전체 기록 재채점
+# (torch를 불러오지 않으므로 재채점은 모델 없이 빠르게 실행됨)
+import json
+import math
+import sqlite3
+import time
+from collections import Counter
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from core.config import Config
+from core.db import analysis_db
+
+# 라벨 매핑
+LABEL_MAP = {0: "Normal", 1: "Loitering", 2: "Handover", 3: "Reapproach"}
+SUSPICIOUS_LABELS = {1, 2, 3}
+WINDOW = 30                       # 모델 입력 윈도우 길이 (포즈 프레임 수)
+
+PROBS_DTYPE = np.float16          # 확률 저장 형식 (윈도우 1개 x 4클래스 = 8바이트)
+RESCORE_BATCH = 500
+
+
+def default_rules() -> Dict[str, Any]:
+    return {
+        "min_total_chunks": Config.SCORE_MIN_TOTAL_CHUNKS,
+        "low": Config.SCORE_SHARE_LOW,
+        "high": Config.SCORE_SHARE_HIGH,
+    }
+
+
+# 위험도(상, 중, 하) 판단 함수
+def get_suspicion_level(
+    label_counts: Counter,
+    *,
+    min_total_chunks: int = Config.SCORE_MIN_TOTAL_CHUNKS,
+    low: float = Config.SCORE_SHARE_LOW,
+    high: float = Config.SCORE_SHARE_HIGH,
+) -> str:
+    total = sum(label_counts.values())
+    if total == 0 or total < min_total_chunks:
+        return "하"
+
+    loitering = label_counts.get(1, 0)
+    handover = label_counts.get(2, 0)
+    reapproach = label_counts.get(3, 0)
+
+    # 총 chunk 수 대비 low(20%), high(80%) 기준
+    thr_low = math.ceil(low * total)
+    thr_high = math.ceil(high * total)
+
+    # low 이상 등장한 행동 개수
+    meets_low = [
+        loitering >= thr_low,
+        handover >= thr_low,
+        reapproach >= thr_low,
+    ]
+    cnt_low = sum(meets_low)
+
+    # 위험도 규칙
+    if cnt_low == 3:
+        return "상"
+    if cnt_low >= 2:
+        return "중"
+    if loitering >= thr_high or handover >= thr_high or reapproach >= thr_high:
+        return "중"
+    return "하"
+
+
+def score_probs(probs: np.ndarray, rules: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    (윈도우 수, 클래스 수) 확률 행렬 → 분석 결과 필드
+    Returns: {"result", "behavior_probs_pct", "detected_actions", "label_counts"}
+    """
+    rules = dict(default_rules(), **(rules or {}))
+    probs = np.asarray(probs, dtype=np.float32)
+    counts = np.bincount(probs.argmax(axis=1), minlength=len(LABEL_MAP)) if len(probs) else np.zeros(len(LABEL_MAP), int)
+    label_counts = Counter({i: int(c) for i, c in enumerate(counts) if c > 0})
+
+    # 행동별 평균 확률
+    avg = probs.mean(axis=0) if len(probs) else np.zeros(len(LABEL_MAP), np.float32)
+    behavior_probs_pct = {
+        LABEL_MAP[lbl]: round(float(avg[lbl] * 100), 1) for lbl in sorted(SUSPICIOUS_LABELS)
+    }
+    return {
+        "result": get_suspicion_level(label_counts, **rules),
+        "behavior_probs_pct": behavior_probs_pct,
+        "detected_actions": [
+            LABEL_MAP[lbl] for lbl in sorted(SUSPICIOUS_LABELS) if label_counts.get(lbl, 0) > 0
+        ],
+        "label_counts": {LABEL_MAP.get(i, str(i)): c for i, c in sorted(label_counts.items())},
+    }
+
+
+# ---------- 확률 저장 형식 ----------
+def encode_probs(probs: np.ndarray) -> bytes:
+    return np.ascontiguousarray(probs, dtype=PROBS_DTYPE).tobytes()
+
+
+def decode_probs(blob: bytes, n_classes: int) -> np.ndarray:
+    return np.frombuffer(blob, dtype=PROBS_DTYPE).reshape(-1, n_classes)
+
+
+# ---------- 재채점 ----------
+def rescore_history(
+    rules: Optional[Dict[str, Any]] = None,
+    username: Optional[str] = None,
+    dry_run: bool = False,
+) -> Dict[str, Any]:
+    """
+    저장된 윈도우 확률로 분석 기록의 위험도/행동 비율/탐지 행동을 다시 계산 (영상 재분석 없음).
+    확률이 저장되지 않은 예전 기록은 건너뜀.
+    Returns: {"records", "changed"(위험도가 바뀐 기록 수), "skipped", "levels": {위험도: 기록 수}, "elapsed_sec"}
+    """
+    rules = dict(default_rules(), **(rules or {}))
+    started = time.perf_counter()
+    stats = {"records": 0, "changed": 0, "skipped": 0}
+    levels = Counter()
+
+    where, params = "", []
+    if username is not None:
+        where, params = "AND a.user_id = ?", [username]
+
+    with analysis_db() as conn:
+        cur = conn.cursor()
+        cur.row_factory = sqlite3.Row
+        cur.execute(
+            f"SELECT COUNT(*) FROM analysis a WHERE NOT EXISTS "
+            f"(SELECT 1 FROM analysis_probs p WHERE p.analysis_id = a.id) {where}",
+            params,
+        )
+        stats["skipped"] = cur.fetchone()[0]
+
+        last_id = -1
+        while True:
+            # id 순으로 나눠 읽음 (확률 BLOB을 한 번에 메모리에 올리지 않음)
+            cur.execute(
+                f"""
+                SELECT a.id, a.result, a.payload, p.n_classes, p.probs
+                FROM analysis a JOIN analysis_probs p ON p.analysis_id = a.id
+                WHERE a.id > ? {where}
+                ORDER BY a.id LIMIT ?
+                """,
+                [last_id] + params + [RESCORE_BATCH],
+            )
+            rows = cur.fetchall()
+            if not rows:
+                break
+            last_id = rows[-1]["id"]
+
+            updates = []
+            for row in rows:
+                scored = score_probs(decode_probs(row["probs"], row["n_classes"]), rules)
+                try:
+                    payload = json.loads(row["payload"]) if row["payload"] else {}
+                except ValueError:
+                    payload = {}
+                payload.update(
+                    {
+                        "risk_level": scored["result"],
+                        "behavior_probs_pct": scored["behavior_probs_pct"],
+                        "behavior_counts": scored["behavior_probs_pct"],   # 프론트 호환용
+                        "detected_actions": scored["detected_actions"],
+                        "label_counts": scored["label_counts"],
+                        "thresholds": rules,
+                    }
+                )
+                stats["records"] += 1
+                levels[scored["result"]] += 1
+                if row["result"] != scored["result"]:
+                    stats["changed"] += 1
+                updates.append((scored["result"], json.dumps(payload, ensure_ascii=False), row["id"]))
+
+            if not dry_run:
+                cur.executemany("UPDATE analysis SET result = ?, payload = ? WHERE id = ?", updates)
+
+    stats["levels"] = dict(levels)
+    stats["elapsed_sec"] = round(time.perf_counter() - started, 3)
+    return stats
@@ -0,0 +1,59 @@
+# core/services/thumbnails.py
+# 근거 이미지 썸네일: 원본 JPEG 옆 thumbs/ 폴더에 너비 THUMBNAIL_WIDTH로 축소해 저장
+# (근거 저장 시 바로 만들고, 예전 기록은 처음 볼 때 생성)
+import os
+import threading
+from typing import Optional
+
+import cv2
+import numpy as np
+
+from core.config import Config
+
+THUMBNAIL_WIDTH = Config.THUMBNAIL_WIDTH
+THUMBNAIL_QUALITY = 85
+
+
+def thumbnail_path(image_path: str, width: int = THUMBNAIL_WIDTH) -> str:
+    folder, name = os.path.split(image_path)
+    stem = os.path.splitext(name)[0]
+    return os.path.join(folder, "thumbs", f"{stem}_w{width}.jpg")
+
+
+def _is_fresh(thumb: str, image_path: str) -> bool:
+    try:
+        return os.path.getmtime(thumb) >= os.path.getmtime(image_path)
+    except OSError:
+        return False
+
+
+def make_thumbnail(
+    image_path: str, width: int = THUMBNAIL_WIDTH, image: Optional[np.ndarray] = None
+) -> Optional[str]:
+    """
+    썸네일 생성. image: 이미 메모리에 있는 BGR 이미지 (근거 저장 직후 — 다시 읽지 않음)
+    Returns: 썸네일 경로 (원본을 읽을 수 없으면 None)
+    """
+    if image is None:
+        image = cv2.imread(image_path)
+        if image is None:
+            return None
+    h, w = image.shape[:2]
+    if w > width:
+        image = cv2.resize(image, (width, max(1, round(h * width / w))), interpolation=cv2.INTER_AREA)
+
+    thumb = thumbnail_path(image_path, width)
+    os.makedirs(os.path.dirname(thumb), exist_ok=True)
+    tmp = f"{thumb}.{os.getpid()}-{threading.get_ident()}.tmp.jpg"
+    if not cv2.imwrite(tmp, image, [cv2.IMWRITE_JPEG_QUALITY, THUMBNAIL_QUALITY]):
+        return None
+    os.replace(tmp, thumb)          # 동시에 여러 스레드가 만들어도 반쯤 쓴 파일을 읽지 않게
+    return thumb
+
+
+def ensure_thumbnail(image_path: str, width: int = THUMBNAIL_WIDTH) -> Optional[str]:
+    """최신 썸네일 경로 (없거나 원본보다 오래됐으면 생성)"""
+    thumb = thumbnail_path(image_path, width)
+    if _is_fresh(thumb, image_path):
+        return thumb
+    return make_thumbnail(image_path, width)
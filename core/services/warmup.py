@@ -0,0 +1,26 @@
+# core/services/warmup.py
+# 무거운 ML 스택(torch, cv2, mediapipe)과 LSTM 모델을 백그라운드 스레드에서 미리 로드
+import threading
+
+_thread = None
+_lock = threading.Lock()
+
+
+def _load():
+    try:
+        from core.services import preprocess  # noqa: F401  (mediapipe, cv2)
+        from core.services import predict
+
+        predict.get_model()
+    except Exception as e:
+        print(f"[WARN] 모델 사전 로드 실패: {e}")
+
+
+def prewarm() -> threading.Thread:
+    """최초 1회만 로드 스레드를 시작. 이미 시작했으면 기존 스레드 반환."""
+    global _thread
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_load, name="drovis-prewarm", daemon=True)
+            _thread.start()
+        return _thread
@@ -0,0 +1,311 @@
+# core/services/watcher.py
+# 감시 폴더 수집 데몬: 녹화기가 계속 떨어뜨리는 mp4 조각을 자동으로 분석
+#  1) 주기적으로 폴더를 스캔 (os.scandir — 추가 의존성 없음)
+#  2) 크기/수정 시각이 settle_sec 동안 변하지 않은 파일만 "완성"으로 간주
+#  3) 내용 해시(SHA-256)로 이미 분석한 영상과 중복 제거 (체크포인트 + 분석 기록 DB)
+#  4) BatchQueue(프로세스 풀)로 동시 분석 수 제한
+#  5) 처리 결과를 분석 DB(watch_files)에 파일 단위로 기록 → 재시작해도 이전 파일은 건너뜀
+#     실패한 파일은 시도 횟수 안에서 재시도, 폴더에서 사라진 파일의 기록은 삭제
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from core.config import Config
+from core.db import analysis_db
+from core.services import cache
+from core.services.batch import BatchQueue, VIDEO_EXTENSIONS
+from core.services.history import find_by_video_hash
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "data")
+CHECKPOINT_VERSION = 1
+RETRY_BACKOFF_SEC = 30         # 실패한 파일 재시도 대기 = RETRY_BACKOFF_SEC * 시도 횟수
+
+# watch_files 행의 값 컬럼 (folder, rel_path 제외)
+_FIELDS = (
+    "size", "mtime_ns", "sha256", "status", "attempts",
+    "record_id", "duplicate_of", "message", "updated_at",
+)
+
+
+def default_checkpoint_path(folder: str) -> str:
+    # 이전 버전의 감시 폴더별 JSON 체크포인트 (data/watch_<폴더 경로 해시>.json) — 있으면 DB로 옮김
+    digest = hashlib.sha1(os.path.realpath(folder).encode("utf-8")).hexdigest()[:12]
+    return os.path.abspath(os.path.join(DATA_DIR, f"watch_{digest}.json"))
+
+
+class Checkpoint:
+    """
+    처리 상태 저장소 — 분석 DB의 watch_files 테이블 (감시 폴더 + 상대 경로 → 행 1개)
+    상태가 바뀐 파일의 행만 저장하고, 폴더에서 사라진 파일의 행은 prune()으로 삭제.
+    스캔마다 DB를 조회하지 않도록 같은 내용을 메모리에도 유지 (폴더당 감시 프로세스 1개 기준)
+    files:  상대 경로 → {"size", "mtime_ns", "sha256", "status", "attempts", "record_id",
+                         "duplicate_of", "message", "updated_at"}
+            (duplicate_of: 같은 내용의 파일 상대 경로, 또는 분석 기록에 있으면 "record:<기록 id>")
+    hashes: sha256 → 처음 분석한 파일의 상대 경로
+    """
+
+    def __init__(
+        self,
+        folder: str,
+        legacy_path: Optional[str] = None,
+        max_attempts: int = Config.WATCH_MAX_ATTEMPTS,
+    ):
+        self.folder = os.path.realpath(folder)
+        self.max_attempts = max(1, int(max_attempts))
+        self.files: Dict[str, dict] = {}
+        self.hashes: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.load()
+        self._import_legacy(legacy_path or default_checkpoint_path(folder))
+
+    def load(self):
+        with analysis_db() as conn:
+            rows = conn.execute(
+                f"SELECT rel_path, {', '.join(_FIELDS)} FROM watch_files WHERE folder = ?",
+                (self.folder,),
+            ).fetchall()
+        self.files = {row[0]: dict(zip(_FIELDS, row[1:])) for row in rows}
+        self.hashes = {
+            entry["sha256"]: rel
+            for rel, entry in self.files.items()
+            if entry.get("sha256") and entry.get("status") == "done"
+        }
+
+    def _import_legacy(self, path: str):
+        """이전 버전 JSON 체크포인트를 한 번 옮기고 .migrated로 이름 변경"""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == CHECKPOINT_VERSION:
+            for rel, entry in (data.get("files") or {}).items():
+                if rel in self.files or entry.get("size") is None or entry.get("mtime_ns") is None:
+                    continue
+                fields = {k: entry.get(k) for k in _FIELDS if k in entry}
+                if fields.get("status") == "queued":
+                    fields["status"] = "interrupted"
+                self.mark(rel, **fields)
+        try:
+            os.replace(path, path + ".migrated")
+        except OSError:
+            pass
+
+    def is_current(self, rel: str, size: int, mtime_ns: int) -> bool:
+        """이미 처리(또는 처리 중)한 같은 파일인지 — 크기/수정 시각이 같으면 해시 생략"""
+        entry = self.files.get(rel)
+        if entry is None or entry.get("size") != size or entry.get("mtime_ns") != mtime_ns:
+            return False
+        status = entry.get("status")
+        if status == "failed":
+            # 일시적인 실패(워커 종료, 저장소 오류 등)일 수 있어 시도 횟수가 남았으면 잠시 뒤 재시도
+            attempts = entry.get("attempts") or 0
+            if attempts >= self.max_attempts:
+                return True
+            return time.time() < (entry.get("updated_at") or 0) + RETRY_BACKOFF_SEC * max(1, attempts)
+        return status in ("done", "duplicate", "queued")
+
+    def attempts_for(self, rel: str, size: int, mtime_ns: int) -> int:
+        """이번 분석이 몇 번째 시도인지 (파일이 바뀌었으면 1부터)"""
+        entry = self.files.get(rel)
+        if entry is None or entry.get("size") != size or entry.get("mtime_ns") != mtime_ns:
+            return 1
+        return (entry.get("attempts") or 0) + 1
+
+    def mark(self, rel: str, **fields):
+        with self._lock:
+            entry = self.files.setdefault(rel, {})
+            entry.update(fields)
+            entry.setdefault("attempts", 0)
+            entry["updated_at"] = time.time()
+            if entry.get("status") == "done" and entry.get("sha256"):
+                self.hashes.setdefault(entry["sha256"], rel)
+            values = (self.folder, rel) + tuple(entry.get(k) for k in _FIELDS)
+            with analysis_db() as conn:
+                conn.execute(
+                    f"INSERT OR REPLACE INTO watch_files (folder, rel_path, {', '.join(_FIELDS)}) "
+                    f"VALUES ({', '.join('?' * (len(_FIELDS) + 2))})",
+                    values,
+                )
+
+    def prune(self, present) -> int:
+        """폴더에서 사라진 파일의 기록 삭제 (분석 대기/중인 파일은 유지). 삭제 개수 반환."""
+        with self._lock:
+            gone = [
+                rel for rel, entry in self.files.items()
+                if rel not in present and entry.get("status") != "queued"
+            ]
+            for rel in gone:
+                entry = self.files.pop(rel)
+                if self.hashes.get(entry.get("sha256")) == rel:
+                    # 이후 같은 내용의 파일은 분석 기록(find_by_video_hash)으로 중복 확인
+                    del self.hashes[entry["sha256"]]
+        if gone:
+            with analysis_db() as conn:
+                conn.executemany(
+                    "DELETE FROM watch_files WHERE folder = ? AND rel_path = ?",
+                    [(self.folder, rel) for rel in gone],
+                )
+        return len(gone)
+
+
+class FolderWatcher:
+    def __init__(
+        self,
+        folder: str,
+        username: Optional[str] = None,
+        workers: Optional[int] = None,
+        recursive: bool = False,
+        interval: float = Config.WATCH_INTERVAL_SEC,
+        settle_sec: float = Config.WATCH_SETTLE_SEC,
+        checkpoint_path: Optional[str] = None,       # 옮겨 올 이전 버전 JSON 체크포인트
+        log=print,
+    ):
+        self.folder = os.path.abspath(folder)
+        self.username = username
+        self.recursive = recursive
+        self.interval = interval
+        self.settle_sec = settle_sec
+        self.log = log
+        self.checkpoint = Checkpoint(self.folder, legacy_path=checkpoint_path)
+
+        self._pending: Dict[str, tuple] = {}      # 상대 경로 → (size, mtime_ns, 마지막 변경 감지 시각)
+        self._jobs: Dict[int, str] = {}           # job id → 상대 경로
+        self._inflight_hashes: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.queue = BatchQueue(
+            username=username,
+            workers=workers,
+            on_update=self._on_update,
+            prewarm_workers=True,
+            stdout_to_stderr=True,
+            finished_ttl=Config.BATCH_FINISHED_TTL_SEC,
+            max_finished=Config.BATCH_MAX_FINISHED,
+        )
+
+        # 이전 실행에서 대기/분석 중이던 파일은 다시 분석 대상으로
+        for rel, entry in list(self.checkpoint.files.items()):
+            if entry.get("status") == "queued":
+                entry["status"] = "interrupted"
+
+    # ---------- 스캔 ----------
+    def _scan(self):
+        for root, dirs, files in os.walk(self.folder):
+            dirs.sort()
+            for name in sorted(files):
+                if not name.lower().endswith(VIDEO_EXTENSIONS):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue                         # 스캔 중 삭제/이동됨
+                yield os.path.relpath(path, self.folder), st.st_size, st.st_mtime_ns
+            if not self.recursive:
+                break
+
+    def poll(self) -> int:
+        """폴더를 한 번 스캔해 완성된 새 파일을 큐에 추가. 추가한 파일 수 반환."""
+        now = time.monotonic()
+        submitted = 0
+        seen = set()
+        for rel, size, mtime_ns in self._scan():
+            seen.add(rel)
+            if size == 0 or self.checkpoint.is_current(rel, size, mtime_ns):
+                self._pending.pop(rel, None)
+                continue
+            prev = self._pending.get(rel)
+            if prev is None or prev[:2] != (size, mtime_ns):
+                self._pending[rel] = (size, mtime_ns, now)    # 아직 쓰는 중 → 대기 시작
+                continue
+            if now - prev[2] < self.settle_sec:
+                continue
+            del self._pending[rel]
+            if self._submit(rel, size, mtime_ns):
+                submitted += 1
+
+        # 사라진 파일은 대기 목록과 체크포인트에서 제거
+        # (폴더 자체가 안 보이면 — 네트워크 드라이브 끊김 등 — 기록을 지우지 않음)
+        for rel in list(self._pending):
+            if rel not in seen:
+                del self._pending[rel]
+        if os.path.isdir(self.folder):
+            self.checkpoint.prune(seen)
+        return submitted
+
+    def _submit(self, rel: str, size: int, mtime_ns: int) -> bool:
+        path = os.path.join(self.folder, rel)
+        try:
+            digest = cache.file_hash(path)
+        except OSError as e:
+            self.log(f"[WATCH] 해시 실패: {rel}: {e}")
+            return False
+
+        with self._lock:
+            original = self.checkpoint.hashes.get(digest) or self._inflight_hashes.get(digest)
+            if original is not None and original != rel:
+                # 같은 내용을 이미 분석함 (다른 이름으로 복사/재전송된 조각)
+                self.checkpoint.mark(
+                    rel, size=size, mtime_ns=mtime_ns, sha256=digest,
+                    status="duplicate", duplicate_of=original,
+                )
+                self.log(f"[WATCH] 중복 건너뜀: {rel} (= {original})")
+                return False
+            # GUI / CLI 등 다른 경로로 이미 분석해 기록에 있는 영상
+            record_id = find_by_video_hash(digest)
+            if record_id is not None:
+                self.checkpoint.mark(
+                    rel, size=size, mtime_ns=mtime_ns, sha256=digest,
+                    status="duplicate", duplicate_of=f"record:{record_id}", record_id=record_id,
+                )
+                self.log(f"[WATCH] 중복 건너뜀: {rel} (분석 기록 {record_id})")
+                return False
+            self._inflight_hashes[digest] = rel
+            attempts = self.checkpoint.attempts_for(rel, size, mtime_ns)
+            self.checkpoint.mark(
+                rel, size=size, mtime_ns=mtime_ns, sha256=digest, status="queued", attempts=attempts,
+            )
+            job_id = self.queue.add(path, video_hash=digest)
+            self._jobs[job_id] = rel
+        self.log(f"[WATCH] 분석 대기: {rel}" + (f" (재시도 {attempts}회차)" if attempts > 1 else ""))
+        return True
+
+    # ---------- 분석 완료 ----------
+    def _on_update(self, job):
+        if not job.finished:
+            return
+        with self._lock:
+            rel = self._jobs.pop(job.id, None)
+            if rel is None:
+                return
+            self._inflight_hashes.pop(job.video_hash, None)
+            if job.state == "done":
+                self.checkpoint.mark(rel, status="done", record_id=job.record_id, message=None)
+            elif job.state == "cancelled":
+                # 종료 시 취소된 작업은 시도 횟수에 넣지 않음
+                attempts = max(0, (self.checkpoint.files.get(rel, {}).get("attempts") or 1) - 1)
+                self.checkpoint.mark(rel, status=job.state, message=job.message, attempts=attempts)
+            else:
+                self.checkpoint.mark(rel, status=job.state, message=job.message)
+        result = (job.result or {}).get("result", "-")
+        self.log(f"[WATCH] {job.state}: {rel} (위험도 {result})" if job.state == "done"
+                 else f"[WATCH] {job.state}: {rel}: {job.message or ''}")
+
+    # ---------- 실행 ----------
+    def run(self):
+        """stop() 호출(또는 Ctrl+C)까지 폴더 감시"""
+        self.log(f"[WATCH] 감시 시작: {self.folder}")
+        try:
+            while not self._stop.is_set():
+                self.poll()
+                self._stop.wait(self.interval)
+        finally:
+            # 분석 중인 영상은 끝까지 기다려 체크포인트에 반영
+            self.queue.shutdown(wait=True, cancel_pending=True)
+
+    def stop(self):
+        self._stop.set()
@@ -1,17 +1,276 @@
 # gui/history_window.py
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QLabel, QPushButton, QTableWidget, QTableWidgetItem,
-    QHeaderView, QMessageBox, QHBoxLayout
+    QWidget, QVBoxLayout, QLabel, QPushButton, QTableView, QStyledItemDelegate,
+    QStyleOptionButton, QStyle, QApplication, QHeaderView, QMessageBox, QHBoxLayout
+)
+from PyQt5.QtCore import (
+    Qt, QTimer, QAbstractTableModel, QModelIndex, QEvent, pyqtSignal, QObject, QRunnable,
+    QThreadPool,
 )
-from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QColor
 
-from core.services.history_json import load_all, delete_all
+from core.config import Config
+from core.services.history import load_page, delete_all
 
 from PyQt5.QtWidgets import QDialog, QScrollArea, QGridLayout, QSizePolicy
-from PyQt5.QtGui import QPixmap
+from PyQt5.QtGui import QPixmap, QImage
+from collections import OrderedDict
 import os
 
+PAGE_SIZE = 50
+EVIDENCE_COLUMN = 5
+
+
+def format_pose_text(pose_stats):
+    if not isinstance(pose_stats, dict):
+        return "-"
+    ok = pose_stats.get("success", 0)
+    ng = pose_stats.get("fail", 0)
+    return f"성공: {ok}프레임\n실패: {ng}프레임"
+
+
+BEHAVIOR_ORDER = ["Normal", "Loitering", "Handover", "Reapproach"]
+
+
+def format_behavior_counts(counts):
+    """라벨별 윈도우 수 {"Normal": n, ...} → 표 표시용 텍스트"""
+    if not isinstance(counts, dict) or not counts:
+        return "-"
+    total = sum(counts.get(name, 0) for name in BEHAVIOR_ORDER) or 1
+    lines = []
+    for idx, name in enumerate(BEHAVIOR_ORDER):
+        c = counts.get(name, 0)
+        if c <= 0:
+            continue
+        pct = round(c * 100.0 / total, 2)
+        lines.append(f"- {name} (라벨 {idx}): {c}회 ({pct:.2f}%)")
+    return "\n".join(lines) if lines else "-"
+
+
+def format_behavior_from_chunks(chunks):
+    # 이전 기록(윈도우별 라벨 리스트 result_per_chunk) 호환
+    if not isinstance(chunks, list) or not chunks:
+        return "-"
+    counts = {}
+    for n in chunks:
+        counts[n] = counts.get(n, 0) + 1
+    return format_behavior_counts(counts)
+
+
+def format_behavior(item):
+    if item.get("label_counts"):
+        return format_behavior_counts(item["label_counts"])
+    return format_behavior_from_chunks(item.get("result_per_chunk"))
+
+
+RISK_COLORS = {"상": Qt.red, "중": Qt.darkYellow, "하": Qt.darkGreen}
+
+
+class HistoryTableModel(QAbstractTableModel):
+    """
+    분석 기록 테이블 모델 — 스크롤이 끝에 닿을 때마다 load_page로 PAGE_SIZE개씩 이어 읽음.
+    행마다 표시 문자열과 근거 버튼 payload를 한 번만 만들어 둠.
+    """
+
+    HEADERS = ["파일명", "포즈 인식 성공", "탐지 행동 비율", "위험도", "시간", "근거"]
+
+    def __init__(self, username=None, page_size=PAGE_SIZE, parent=None):
+        super().__init__(parent)
+        self.username = username
+        self.page_size = page_size
+        self.rows = []
+        self.cursor = None
+        self.exhausted = False
+
+    # ----- 데이터 적재 -----
+    def reload(self):
+        self.beginResetModel()
+        self.rows, self.cursor, self.exhausted = [], None, False
+        self.endResetModel()
+        if self.canFetchMore(QModelIndex()):
+            self.fetchMore(QModelIndex())
+
+    def canFetchMore(self, parent):
+        return not parent.isValid() and not self.exhausted
+
+    def fetchMore(self, parent):
+        if parent.isValid() or self.exhausted:
+            return
+        records, self.cursor = load_page(self.username, self.cursor, self.page_size)
+        self.exhausted = self.cursor is None
+        if not records:
+            return
+        first = len(self.rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(records) - 1)
+        self.rows.extend(self.make_row(item) for item in records)
+        self.endInsertRows()
+
+    @staticmethod
+    def make_row(item):
+        filename = item.get("filename", "-")
+        ts = item.get("timestamp", "-")
+        # decision_id/evidence가 있으면 가져와서 버튼 payload로 전달
+        payload = {
+            "decision_id": item.get("decision_id", None),
+            "filename": filename,
+            "timestamp": ts,
+            "model_version": item.get("model_version", "-"),
+            "evidence": item.get("evidence", None),  # 없으면 창에서 lazy fetch
+            "prediction": item.get("prediction", None),
+            "thresholds": item.get("thresholds", None),
+        }
+        risk = item.get("risk_level", item.get("result", "-"))
+        texts = [
+            filename,
+            format_pose_text(item.get("pose_stats")),
+            format_behavior(item),
+            str(risk if risk is not None else "-"),
+            ts,
+            "근거 장면 보기",
+        ]
+        return {"texts": texts, "risk": risk, "payload": payload}
+
+    # ----- QAbstractTableModel -----
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, col = self.rows[index.row()], index.column()
+        if role == Qt.DisplayRole:
+            return row["texts"][col]
+        if role == Qt.TextAlignmentRole:
+            if col in (3, 4):
+                return Qt.AlignCenter
+            return Qt.AlignLeft | Qt.AlignVCenter
+        if role == Qt.ForegroundRole and col == 3:
+            color = RISK_COLORS.get(row["risk"])
+            return QColor(color) if color is not None else None
+        return None
+
+    def flags(self, index):
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def payload(self, row):
+        return self.rows[row]["payload"]
+
+
+class EvidenceButtonDelegate(QStyledItemDelegate):
+    """근거 열을 버튼 모양으로 그리기만 함 — 행마다 QPushButton 위젯을 만들지 않음"""
+
+    clicked = pyqtSignal(int)
+
+    def paint(self, painter, option, index):
+        btn = QStyleOptionButton()
+        btn.rect = option.rect.adjusted(4, 4, -4, -4)
+        btn.text = index.data()
+        btn.state = QStyle.State_Enabled
+        if option.state & QStyle.State_MouseOver:
+            btn.state |= QStyle.State_MouseOver
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawControl(QStyle.CE_PushButton, btn, painter, option.widget)
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            if option.rect.contains(event.pos()):
+                self.clicked.emit(index.row())
+                return True
+        return super().editorEvent(event, model, option, index)
+
+
+class _ThumbnailTask(QRunnable):
+    """썸네일 생성/디코딩 (QThreadPool 스레드 — QPixmap 대신 QImage 사용)"""
+
+    def __init__(self, path, done, missing):
+        super().__init__()
+        self.path = path
+        self.done = done
+        self.missing = missing
+
+    def run(self):
+        # 파일 확인도 작업 스레드에서 (네트워크 드라이브 등에서 GUI가 멈추지 않도록)
+        if not os.path.exists(self.path):
+            self.missing.emit(self.path)
+            return
+        try:
+            # cv2를 쓰는 모듈이라 앱 시작 시가 아니라 처음 썸네일이 필요할 때 불러옴
+            from core.services.thumbnails import ensure_thumbnail
+            thumb = ensure_thumbnail(self.path) or self.path
+        except Exception:
+            thumb = self.path
+        self.done.emit(self.path, QImage(thumb))
+
+
+class ThumbnailLoader(QObject):
+    """
+    근거 이미지 썸네일을 백그라운드에서 읽어 loaded(원본 경로, QImage)로 전달.
+    원본 파일이 없으면 missing(원본 경로)을 보냄.
+    읽은 썸네일은 총 max_bytes까지 메모리에 LRU로 유지.
+    """
+    loaded = pyqtSignal(str, QImage)
+    missing = pyqtSignal(str)
+    _done = pyqtSignal(str, QImage)
+    _missing = pyqtSignal(str)
+
+    def __init__(self, max_bytes=Config.THUMBNAIL_MEMORY_MB * 1024 * 1024, parent=None):
+        super().__init__(parent)
+        self.max_bytes = max_bytes
+        self._cache = OrderedDict()      # 원본 경로 → QImage
+        self._bytes = 0
+        self._pending = set()
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max(1, min(4, QThreadPool.globalInstance().maxThreadCount())))
+        self._done.connect(self._on_done)    # 작업 스레드 → GUI 스레드 (queued)
+        self._missing.connect(self._on_missing)
+
+    def cached(self, path):
+        img = self._cache.get(path)
+        if img is not None:
+            self._cache.move_to_end(path)
+        return img
+
+    def request(self, path):
+        if path in self._pending:
+            return
+        self._pending.add(path)
+        self._pool.start(_ThumbnailTask(path, self._done, self._missing))
+
+    def _on_missing(self, path):
+        self._pending.discard(path)
+        self.missing.emit(path)
+
+    def _on_done(self, path, img):
+        self._pending.discard(path)
+        if not img.isNull():
+            old = self._cache.pop(path, None)
+            if old is not None:
+                self._bytes -= old.byteCount()
+            self._cache[path] = img
+            self._bytes += img.byteCount()
+            while self._bytes > self.max_bytes and len(self._cache) > 1:
+                _, evicted = self._cache.popitem(last=False)
+                self._bytes -= evicted.byteCount()
+        self.loaded.emit(path, img)
+
+
+_thumbnail_loader = None
+
+
+def thumbnail_loader():
+    global _thumbnail_loader
+    if _thumbnail_loader is None:
+        _thumbnail_loader = ThumbnailLoader(parent=QApplication.instance())
+    return _thumbnail_loader
+
 
 class HistoryWindow(QWidget):
     def __init__(self, username=None, history_file="data/history.json"):
@@ -31,12 +290,11 @@ class HistoryWindow(QWidget):
         title.setStyleSheet("font-size: 20px; font-weight: 600; margin-bottom: 12px;")
         layout.addWidget(title)
 
-        # 컬럼: 파일명 | 포즈성공 | 행동비율 | 위험도 | 시간 | 근거 | 보고서 
-        self.table = QTableWidget()
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels(
-            ["파일명", "포즈 인식 성공", "탐지 행동 비율", "위험도", "시간", "근거"]
-        )
+        # 컬럼: 파일명 | 포즈성공 | 행동비율 | 위험도 | 시간 | 근거
+        # 기록은 최신순으로 페이지 단위 로딩 (스크롤하면 다음 페이지)
+        self.model = HistoryTableModel(self.username, parent=self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
         header = self.table.horizontalHeader()
         header.setStretchLastSection(True)
         header.setSectionResizeMode(0, QHeaderView.Stretch)
@@ -46,12 +304,18 @@ class HistoryWindow(QWidget):
         header.setSectionResizeMode(4, QHeaderView.ResizeToContents)
         header.setSectionResizeMode(5, QHeaderView.ResizeToContents)
 
-
         self.table.setWordWrap(True)
         self.table.setTextElideMode(Qt.ElideNone)
-        self.table.setSortingEnabled(True)
+        # 행 높이를 고정해 내용 기준 재계산(전체 행 순회) 없이 보이는 행만 그림
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
         self.table.verticalHeader().setDefaultSectionSize(72)
-        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.setMouseTracking(True)
+
+        self.evidence_delegate = EvidenceButtonDelegate(self.table)
+        self.evidence_delegate.clicked.connect(
+            lambda row: self.open_evidence_dialog(self.model.payload(row))
+        )
+        self.table.setItemDelegateForColumn(EVIDENCE_COLUMN, self.evidence_delegate)
         layout.addWidget(self.table)
 
         # 하단 버튼들
@@ -77,90 +341,9 @@ class HistoryWindow(QWidget):
 
         self.load_history()
 
-
-    def make_ro_item(self, text, align_left=True):
-        it = QTableWidgetItem(text)
-        it.setFlags(it.flags() ^ Qt.ItemIsEditable)
-        it.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter if align_left else Qt.AlignCenter)
-        return it
-
-    def format_pose_text(self, pose_stats):
-        if not isinstance(pose_stats, dict):
-            return "-"
-        ok = pose_stats.get("success", 0)
-        ng = pose_stats.get("fail", 0)
-        return f"성공: {ok}프레임\n실패: {ng}프레임"
-
-    def format_behavior_from_chunks(self, chunks):
-        if not isinstance(chunks, list) or not chunks:
-            return "-"
-        order = ["Normal", "Loitering", "Handover", "Reapproach"]
-        label_idx = {"Normal": 0, "Loitering": 1, "Handover": 2, "Reapproach": 3}
-        counts = {name: 0 for name in order}
-        for n in chunks:
-            if n in counts:
-                counts[n] += 1
-        total = sum(counts.values()) or 1
-        lines = []
-        for name in order:
-            c = counts[name]
-            if c <= 0:
-                continue
-            pct = round(c * 100.0 / total, 2)
-            lines.append(f"- {name} (라벨 {label_idx[name]}): {c}회 ({pct:.2f}%)")
-        return "\n".join(lines) if lines else "-"
-
-    def make_colored_item(self, level):
-        it = QTableWidgetItem(str(level if level is not None else "-"))
-        it.setFlags(it.flags() ^ Qt.ItemIsEditable)
-        color = None
-        if level == "상":
-            color = Qt.red
-        elif level == "중":
-            color = Qt.darkYellow
-        elif level == "하":
-            color = Qt.darkGreen
-        if color:
-            it.setForeground(QColor(color))
-        it.setTextAlignment(Qt.AlignCenter)
-        return it
-
-
     def load_history(self):
-        history = load_all(self.username)  # [{...}, ...]
-        self.table.setRowCount(len(history))
-
-        for row, item in enumerate(history):
-            filename = item.get("filename", "-")
-            risk = item.get("risk_level", item.get("result", "-"))
-            pose_txt = self.format_pose_text(item.get("pose_stats"))
-            beh_txt = self.format_behavior_from_chunks(item.get("result_per_chunk"))
-            ts = item.get("timestamp", "-")
-
-            # decision_id/evidence가 있으면 가져와서 버튼 payload로 전달
-            payload = {
-                "decision_id": item.get("decision_id", None),
-                "filename": filename,
-                "timestamp": ts,
-                "model_version": item.get("model_version", "-"),
-                "evidence": item.get("evidence", None),  # 없으면 창에서 lazy fetch
-                "prediction": item.get("prediction", None),
-                "thresholds": item.get("thresholds", None),
-            }
-
-            self.table.setItem(row, 0, self.make_ro_item(filename))
-            self.table.setItem(row, 1, self.make_ro_item(pose_txt))
-            self.table.setItem(row, 2, self.make_ro_item(beh_txt))
-            self.table.setItem(row, 3, self.make_colored_item(risk))
-            self.table.setItem(row, 4, self.make_ro_item(ts, align_left=False))
-            self.add_evidence_button(row, payload)
-            self.table.resizeRowToContents(row)
-
-    def add_evidence_button(self, row, record_payload):
-        btn = QPushButton("근거 장면 보기")
-        btn.setCursor(Qt.PointingHandCursor)
-        btn.clicked.connect(lambda: self.open_evidence_dialog(record_payload))
-        self.table.setCellWidget(row, 5, btn)
+        # 첫 페이지만 읽고, 나머지는 QTableView가 스크롤 시 fetchMore로 요청
+        self.model.reload()
 
     def open_evidence_dialog(self, payload):
         ev_list = payload.get("evidence") or []
@@ -182,11 +365,37 @@ class HistoryWindow(QWidget):
         
 # ... (dlg/scroll/container/vbox 세팅은 동일)
 
-        img_labels, orig_pixmaps = [], []
-
+        # 썸네일은 백그라운드에서 읽고, 창은 자리만 잡아 바로 띄움
+        loader = thumbnail_loader()
+        img_labels = {}                  # 원본 경로 → [QLabel]
+        cards = {}                       # 원본 경로 → [카드 위젯] (파일이 없으면 숨김)
+        thumbs = {}                      # 원본 경로 → 썸네일 QImage
+
+        def target_width():
+            return max(600, int(scroll.viewport().width() * 0.95))
+
+        def show_image(path, image):
+            labels = img_labels.get(path)
+            if not labels:
+                return
+            if image.isNull():
+                for lbl in labels:
+                    lbl.setText("이미지를 열 수 없습니다.")
+                return
+            thumbs[path] = image
+            pm = QPixmap.fromImage(image).scaledToWidth(target_width(), Qt.SmoothTransformation)
+            for lbl in labels:
+                lbl.setMinimumHeight(0)
+                lbl.setPixmap(pm)
+
+        def hide_missing(path):
+            for card in cards.get(path, ()):
+                card.hide()
+
+        # 파일 존재 여부는 썸네일 로더가 백그라운드에서 확인 (없으면 hide_missing)
         for ev in ev_list:
             path = ev.get("image_path")
-            if not path or not os.path.exists(path):
+            if not path:
                 continue
 
             # 카드 컨테이너 (이미지 + 캡션)
@@ -195,30 +404,26 @@ class HistoryWindow(QWidget):
             card_v.setContentsMargins(0, 0, 18, 32)  # 아래 여백 조금
             card_v.setSpacing(10)
 
-            # 1) 이미지
-            img = QLabel()
+            # 1) 이미지 (썸네일이 올 때까지 자리 표시)
+            img = QLabel("불러오는 중…")
             img.setAlignment(Qt.AlignCenter)
             img.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
-
-            pm = QPixmap(path)
-            if not pm.isNull():
-                w = max(600, int(scroll.viewport().width() * 0.95))
-                img.setPixmap(pm.scaledToWidth(w, Qt.SmoothTransformation))
-
-                # (옵션) 클릭 시 원본 보기
-                def open_full(p=path, t=ev.get("label","-")):
-                    full = QDialog(self)
-                    full.setWindowTitle(t)
-                    full.resize(1200, 900)
-                    s = QScrollArea(full); s.setWidgetResizable(True)
-                    lab = QLabel(); lab.setPixmap(QPixmap(p))
-                    s.setWidget(lab)
-                    lay = QVBoxLayout(full); lay.addWidget(s)
-                    full.exec_()
-                img.mousePressEvent = lambda _e, f=open_full: f()
+            img.setMinimumHeight(320)
+
+            # 클릭 시 원본 보기 (원본 해상도는 이때만 읽음)
+            def open_full(p=path, t=ev.get("label","-")):
+                full = QDialog(self)
+                full.setWindowTitle(t)
+                full.resize(1200, 900)
+                s = QScrollArea(full); s.setWidgetResizable(True)
+                lab = QLabel(); lab.setPixmap(QPixmap(p))
+                s.setWidget(lab)
+                lay = QVBoxLayout(full); lay.addWidget(s)
+                full.exec_()
+            img.mousePressEvent = lambda _e, f=open_full: f()
 
             card_v.addWidget(img, 0, Qt.AlignHCenter)
-            img_labels.append(img); orig_pixmaps.append(pm)
+            img_labels.setdefault(path, []).append(img)
 
             # 2) 캡션 (가운데 정렬)
             caption_txt = f"{ev.get('label','-')} @ {ev.get('timestamp_sec','-')}s"
@@ -230,27 +435,46 @@ class HistoryWindow(QWidget):
 
             # 카드 추가
             vbox.addWidget(card, 0, Qt.AlignHCenter)
+            cards.setdefault(path, []).append(card)
 
         scroll.setWidget(container)
         lay = QVBoxLayout(dlg)
         lay.addWidget(scroll)
 
-        # ... (scroll.setWidget(container), 레이아웃/리사이즈 핸들러 동일)
+        loader.loaded.connect(show_image)
+        loader.missing.connect(hide_missing)
+        for path in img_labels:
+            cached = loader.cached(path)
+            if cached is not None:
+                show_image(path, cached)
+            else:
+                loader.request(path)
+
+        # 크기 조절이 멈춘 뒤 한 번만 썸네일에서 다시 축소 (원본은 다시 읽지 않음)
+        rescale_timer = QTimer(dlg)
+        rescale_timer.setSingleShot(True)
+        rescale_timer.setInterval(80)
+
         def _rescale():
-            w = max(600, int(scroll.viewport().width() * 0.95))
-            for lbl, pm in zip(img_labels, orig_pixmaps):
-                if not pm.isNull():
-                    lbl.setPixmap(pm.scaledToWidth(w, Qt.SmoothTransformation))
+            w = target_width()
+            for path, image in thumbs.items():
+                pm = QPixmap.fromImage(image).scaledToWidth(w, Qt.SmoothTransformation)
+                for lbl in img_labels[path]:
+                    lbl.setPixmap(pm)
+        rescale_timer.timeout.connect(_rescale)
 
         old_resize = dlg.resizeEvent
         def new_resizeEvent(e):
-            _rescale()
+            rescale_timer.start()
             if old_resize:
                 old_resize(e)
         dlg.resizeEvent = new_resizeEvent
 
-        QTimer.singleShot(0, _rescale)
-        dlg.exec_()
+        try:
+            dlg.exec_()
+        finally:
+            loader.loaded.disconnect(show_image)
+            loader.missing.disconnect(hide_missing)
 
 
     def clear_history(self):
@@ -260,7 +484,7 @@ class HistoryWindow(QWidget):
         )
         if reply == QMessageBox.Yes:
             deleted = delete_all(self.username)
-            self.table.setRowCount(0)
+            self.model.reload()
             QMessageBox.information(self, "삭제됨", f"{deleted}개 기록이 삭제되었습니다.")
 
 
@@ -16,10 +16,9 @@ from PyQt5.QtWidgets import (
     QDialog,
     QHeaderView,
 )
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtCore import Qt, QTimer, QThread, QObject, pyqtSignal
 from gui.history_window import HistoryWindow
-from core.services.predict import predict_from_video
-from core.services.history_json import append_record  # 0815 추가
+from core.services.history import append_record, build_record
 
 
 # Qt 플러그인 경로 및 모듈 경로 설정
@@ -29,6 +28,86 @@ PARENT_DIR = os.path.dirname(CURRENT_DIR)
 sys.path.append(PARENT_DIR)
 
 
+STAGE_TEXT = {
+    "decoded": "영상 디코딩 중",
+    "posed": "포즈 추출 중",
+    "inferred": "행동 추론 중",
+    "evidence": "근거 이미지 저장 중",
+}
+
+
+def format_progress(event):
+    # 아직 끝나지 않은 가장 앞 단계 기준으로 표시 (decoded는 포즈 추출과 함께 진행)
+    stages = event.get("stages") or {}
+    stage = event.get("stage")
+    for name in ("posed", "inferred", "evidence"):
+        done, total = stages.get(name, (0, None))
+        if total is None or done < total:
+            stage = name
+            break
+    done, total = stages.get(stage, (event.get("done"), event.get("total")))
+    text = STAGE_TEXT.get(stage, "분석 중")
+    if total:
+        text += f" ({done}/{total})"
+    eta = event.get("eta_sec")
+    if eta is not None:
+        m, sec = divmod(int(eta), 60)
+        text += f"\n남은 시간 약 {m}분 {sec}초" if m else f"\n남은 시간 약 {sec}초"
+    return text
+
+
+# 분석 작업 스레드 — predict_from_video를 GUI 스레드 밖에서 실행하고 진행 상황을 시그널로 전달
+class AnalysisWorker(QThread):
+    progress = pyqtSignal(dict)
+    finished_with_result = pyqtSignal(dict)
+
+    def __init__(self, file_path, username, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        self.username = username
+
+    def run(self):
+        try:
+            # torch/mediapipe는 첫 분석 시점에 로드 (앱 시작 속도)
+            from core.services.predict import predict_from_video
+
+            result_data = predict_from_video(
+                self.file_path, self.username, progress=self.progress.emit
+            )
+        except Exception as e:
+            result_data = {"success": False, "message": f"분석 실패: {e}"}
+        self.finished_with_result.emit(result_data)
+
+
+# 일괄 분석 큐(백그라운드 스레드)의 상태 변경을 GUI 스레드로 전달
+class BatchSignals(QObject):
+    updated = pyqtSignal(object)
+
+
+BATCH_STATE_TEXT = {
+    "queued": "대기",
+    "running": "분석 중",
+    "done": "완료",
+    "failed": "실패",
+    "cancelled": "취소됨",
+}
+
+
+def format_batch_status(job):
+    text = BATCH_STATE_TEXT.get(job.state, job.state)
+    if job.state == "running":
+        if job.cancel_requested:
+            return "취소 중"
+        if job.progress:
+            text += f" {job.progress.get('percent', 0):.0f}%"
+            eta = job.progress.get("eta_sec")
+            if eta is not None:
+                text += f" (약 {int(eta)}초)"
+    elif job.state == "failed" and job.message:
+        text += f": {job.message}"
+    return text
+
+
 class UploadWindow(QWidget):
     # 업로드 창 초기화
     def __init__(self, username="guest"):
@@ -39,17 +118,20 @@ class UploadWindow(QWidget):
         self.history_window = None
         self.username = username
         self.loading_dialog = None  # 분석중 다이얼로그 핸들
-        self.progress_timer = None  # 게이지 애니메이션용 타이머
-        self.progress_value = 0  # 게이지 현재 값
+        self.worker = None  # 분석 작업 스레드
+        self.batch_queue = None  # 일괄 분석 큐 (처음 사용할 때 생성)
+        self.batch_rows = {}  # job id → 결과 테이블 파일명 셀
+        self.batch_signals = BatchSignals()
+        self.batch_signals.updated.connect(self.on_batch_update)
         self.setup_ui()
 
     # 로딩 다이얼로그 표시
-    def show_loading_dialog(self, message="분석 중입니다...", estimated_ms=4000):
+    def show_loading_dialog(self, message="분석 중입니다..."):
         # QDialog로 로딩창 생성
         self.loading_dialog = QDialog(self)
         self.loading_dialog.setWindowTitle("예측 진행 중")
         self.loading_dialog.setModal(True)
-        self.loading_dialog.setFixedSize(300, 100)
+        self.loading_dialog.setFixedSize(340, 120)
 
         # 레이아웃 및 위젯 설정
         layout = QVBoxLayout()
@@ -65,19 +147,12 @@ class UploadWindow(QWidget):
         self.loading_dialog.setLayout(layout)
         self.loading_dialog.show()
 
-        # 진행률 타이머 시작
-        self.progress_value = 0
-        self.progress_timer = QTimer()
-        self.progress_timer.timeout.connect(lambda: self.update_progress(estimated_ms))
-        self.progress_timer.start(estimated_ms // 100)
-
-    # 로딩 다이얼로그 진행률 업데이트
-    def update_progress(self, estimated_ms):
-        if self.progress_value < 100:
-            self.progress_value += 1
-            self.loading_bar.setValue(self.progress_value)
-        else:
-            self.progress_timer.stop()
+    # 로딩 다이얼로그 진행률 업데이트 (작업 스레드의 progress 시그널)
+    def update_progress(self, event):
+        if self.loading_dialog is None:
+            return
+        self.loading_bar.setValue(int(event.get("percent", 0)))
+        self.loading_label.setText(format_progress(event))
 
     # UI 구성
     def setup_ui(self):
@@ -97,6 +172,25 @@ class UploadWindow(QWidget):
         self.analyze_btn.clicked.connect(self.start_analysis)
         layout.addWidget(self.analyze_btn)
 
+        # 일괄 분석 (여러 영상/폴더 → 프로세스 풀에서 동시 분석)
+        batch_layout = QHBoxLayout()
+        self.batch_files_btn = QPushButton("여러 영상 일괄 분석")
+        self.batch_files_btn.clicked.connect(self.add_batch_files)
+        batch_layout.addWidget(self.batch_files_btn)
+
+        self.batch_folder_btn = QPushButton("폴더 일괄 분석")
+        self.batch_folder_btn.clicked.connect(self.add_batch_folder)
+        batch_layout.addWidget(self.batch_folder_btn)
+
+        self.batch_front_btn = QPushButton("선택 영상 먼저 분석")
+        self.batch_front_btn.clicked.connect(self.prioritize_selected)
+        batch_layout.addWidget(self.batch_front_btn)
+
+        self.batch_cancel_btn = QPushButton("선택 영상 취소")
+        self.batch_cancel_btn.clicked.connect(self.cancel_selected)
+        batch_layout.addWidget(self.batch_cancel_btn)
+        layout.addLayout(batch_layout)
+
         # 분석 기록 보기 버튼
         self.history_btn = QPushButton("분석 기록 보기")
         self.history_btn.clicked.connect(self.open_history_window)
@@ -116,6 +210,7 @@ class UploadWindow(QWidget):
         self.result_table.setTextElideMode(Qt.ElideNone)
         self.result_table.verticalHeader().setDefaultSectionSize(36)
         self.result_table.setSortingEnabled(True)
+        self.result_table.setSelectionBehavior(QTableWidget.SelectRows)
 
         layout.addWidget(self.result_table)
         self.setLayout(layout)
@@ -126,58 +221,128 @@ class UploadWindow(QWidget):
             QMessageBox.warning(self, "경고", "먼저 영상을 업로드하세요.")
             return
 
-        # 분석 중 로딩창 표시
-        self.show_loading_dialog("AI 분석 중입니다...", estimated_ms=4000)
-
-        # 게이지바 완료 후 예측 실행
-        def run_prediction_after_progress():
-            result_data = predict_from_video(self.file_path, self.username)
-
-            if not result_data.get("success"):
-                if self.progress_timer:
-                    self.progress_timer.stop()
-                if self.loading_dialog:
-                    self.loading_dialog.close()
-                QMessageBox.critical(
-                    self, "오류", result_data.get("message", "분석 실패")
-                )
-                return
-
-            result = result_data["result"]
-            filename = result_data["filename"]
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
-
-            # 결과 표시
-            self.loading_label.setText(f"분석 결과: {result}")
-            QApplication.processEvents()
-            QTimer.singleShot(1200, self.loading_dialog.close)  # 결과 보여준 뒤 닫기
-
-            # 결과 테이블에 결과 추가
-            row = self.result_table.rowCount()
-            self.result_table.insertRow(row)
-            self.result_table.setItem(row, 0, QTableWidgetItem(filename))
-            self.result_table.setItem(row, 1, QTableWidgetItem("완료"))
-            self.result_table.setItem(row, 2, QTableWidgetItem(result))
-            self.result_table.setItem(row, 3, QTableWidgetItem(timestamp))
-
-            # 기록 저장
-            append_record(
-                {
-                    "username": self.username,
-                    "filename": result_data["filename"],
-                    "result": result_data["result"],  # 위험도
-                    "risk_level": result_data["result"],  # (옵션)
-                    "pose_stats": result_data.get("pose_stats"),
-                    "behavior_counts": result_data.get("behavior_counts"),
-                    "result_per_chunk": result_data.get("result_per_chunk"),
-                    "confidence": None,
-                    "timestamp": timestamp,
-                    "description": "AI 자동 분석 결과",
-                    "evidence": result_data.get("evidence", []),
-                }
+        if self.worker is not None and self.worker.isRunning():
+            return
+
+        # 분석 중 로딩창 표시 후 작업 스레드에서 분석 (GUI는 계속 응답)
+        self.show_loading_dialog("AI 분석 준비 중입니다...")
+        self.analyze_btn.setEnabled(False)
+
+        self.worker = AnalysisWorker(self.file_path, self.username, parent=self)
+        self.worker.progress.connect(self.update_progress)
+        self.worker.finished_with_result.connect(self.on_analysis_finished)
+        self.worker.start()
+
+    # 분석 완료 (GUI 스레드에서 실행)
+    def on_analysis_finished(self, result_data):
+        self.analyze_btn.setEnabled(True)
+
+        if not result_data.get("success"):
+            if self.loading_dialog:
+                self.loading_dialog.close()
+            QMessageBox.critical(
+                self, "오류", result_data.get("message", "분석 실패")
             )
+            return
 
-        QTimer.singleShot(4000, run_prediction_after_progress)
+        result = result_data["result"]
+        filename = result_data["filename"]
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
+
+        # 결과 표시
+        self.loading_bar.setValue(100)
+        self.loading_label.setText(f"분석 결과: {result}")
+        QTimer.singleShot(1200, self.loading_dialog.close)  # 결과 보여준 뒤 닫기
+
+        # 결과 테이블에 결과 추가
+        row = self.result_table.rowCount()
+        self.result_table.insertRow(row)
+        self.result_table.setItem(row, 0, QTableWidgetItem(filename))
+        self.result_table.setItem(row, 1, QTableWidgetItem("완료"))
+        self.result_table.setItem(row, 2, QTableWidgetItem(result))
+        self.result_table.setItem(row, 3, QTableWidgetItem(timestamp))
+
+        # 기록 저장
+        append_record(build_record(result_data, self.username, timestamp))
+
+    # ---------- 일괄 분석 ----------
+    def get_batch_queue(self):
+        if self.batch_queue is None:
+            from core.services.batch import BatchQueue
+
+            self.batch_queue = BatchQueue(
+                username=self.username, on_update=self.batch_signals.updated.emit
+            )
+        return self.batch_queue
+
+    def add_batch_files(self):
+        paths, _ = QFileDialog.getOpenFileNames(
+            self, "영상 선택 (여러 개)", "", "Video Files (*.mp4)"
+        )
+        paths = [p for p in paths if p.lower().endswith(".mp4")]
+        if paths:
+            self.get_batch_queue().add_many(paths)
+
+    def add_batch_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "영상 폴더 선택")
+        if not folder:
+            return
+        from core.services.batch import list_videos
+
+        paths = list_videos(folder)
+        if not paths:
+            QMessageBox.information(self, "영상 없음", "폴더에 mp4 파일이 없습니다.")
+            return
+        self.get_batch_queue().add_many(paths)
+
+    def selected_job_ids(self):
+        ids = set()
+        for index in self.result_table.selectionModel().selectedRows():
+            item = self.result_table.item(index.row(), 0)
+            job_id = item.data(Qt.UserRole) if item else None
+            if job_id is not None:
+                ids.add(job_id)
+        return ids
+
+    def prioritize_selected(self):
+        if self.batch_queue is None:
+            return
+        # 선택 순서대로 맨 앞에 두려면 뒤에서부터 앞으로 당김
+        for job_id in sorted(self.selected_job_ids(), reverse=True):
+            self.batch_queue.move_to_front(job_id)
+
+    def cancel_selected(self):
+        if self.batch_queue is None:
+            return
+        for job_id in self.selected_job_ids():
+            self.batch_queue.cancel(job_id)
+
+    # 일괄 분석 작업 상태 변경 (GUI 스레드에서 실행)
+    def on_batch_update(self, job):
+        name_item = self.batch_rows.get(job.id)
+        if name_item is None:
+            # 정렬 중에 행을 추가하면 위치가 바뀌므로 잠시 끔
+            self.result_table.setSortingEnabled(False)
+            row = self.result_table.rowCount()
+            self.result_table.insertRow(row)
+            name_item = QTableWidgetItem(job.filename)
+            name_item.setData(Qt.UserRole, job.id)
+            self.result_table.setItem(row, 0, name_item)
+            for col in (1, 2, 3):
+                self.result_table.setItem(row, col, QTableWidgetItem("-"))
+            self.result_table.setSortingEnabled(True)
+            self.batch_rows[job.id] = name_item
+
+        row = name_item.row()
+        self.result_table.item(row, 1).setText(format_batch_status(job))
+        if job.state == "done" and job.result:
+            self.result_table.item(row, 2).setText(job.result["result"])
+            self.result_table.item(row, 3).setText(datetime.now().strftime("%Y-%m-%d %H:%M"))
+
+    def closeEvent(self, event):
+        if self.batch_queue is not None:
+            self.batch_queue.shutdown(wait=False)
+        super().closeEvent(event)
 
     # 파일 업로드
     def upload_file(self):
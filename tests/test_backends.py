@@ -0,0 +1,68 @@
+# tests/test_backends.py
+# 추론 백엔드(torchscript / onnx)가 eager와 같은 출력을 내는지 확인
+#   python -m unittest tests.test_backends
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from core.models import backends
+from core.services.predict import MODEL_PATH, WINDOW
+
+N_WINDOWS = 257                   # 배치 크기로 나누어떨어지지 않는 수 (마지막 배치 크기가 다름)
+BATCH_SIZE = 64
+PROB_TOLERANCE = 1e-4
+
+
+def _onnx_available() -> bool:
+    # 설치돼 있어도 protobuf 버전 충돌 등으로 import가 실패할 수 있어 직접 불러 봄
+    try:
+        import onnx  # noqa: F401
+        import onnxruntime  # noqa: F401
+    except Exception:
+        return False
+    return True
+
+
+@unittest.skipUnless(os.path.exists(MODEL_PATH), "lstm_model.pt 없음")
+class BackendParityTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # 변환 파일은 임시 폴더에 (uploads/cache/models를 건드리지 않음)
+        cls._tmp = tempfile.TemporaryDirectory()
+        cls._patch = mock.patch.object(backends, "EXPORT_FOLDER", cls._tmp.name)
+        cls._patch.start()
+        cls.reference = backends.load_backend("eager", MODEL_PATH)
+        rng = np.random.default_rng(0)
+        cls.windows = rng.standard_normal((N_WINDOWS, WINDOW, 66)).astype(np.float32)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._patch.stop()
+        cls._tmp.cleanup()
+
+    def assert_parity(self, name):
+        backend = backends.load_backend(name, MODEL_PATH)
+        parity = backends.check_parity(backend, self.reference, self.windows, BATCH_SIZE)
+        self.assertLessEqual(parity["max_abs_prob_diff"], PROB_TOLERANCE, parity)
+        self.assertEqual(parity["argmax_agreement"], 1.0, parity)
+
+    def test_eager(self):
+        self.assert_parity("eager")
+
+    def test_torchscript(self):
+        self.assert_parity("torchscript")
+
+    @unittest.skipUnless(_onnx_available(), "onnx / onnxruntime 미설치")
+    def test_onnx(self):
+        self.assert_parity("onnx")
+
+    def test_base_class_is_abstract(self):
+        with self.assertRaises(TypeError):
+            backends.InferenceBackend()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+# tests/test_cache.py
+# 분석 캐시: 키 구성, 저장/조회 왕복, 손상 항목, LRU 용량 정리 확인
+#   python -m unittest tests.test_cache
+import hashlib
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from core.services import cache
+
+KEY_PARTS = ("model-v1", "preprocess-v1", 30, 1)
+
+
+class CacheKeyTest(unittest.TestCase):
+    def test_file_hash_is_content_sha256(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "clip.mp4")
+            data = os.urandom(3 * cache._HASH_CHUNK + 17)   # 여러 청크에 걸친 크기
+            with open(path, "wb") as f:
+                f.write(data)
+            self.assertEqual(cache.file_hash(path), hashlib.sha256(data).hexdigest())
+
+    def test_key_depends_on_every_part(self):
+        key = cache.make_key("abc", *KEY_PARTS)
+        self.assertEqual(key, cache.make_key("abc", *KEY_PARTS))
+        self.assertNotEqual(key, cache.make_key("abd", *KEY_PARTS))
+        for i in range(len(KEY_PARTS)):
+            changed = list(KEY_PARTS)
+            changed[i] = f"{changed[i]}-new"
+            self.assertNotEqual(key, cache.make_key("abc", *changed), f"버전 {i} 변경이 키에 반영되지 않음")
+        # stride 1과 5는 확률이 다르므로 다른 항목
+        self.assertNotEqual(cache.make_key("abc", "m", "p", 30, 1), cache.make_key("abc", "m", "p", 30, 5))
+
+
+class CacheStoreTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.folder = self._tmp.name
+        self._patches = [
+            mock.patch.object(cache, "CACHE_FOLDER", self.folder),
+            mock.patch.object(cache, "CACHE_MAX_BYTES", 1 << 30),
+        ]
+        for p in self._patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self._patches:
+            p.stop()
+        self._tmp.cleanup()
+
+    def save(self, key, n=40):
+        rng = np.random.default_rng(len(key))
+        cache.save_entry(
+            key,
+            pose=rng.random((n, 66)),
+            frame_index_map=list(range(0, 2 * n, 2)),
+            probs=rng.random((n - 29, 4)),
+            meta={"fps": 30.0, "evidence": [{"label": "배회", "frame_idx": 12}]},
+        )
+        return cache._entry_path(key)
+
+    def set_mtime(self, path, age_sec):
+        t = time.time() - age_sec
+        os.utime(path, (t, t))
+
+    def test_round_trip(self):
+        rng = np.random.default_rng(0)
+        pose, probs = rng.random((40, 66)), rng.random((11, 4))
+        meta = {"fps": 29.97, "evidence": [{"label": "배회", "frame_idx": 12}]}
+        cache.save_entry("k", pose, [1, 3, 5], probs, meta)
+        entry = cache.load_entry("k")
+        np.testing.assert_array_equal(entry["pose"], pose.astype(np.float32))
+        np.testing.assert_array_equal(entry["probs"], probs.astype(np.float32))
+        self.assertEqual(entry["frame_index_map"], [1, 3, 5])
+        self.assertEqual(entry["meta"], meta)
+        self.assertEqual(os.listdir(self.folder), ["k.npz"])      # 임시 파일이 남지 않음
+
+    def test_missing_and_corrupt_entries(self):
+        self.assertIsNone(cache.load_entry("missing"))
+        with open(cache._entry_path("bad"), "wb") as f:
+            f.write(b"not an npz")
+        self.assertIsNone(cache.load_entry("bad"))
+
+    def test_evict_least_recently_used(self):
+        paths = {key: self.save(key) for key in ("a", "b", "c")}
+        for age, key in enumerate(("c", "b", "a")):
+            self.set_mtime(paths[key], 100 * (age + 1))          # a가 가장 오래됨
+        size = os.path.getsize(paths["a"])
+
+        # 조회하면 최근 사용으로 갱신되어 정리 대상에서 뒤로 밀림
+        self.assertIsNotNone(cache.load_entry("a"))
+        removed = cache._evict(2 * size + size // 2)
+        self.assertEqual(removed, 1)
+        self.assertEqual(sorted(os.listdir(self.folder)), ["a.npz", "c.npz"])
+
+    def test_save_evicts_over_limit(self):
+        first = self.save("first")
+        self.set_mtime(first, 100)
+        with mock.patch.object(cache, "CACHE_MAX_BYTES", os.path.getsize(first) + 1):
+            self.save("second")
+        self.assertEqual(os.listdir(self.folder), ["second.npz"])
+
+    def test_evict_cleans_stale_tmp_and_skips_models(self):
+        models = os.path.join(self.folder, "models")
+        os.makedirs(models)
+        kept = [os.path.join(models, "lstm_model.onnx"), os.path.join(self.folder, "fresh.tmp")]
+        stale = os.path.join(self.folder, "stale.tmp")
+        for p in kept + [stale]:
+            with open(p, "wb") as f:
+                f.write(b"x" * 1024)
+        self.set_mtime(stale, cache.STALE_TMP_SEC + 60)
+        nested = os.path.join(models, "old.npz")                  # 하위 폴더의 항목도 정리 대상
+        with open(nested, "wb") as f:
+            f.write(b"x" * 1024)
+
+        self.assertEqual(cache.clear(), 1)
+        self.assertFalse(os.path.exists(stale))
+        self.assertFalse(os.path.exists(nested))
+        for p in kept:
+            self.assertTrue(os.path.exists(p), p)
+
+
+if __name__ == "__main__":
+    unittest.main()
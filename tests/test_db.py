@@ -0,0 +1,58 @@
+# tests/test_db.py
+# 풀 연결 트랜잭션: 안쪽에서 다시 연 transaction()이 바깥 트랜잭션을 먼저 끝내지 않는지 확인
+#   python -m unittest tests.test_db
+import os
+import tempfile
+import unittest
+
+from core import db
+
+
+class TransactionTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, "test.db")
+        with db.transaction(self.path) as conn:
+            conn.execute("CREATE TABLE t (x INTEGER)")
+
+    def tearDown(self):
+        db.close_thread_connections()
+        self._tmp.cleanup()
+
+    def values(self):
+        rows = db.get_connection(self.path).execute("SELECT x FROM t ORDER BY x").fetchall()
+        return [x for (x,) in rows]
+
+    def test_nested_commit_waits_for_outer(self):
+        with self.assertRaises(RuntimeError):
+            with db.transaction(self.path) as conn:
+                conn.execute("INSERT INTO t VALUES (1)")
+                with db.transaction(self.path) as inner:
+                    inner.execute("INSERT INTO t VALUES (2)")
+                self.assertTrue(conn.in_transaction)
+                raise RuntimeError
+        self.assertEqual(self.values(), [])
+
+    def test_nested_rollback_keeps_outer_changes(self):
+        with db.transaction(self.path) as conn:
+            conn.execute("INSERT INTO t VALUES (1)")
+            with self.assertRaises(ValueError):
+                with db.transaction(self.path, immediate=True) as inner:
+                    inner.execute("INSERT INTO t VALUES (2)")
+                    raise ValueError
+            conn.execute("INSERT INTO t VALUES (3)")
+        self.assertEqual(self.values(), [1, 3])
+
+    def test_nested_after_read_only_outer_start(self):
+        # 바깥이 아직 SELECT만 했어도 안쪽 변경은 바깥과 함께 commit
+        with db.transaction(self.path) as conn:
+            conn.execute("SELECT COUNT(*) FROM t").fetchone()
+            with db.transaction(self.path) as inner:
+                inner.execute("INSERT INTO t VALUES (1)")
+            self.assertTrue(conn.in_transaction)
+        self.assertFalse(db.get_connection(self.path).in_transaction)
+        self.assertEqual(self.values(), [1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+# tests/test_events.py
+# 행동 이벤트 구간화(segment_events): 히스테리시스, 짧은 끊김 병합, 최소 길이, 프레임/시각 변환 확인
+#   python -m unittest tests.test_events
+import unittest
+
+import numpy as np
+
+from core.services.events import segment_events
+from core.services.scoring import LABEL_MAP
+
+LOITERING, HANDOVER, REAPPROACH = 1, 2, 3
+# 설정(DROVIS_EVENT_*)과 무관하게 고정 — 30fps, stride 1이면 min 15윈도우, 병합 간격 6윈도우
+PARAMS = dict(fps=30.0, window=30, enter=0.7, exit=0.4, min_sec=0.5, merge_gap_sec=0.2)
+
+
+def _probs(n, spans):
+    """spans: {라벨: [(시작, 끝(미포함), 확률), ...]} → (n, 4) 확률 행렬 (나머지는 Normal)"""
+    probs = np.zeros((n, len(LABEL_MAP)), dtype=np.float32)
+    for lbl, parts in spans.items():
+        for s, e, p in parts:
+            probs[s:e, lbl] = p
+    probs[:, 0] = 1.0 - probs[:, 1:].sum(axis=1)
+    return probs
+
+
+def _events(events, lbl):
+    return [ev for ev in events if ev["label"] == LABEL_MAP[lbl]]
+
+
+class SegmentEventsTest(unittest.TestCase):
+    def test_event_bounds_and_stats(self):
+        probs = _probs(200, {LOITERING: [(10, 40, 0.9)]})
+        (ev,) = segment_events(probs, **PARAMS)
+        self.assertEqual(ev, {
+            "label": "Loitering",
+            "start_sec": round(10 / 30, 2),
+            "end_sec": round(69 / 30, 2),
+            "start_frame": 10,
+            "end_frame": 39 + 29,             # 마지막 윈도우의 마지막 프레임
+            "peak_prob": 0.9,
+            "mean_prob": 0.9,
+            "windows": 30,
+        })
+
+    def test_hysteresis_needs_enter_probability(self):
+        probs = _probs(200, {LOITERING: [(60, 100, 0.5), (120, 160, 0.5), (140, 141, 0.8)]})
+        (ev,) = _events(segment_events(probs, **PARAMS), LOITERING)
+        # exit 이상 구간 전체가 이벤트 — enter를 넘은 윈도우 하나만이 아님
+        self.assertEqual((ev["start_frame"], ev["windows"]), (120, 40))
+        self.assertEqual(ev["peak_prob"], 0.8)
+        self.assertAlmostEqual(ev["mean_prob"], (39 * 0.5 + 0.8) / 40, places=4)
+
+    def test_short_gaps_merge_and_short_events_drop(self):
+        probs = _probs(200, {
+            HANDOVER: [(10, 30, 0.9), (33, 53, 0.9)],               # 3윈도우 끊김 → 병합
+            REAPPROACH: [(10, 20, 0.9), (100, 120, 0.9), (131, 151, 0.9)],  # 10윈도우 → 버림, 11윈도우 끊김 → 따로
+        })
+        events = segment_events(probs, **PARAMS)
+        (handover,) = _events(events, HANDOVER)
+        self.assertEqual((handover["start_frame"], handover["windows"]), (10, 43))
+        self.assertAlmostEqual(handover["mean_prob"], 40 * 0.9 / 43, places=4)
+        self.assertEqual(
+            [(ev["start_frame"], ev["windows"]) for ev in _events(events, REAPPROACH)],
+            [(100, 20), (131, 20)],
+        )
+        starts = [(ev["start_frame"], ev["label"]) for ev in events]
+        self.assertEqual(starts, sorted(starts))
+
+    def test_frame_index_map_and_stride(self):
+        # 포즈 프레임이 원본 2프레임마다, 원본 100번 프레임부터 (확률 행 간격 = 포즈 2프레임)
+        stride, n = 2, 50
+        fim = (100 + 2 * np.arange((n - 1) * stride + 30)).tolist()
+        probs = _probs(n, {LOITERING: [(10, 20, 0.9), (30, 32, 0.9)]})
+        (ev,) = segment_events(probs, frame_index_map=fim, stride=stride, **PARAMS)
+        # 행 하나 = 2 × 2 / 30초 → min 4행이므로 2행짜리 구간은 버림
+        first, last = fim[10 * stride], fim[19 * stride + 29]
+        self.assertEqual((ev["start_frame"], ev["end_frame"]), (first, last))
+        self.assertEqual((ev["start_sec"], ev["end_sec"]), (round(first / 30, 2), round((last + 1) / 30, 2)))
+        self.assertEqual(ev["windows"], 10)
+
+    def test_event_running_to_the_end(self):
+        probs = _probs(60, {LOITERING: [(40, 60, 0.9)]})
+        (ev,) = segment_events(probs, **PARAMS)
+        self.assertEqual((ev["start_frame"], ev["end_frame"], ev["windows"]), (40, 59 + 29, 20))
+
+    def test_no_events(self):
+        self.assertEqual(segment_events(np.zeros((0, 4)), **PARAMS), [])
+        self.assertEqual(segment_events(_probs(100, {}), **PARAMS), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
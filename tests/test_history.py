@@ -0,0 +1,88 @@
+# tests/test_history.py
+# 분석 기록 keyset 페이지네이션(load_page): 같은 시각 기록이 많아도 빠지거나 겹치지 않는지 확인
+#   python -m unittest tests.test_history
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from core.config import Config
+from core.db import close_thread_connections
+from core.models import create_analysis_table
+from core.services import history
+
+# 분 단위 시각이라 같은 시각 기록이 흔함 — 페이지 경계가 같은 시각 묶음 한가운데 오도록 구성
+TIMESTAMPS = ["2026-10-18 09:00"] * 3 + ["2026-10-18 09:05"] * 7 + ["2026-10-18 10:00"] * 2
+
+
+class LoadPageTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self._patch = mock.patch.object(
+            Config, "ANALYSIS_DB_PATH", os.path.join(self._tmp.name, "analysis.db")
+        )
+        self._patch.start()
+        create_analysis_table()
+        # id 순서와 시각 순서가 다르도록 섞어서 저장 (같은 시각 안에서는 id가 큰 쪽이 최신)
+        order = [4, 0, 11, 7, 2, 9, 5, 1, 10, 3, 8, 6]
+        for i in order:
+            history.append_record({
+                "username": "alice" if i % 3 else "bob",
+                "filename": f"clip{i}.mp4",
+                "result": "하",
+                "timestamp": TIMESTAMPS[i],
+                "evidence": [],
+            })
+
+    def tearDown(self):
+        close_thread_connections()
+        self._patch.stop()
+        self._tmp.cleanup()
+
+    def expected(self, username=None):
+        records = history.load_all(username)
+        return [r["id"] for r in sorted(records, key=lambda r: (r["timestamp"], r["id"]), reverse=True)]
+
+    def read_all_pages(self, username=None, limit=3):
+        ids, cursor, pages = [], None, 0
+        while True:
+            records, cursor = history.load_page(username, cursor, limit)
+            self.assertLessEqual(len(records), limit)
+            ids += [r["id"] for r in records]
+            pages += 1
+            if cursor is None:
+                return ids, pages
+            self.assertLess(pages, 100, "페이지가 끝나지 않음")
+
+    def test_pages_cover_every_record_once_in_order(self):
+        for limit in (1, 2, 3, 5, 12, 50):
+            ids, pages = self.read_all_pages(limit=limit)
+            self.assertEqual(ids, self.expected(), f"limit={limit}")
+            self.assertEqual(pages, max(1, -(-len(ids) // limit)), f"limit={limit}")
+
+    def test_user_filter(self):
+        for username in ("alice", "bob"):
+            ids, _ = self.read_all_pages(username, limit=2)
+            self.assertEqual(ids, self.expected(username))
+            self.assertTrue(ids)
+
+    def test_records_added_after_first_page_do_not_shift_later_pages(self):
+        first, cursor = history.load_page(limit=4)
+        history.append_record({
+            "username": "alice", "filename": "new.mp4", "result": "하",
+            "timestamp": "2026-10-18 11:00", "evidence": [],
+        })
+        rest = []
+        while cursor is not None:
+            records, cursor = history.load_page(cursor=cursor, limit=4)
+            rest += [r["id"] for r in records]
+        self.assertEqual([r["id"] for r in first] + rest, self.expected()[1:])
+
+    def test_invalid_cursor(self):
+        for cursor in ("", "2026-10-18 09:00", "2026-10-18 09:00|x"):
+            with self.assertRaises(ValueError):
+                history.load_page(cursor=cursor)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+# tests/test_jobqueue.py
+# 분산 작업 큐: 여러 프로세스가 같은 DB에서 claim해도 작업이 겹치지 않는지, 만료된 임대가 회수되는지 확인
+#   python -m unittest tests.test_jobqueue
+import multiprocessing as mp
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from core.config import Config
+from core.db import close_thread_connections
+from core.models import create_analysis_table
+from core.services import jobqueue
+
+N_JOBS = 80
+N_WORKERS = 4
+
+
+def _claim_until_empty(db_path, worker_id, results):
+    """자식 프로세스: 대기열이 빌 때까지 claim만 반복 (분석 없이 바로 다음 작업)"""
+    Config.ANALYSIS_DB_PATH = db_path
+    claimed = []
+    while True:
+        job = jobqueue.claim(worker_id, lease_sec=60)
+        if job is None:
+            break
+        claimed.append(job["id"])
+    results.put((worker_id, claimed))
+
+
+def _claim_and_die(db_path, worker_id, lease_sec):
+    """자식 프로세스: 작업 1건을 임대한 채 완료/반환 없이 종료 (죽은 워커 흉내)"""
+    Config.ANALYSIS_DB_PATH = db_path
+    jobqueue.claim(worker_id, lease_sec=lease_sec)
+
+
+class JobQueueTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self._tmp.name, "analysis.db")
+        self._patch = mock.patch.object(Config, "ANALYSIS_DB_PATH", self.db_path)
+        self._patch.start()
+        create_analysis_table()
+        self.ctx = mp.get_context("spawn")      # 워커와 같은 방식 (fork로 연결을 물려받지 않음)
+
+    def tearDown(self):
+        close_thread_connections()
+        self._patch.stop()
+        self._tmp.cleanup()
+
+    def run_child(self, target, *args):
+        p = self.ctx.Process(target=target, args=(self.db_path,) + args)
+        p.start()
+        p.join(60)
+        self.assertEqual(p.exitcode, 0)
+
+    def test_concurrent_claims_never_share_a_job(self):
+        ids = [jobqueue.enqueue(f"/videos/{i}.mp4", "ops") for i in range(N_JOBS)]
+        results = self.ctx.Queue()
+        procs = [
+            self.ctx.Process(target=_claim_until_empty, args=(self.db_path, f"w{n}", results))
+            for n in range(N_WORKERS)
+        ]
+        for p in procs:
+            p.start()
+        claimed = dict(results.get(timeout=60) for _ in procs)
+        for p in procs:
+            p.join(60)
+            self.assertEqual(p.exitcode, 0)
+
+        all_claimed = [job_id for jobs in claimed.values() for job_id in jobs]
+        self.assertEqual(len(all_claimed), len(set(all_claimed)), "같은 작업을 두 워커가 임대함")
+        self.assertEqual(sorted(all_claimed), sorted(ids))
+        # DB에 남은 임대 주인도 실제로 가져간 워커와 같아야 함
+        for worker_id, jobs in claimed.items():
+            for job_id in jobs:
+                job = jobqueue.get_job(job_id)
+                self.assertEqual((job["status"], job["worker_id"], job["attempts"]),
+                                 (jobqueue.RUNNING, worker_id, 1))
+
+    def later(self, sec):
+        """임대 만료를 기다리는 대신 jobqueue가 보는 현재 시각을 sec초 뒤로"""
+        return mock.patch.object(jobqueue.time, "time", return_value=time.time() + sec)
+
+    def test_expired_lease_is_reclaimed(self):
+        job_id = jobqueue.enqueue("/videos/a.mp4", "ops")
+        self.run_child(_claim_and_die, "dead", 30)
+        self.assertEqual(jobqueue.get_job(job_id)["worker_id"], "dead")
+
+        # 임대 기간 안에는 다른 워커가 가져가지 못함
+        self.assertIsNone(jobqueue.claim("alive", lease_sec=60))
+
+        with self.later(31):
+            job = jobqueue.claim("alive", lease_sec=60)
+        self.assertIsNotNone(job)
+        self.assertEqual((job["id"], job["worker_id"], job["attempts"]), (job_id, "alive", 2))
+        # 임대를 잃은 워커는 연장/완료할 수 없음
+        self.assertFalse(jobqueue.heartbeat(job_id, "dead"))
+        self.assertIsNone(jobqueue.complete(job_id, "dead", {}, save=False))
+        self.assertEqual(jobqueue.complete(job_id, "alive", {}, save=False), -1)
+        self.assertEqual(jobqueue.get_job(job_id)["status"], jobqueue.DONE)
+
+    def test_expired_lease_fails_after_max_attempts(self):
+        job_id = jobqueue.enqueue("/videos/b.mp4", "ops", max_attempts=1)
+        self.run_child(_claim_and_die, "dead", 30)
+
+        with self.later(31):
+            self.assertIsNone(jobqueue.claim("alive", lease_sec=60))
+        job = jobqueue.get_job(job_id)
+        self.assertEqual((job["status"], job["worker_id"]), (jobqueue.FAILED, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+# tests/test_predict.py
+# 배치 전처리/추론(normalize_seq_2d, make_windows, infer_windows)이 기존 프레임별·윈도우별 루프와 같은지 확인
+#   python -m unittest tests.test_predict
+import os
+import unittest
+
+import numpy as np
+import torch
+
+from core.services import predict
+from core.services.predict import (
+    MODEL_PATH,
+    PELVIS_L,
+    PELVIS_R,
+    SHOULDER_L,
+    SHOULDER_R,
+    WINDOW,
+    infer_windows,
+    make_windows,
+    normalize_seq_2d,
+)
+
+N_FRAMES = 300
+PROB_TOLERANCE = 1e-6             # numpy softmax / 배치 행렬곱 반올림 차이
+
+
+def _normalize_loop(seq):
+    """기존 프레임별 정규화 루프"""
+    out = np.zeros_like(seq, dtype=np.float32)
+    for t, fr in enumerate(seq):
+        kp = fr.reshape(33, 2).astype(np.float32)
+        pelvis = (kp[PELVIS_L] + kp[PELVIS_R]) / 2.0
+        shoulder_y = (kp[SHOULDER_L, 1] + kp[SHOULDER_R, 1]) / 2.0
+        torso_h = abs(pelvis[1] - shoulder_y)
+        if torso_h < 1e-6:
+            torso_h = 1.0
+        out[t] = ((kp - pelvis) / torso_h).flatten()
+    return out
+
+
+def _pose_sequence(n_frames=N_FRAMES, seed=0):
+    rng = np.random.default_rng(seed)
+    seq = rng.random((n_frames, 66)).astype(np.float32)
+    # 어깨와 골반 높이가 같은 프레임 (상체 길이 0 → 1.0으로 대체되는 경로)
+    seq[5, [2 * SHOULDER_L + 1, 2 * SHOULDER_R + 1]] = 0.5
+    seq[5, [2 * PELVIS_L + 1, 2 * PELVIS_R + 1]] = 0.5
+    return seq
+
+
+class NormalizeTest(unittest.TestCase):
+    def test_matches_frame_loop(self):
+        seq = _pose_sequence()
+        out = normalize_seq_2d(seq)
+        self.assertEqual(out.dtype, np.float32)
+        np.testing.assert_array_equal(out, _normalize_loop(seq))
+
+    def test_float64_input_matches_frame_loop(self):
+        seq = _pose_sequence().astype(np.float64)
+        np.testing.assert_array_equal(normalize_seq_2d(seq), _normalize_loop(seq))
+
+    def test_batch_matches_each_sequence(self):
+        batch = np.stack([_pose_sequence(WINDOW, seed) for seed in range(4)])
+        out = normalize_seq_2d(batch)
+        for seq, normalized in zip(batch, out):
+            np.testing.assert_array_equal(normalized, _normalize_loop(seq))
+
+
+class MakeWindowsTest(unittest.TestCase):
+    def test_matches_slice_loop(self):
+        seq = normalize_seq_2d(_pose_sequence())
+        for step in (1, 3):
+            windows = make_windows(seq, WINDOW, step)
+            starts = range(0, len(seq) - WINDOW + 1, step)
+            self.assertEqual(len(windows), len(starts))
+            for w, i in zip(windows, starts):
+                np.testing.assert_array_equal(w, seq[i:i + WINDOW])
+
+    def test_short_sequence_has_no_windows(self):
+        seq = normalize_seq_2d(_pose_sequence(WINDOW - 1))
+        self.assertEqual(make_windows(seq, WINDOW).shape, (0, WINDOW, 66))
+
+
+@unittest.skipUnless(os.path.exists(MODEL_PATH), "lstm_model.pt 없음")
+class InferWindowsTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.sequence = normalize_seq_2d(_pose_sequence())
+        model = predict.get_model()
+        # 기존 윈도우별 루프: 1개씩 모델에 넣고 torch softmax
+        reference = []
+        with torch.no_grad():
+            for i in range(len(cls.sequence) - WINDOW + 1):
+                x = torch.from_numpy(cls.sequence[i:i + WINDOW]).unsqueeze(0)
+                logits = torch.from_numpy(np.asarray(model(x.numpy())))
+                reference.append(torch.softmax(logits, dim=1)[0].numpy())
+        cls.reference = np.vstack(reference)
+
+    def test_batched_matches_window_loop(self):
+        windows = make_windows(self.sequence, WINDOW, 1)
+        for batch_size in (1, 7, 64, 256):
+            probs = infer_windows(windows, batch_size)
+            self.assertEqual(probs.shape, self.reference.shape)
+            self.assertLessEqual(float(np.abs(probs - self.reference).max()), PROB_TOLERANCE)
+            np.testing.assert_array_equal(probs.argmax(axis=1), self.reference.argmax(axis=1))
+
+    def test_empty_input(self):
+        self.assertEqual(infer_windows(make_windows(self.sequence[:WINDOW - 1])).size, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
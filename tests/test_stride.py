@@ -0,0 +1,54 @@
+# tests/test_stride.py
+# 윈도우 stride: 지원 범위 밖 설정값 제한, 추론한 윈도우는 보간 후에도 그대로인지 확인
+#   python -m unittest tests.test_stride
+import contextlib
+import io
+import unittest
+
+import numpy as np
+
+from core.services.predict import (
+    MAX_WINDOW_STRIDE,
+    WINDOW,
+    expand_window_probs,
+    supported_stride,
+    window_starts,
+)
+
+
+class StrideTest(unittest.TestCase):
+    def test_supported_stride_passes_through_supported_values(self):
+        for stride in range(1, MAX_WINDOW_STRIDE + 1):
+            self.assertEqual(supported_stride(stride), stride)
+        self.assertEqual(supported_stride(None), 1)
+        self.assertEqual(supported_stride(0), 1)
+
+    def test_supported_stride_clamps_with_warning(self):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            self.assertEqual(supported_stride(MAX_WINDOW_STRIDE * 2), MAX_WINDOW_STRIDE)
+        self.assertIn("[WARN]", out.getvalue())
+
+    def test_window_starts_always_include_last_window(self):
+        n_frames = 541
+        n_windows = n_frames - WINDOW + 1
+        for stride in range(1, MAX_WINDOW_STRIDE + 1):
+            starts = window_starts(n_frames, WINDOW, stride)
+            self.assertEqual(starts[0], 0)
+            self.assertEqual(starts[-1], n_windows - 1)
+            self.assertTrue(np.all(np.diff(starts) <= stride))
+        self.assertEqual(len(window_starts(WINDOW - 1, WINDOW, 1)), 0)
+
+    def test_expand_keeps_inferred_windows(self):
+        n_windows = 101
+        rng = np.random.default_rng(0)
+        for stride in range(1, MAX_WINDOW_STRIDE + 1):
+            starts = window_starts(n_windows + WINDOW - 1, WINDOW, stride)
+            probs = rng.random((len(starts), 4)).astype(np.float32)
+            dense = expand_window_probs(starts, probs, n_windows)
+            self.assertEqual(dense.shape, (n_windows, 4))
+            np.testing.assert_array_equal(dense[starts], probs)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+# tools/bench_backends.py
+# 추론 백엔드(eager / torchscript / onnx)별 eager 대비 출력 일치 여부 + windows/sec 비교
+#   python tools/bench_backends.py [clip1.mp4 ...] --batch-size 64 --threads 1
+#   (영상을 주지 않으면 무작위 윈도우로 측정, 일치 기준을 넘으면 종료 코드 1)
+import argparse
+import os
+import sys
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PARENT_DIR = os.path.dirname(CURRENT_DIR)
+sys.path.append(PARENT_DIR)
+
+import numpy as np
+
+from core.models.backends import BACKENDS, benchmark, check_parity, load_backend
+from core.services.predict import MODEL_PATH, WINDOW, make_windows, normalize_seq_2d
+
+
+def _windows_from_clips(paths):
+    from core.services.preprocess import process_pose
+
+    chunks = []
+    for path in paths:
+        pose_seq, _ = process_pose(path, return_stats=True)
+        if pose_seq is None or len(pose_seq) < WINDOW:
+            print(f"[SKIP] {path}: 포즈 시퀀스 부족")
+            continue
+        chunks.append(np.array(make_windows(normalize_seq_2d(pose_seq), WINDOW, 1), dtype=np.float32))
+    return np.concatenate(chunks) if chunks else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drovis 추론 백엔드 비교")
+    parser.add_argument("clips", nargs="*", help="윈도우를 만들 영상 (없으면 무작위 윈도우)")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS))
+    parser.add_argument("--windows", type=int, default=2048, help="무작위 윈도우 수")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--seconds", type=float, default=2.0, help="백엔드별 최소 측정 시간")
+    parser.add_argument("--tolerance", type=float, default=1e-4, help="허용 확률 오차")
+    args = parser.parse_args()
+
+    windows = _windows_from_clips(args.clips) if args.clips else None
+    if windows is None:
+        rng = np.random.default_rng(0)
+        windows = rng.standard_normal((args.windows, WINDOW, 66)).astype(np.float32)
+    print(f"windows={len(windows)}, batch={args.batch_size}, threads={args.threads}")
+
+    reference = load_backend("eager", MODEL_PATH, threads=args.threads)
+    print(f"{'backend':<12} {'windows/s':>10} {'max |Δlogit|':>13} {'max |Δprob|':>12} {'argmax 일치':>11}")
+
+    failed = False
+    for name in args.backends:
+        try:
+            backend = reference if name == "eager" else load_backend(name, MODEL_PATH, threads=args.threads)
+        except Exception as e:
+            print(f"{name:<12} 사용 불가: {type(e).__name__}: {e}")
+            continue
+        parity = check_parity(backend, reference, windows, args.batch_size)
+        rate = benchmark(backend, windows, args.batch_size, args.seconds)
+        ok = parity["max_abs_prob_diff"] <= args.tolerance and parity["argmax_agreement"] == 1.0
+        failed = failed or not ok
+        print(
+            f"{name:<12} {rate:10.0f} {parity['max_abs_logit_diff']:13.2e} "
+            f"{parity['max_abs_prob_diff']:12.2e} {parity['argmax_agreement'] * 100:10.1f}%"
+            f"{'' if ok else '  [불일치]'}"
+        )
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# tools/bench_startup.py
+# 콜드 스타트 → 첫 창 표시까지 걸리는 시간 측정 (GUI만 vs ML 스택까지 즉시 로드)
+#   python tools/bench_startup.py --repeat 5 [--offscreen]
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PARENT_DIR = os.path.dirname(CURRENT_DIR)
+
+HEAVY_MODULES = ("torch", "cv2", "mediapipe")
+
+# 새 프로세스에서 실행할 측정 코드 (모듈 캐시 없는 콜드 스타트)
+_PROBE = r"""
+import sys, time
+t0 = time.perf_counter()
+sys.path.insert(0, {root!r})
+from PyQt5.QtWidgets import QApplication
+from gui.main_window import MainWindow
+if {eager!r}:
+    from core.services import predict
+    predict.get_model()
+app = QApplication(sys.argv)
+w = MainWindow()
+w.show()
+app.processEvents()
+t1 = time.perf_counter()
+loaded = [m for m in {heavy!r} if m in sys.modules]
+print(f"{{(t1 - t0) * 1000:.1f}} {{','.join(loaded) or '-'}}")
+"""
+
+
+def _run(eager, env):
+    code = _PROBE.format(root=PARENT_DIR, eager=eager, heavy=HEAVY_MODULES)
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, env=env, cwd=PARENT_DIR
+    )
+    if out.returncode != 0:
+        raise RuntimeError(out.stderr.strip().splitlines()[-1] if out.stderr else "probe 실패")
+    ms, loaded = out.stdout.strip().splitlines()[-1].split(" ", 1)
+    return float(ms), loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drovis 시작 시간 측정")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--offscreen", action="store_true", help="디스플레이 없이 측정")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env["DROVIS_PREWARM_MODEL"] = "0"
+    if args.offscreen:
+        env["QT_QPA_PLATFORM"] = "offscreen"
+
+    for label, eager in (("GUI only (lazy)", False), ("GUI + ML stack (eager)", True)):
+        samples, loaded = [], "-"
+        for _ in range(args.repeat):
+            ms, loaded = _run(eager, env)
+            samples.append(ms)
+        print(
+            f"{label:<24} median {statistics.median(samples):8.1f} ms  "
+            f"min {min(samples):8.1f} ms  heavy modules: {loaded}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# tools/bench_stride.py
+# 윈도우 stride별 추론 속도 / 정확도(stride 1 대비) 비교 벤치마크
+#   python tools/bench_stride.py clip1.mp4 clip2.mp4 --strides 1 5 10 15
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PARENT_DIR = os.path.dirname(CURRENT_DIR)
+sys.path.append(PARENT_DIR)
+
+import numpy as np
+
+from core.services.preprocess import process_pose
+from core.services.predict import (
+    WINDOW,
+    LABEL_MAP,
+    normalize_seq_2d,
+    infer_sequence,
+    get_suspicion_level,
+)
+
+
+def _summary(probs):
+    preds = probs.argmax(axis=1)
+    avg = probs.mean(axis=0)
+    level = get_suspicion_level(Counter(preds.tolist()))
+    return preds, avg, level
+
+
+def bench_clip(path, strides, repeat):
+    t0 = time.perf_counter()
+    pose_seq, _ = process_pose(path, return_stats=True)
+    pose_sec = time.perf_counter() - t0
+    if pose_seq is None or len(pose_seq) < WINDOW:
+        print(f"[SKIP] {path}: 포즈 시퀀스 부족")
+        return
+
+    sequence = normalize_seq_2d(pose_seq)
+    base_preds = base_avg = base_level = None
+
+    print(f"\n{os.path.basename(path)} — frames={len(sequence)}, pose 추출 {pose_sec:.2f}s")
+    print(f"{'stride':>6} {'infer(s)':>9} {'speedup':>8} {'label 일치':>10} {'max |Δ%|':>9} {'위험도':>6}")
+
+    base_sec = None
+    for stride in strides:
+        best = float("inf")
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            probs = infer_sequence(sequence, stride=stride)
+            best = min(best, time.perf_counter() - t0)
+
+        preds, avg, level = _summary(probs)
+        if base_preds is None:
+            # 첫 번째 stride(보통 1)를 기준값으로 사용
+            base_preds, base_avg, base_level, base_sec = preds, avg, level, best
+
+        agree = float((preds == base_preds).mean()) * 100
+        delta = float(np.abs(avg - base_avg)[1:].max()) * 100
+        same = "=" if level == base_level else "≠"
+        print(
+            f"{stride:>6} {best:>9.3f} {base_sec / best:>7.1f}x {agree:>9.1f}% "
+            f"{delta:>8.2f}p {level:>4} {same}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="윈도우 stride 속도/정확도 비교")
+    parser.add_argument("videos", nargs="+")
+    parser.add_argument("--strides", nargs="+", type=int, default=[1, 5, 10, 15])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    strides = sorted(set(args.strides))
+    print(f"labels: {LABEL_MAP}")
+    for path in args.videos:
+        bench_clip(path, strides, args.repeat)
+
+
+if __name__ == "__main__":
+    main()